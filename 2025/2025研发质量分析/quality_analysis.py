@@ -5,11 +5,15 @@
 Analyzes incident reports and Jira data to evaluate quality management
 """
 
+import sys
+from pathlib import Path
 import pandas as pd
-from collections import Counter
 from datetime import datetime
 import re
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from jira_data import UNRESOLVED_STATUS, load_cube, load_jira, sync_store
+
 # File paths
 INCIDENT_FILE = '2025年线上故障问题表.csv'
 JIRA_FILE = 'Jira-项目管理 2026-01-30T12_27_55+0800.csv'
@@ -18,8 +22,11 @@ OUTPUT_FILE = '2025年度研发质量体系分析报告.md'
 def load_data():
     """Load both CSV files"""
     incidents = pd.read_csv(INCIDENT_FILE, encoding='utf-8')
-    jira = pd.read_csv(JIRA_FILE, encoding='utf-8', low_memory=False)
-    return incidents, jira
+    store = sync_store(JIRA_FILE)
+    # Counts come from the aggregation cube; the frame is kept for text matching
+    jira = load_jira(store)
+    cube = load_cube(store)
+    return incidents, jira, cube
 
 def clean_incident_data(df):
     """Clean incident data"""
@@ -105,12 +112,12 @@ def match_incidents_with_jira(incidents, jira):
     
     return matches, no_matches
 
-def analyze_distribution(incidents, jira):
+def analyze_distribution(incidents, cube):
     """Analyze fault distribution by various dimensions"""
     results = {}
     
     # Filter Jira for fault type
-    jira_faults = jira[jira['问题类型'] == '故障'].copy()
+    jira_faults = cube.where(issue_type='故障')
     
     # 1. Time distribution (from incidents)
     incidents['date_parsed'] = pd.to_datetime(incidents['故障日期'], errors='coerce')
@@ -131,98 +138,73 @@ def analyze_distribution(incidents, jira):
     results['customer_dist'] = customer_dist
     
     # 5. Jira fault time distribution
-    jira_faults['创建日期_parsed'] = pd.to_datetime(jira_faults['创建日期'], errors='coerce')
-    jira_2025 = jira_faults[jira_faults['创建日期_parsed'].dt.year == 2025]
-    jira_monthly = jira_2025.groupby(jira_2025['创建日期_parsed'].dt.month).size().to_dict()
+    jira_monthly = jira_faults.counts('month', year=2025).sort_index().to_dict()
     results['jira_monthly'] = jira_monthly
     
     # 6. Jira severity distribution  
-    severity_col = '自定义字段(严重程度)'
-    if severity_col in jira_faults.columns:
-        jira_severity = jira_faults[severity_col].value_counts().to_dict()
-        results['jira_severity'] = jira_severity
+    results['jira_severity'] = jira_faults.counts('severity').to_dict()
     
     # 7. Environment distribution
-    env_col = '自定义字段(缺陷发现环境)'
-    if env_col in jira_faults.columns:
-        env_dist = jira_faults[env_col].value_counts().to_dict()
-        results['env_dist'] = env_dist
+    results['env_dist'] = jira_faults.counts('environment').to_dict()
     
     return results
 
-def analyze_root_causes(jira):
+def analyze_root_causes(jira, cube):
     """Analyze root causes from Jira data"""
-    jira_faults = jira[jira['问题类型'] == '故障'].copy()
-    
-    root_col = '自定义字段(根本原因)'
+    faults = cube.where(issue_type='故障')
     results = {}
     
-    if root_col in jira_faults.columns:
-        root_causes = jira_faults[root_col].value_counts().to_dict()
-        # Filter out NaN
-        root_causes = {k: v for k, v in root_causes.items() if pd.notna(k) and str(k).strip()}
-        results['root_causes'] = root_causes
+    root_causes = faults.counts('root_cause').to_dict()
+    # Filter out blanks
+    results['root_causes'] = {k: v for k, v in root_causes.items() if str(k).strip()}
     
     # Analyze defect types
-    defect_cols = [c for c in jira_faults.columns if '缺陷类型' in c]
-    defect_types = Counter()
-    for col in defect_cols:
-        for v in jira_faults[col].dropna():
-            if v and str(v).strip():
-                defect_types[str(v).strip()] += 1
-    results['defect_types'] = dict(defect_types.most_common(15))
-    
-    # Analyze solutions
+    results['defect_types'] = faults.defect_types().head(15).to_dict()
+    
+    # Analyze solutions (free text, so read from the issue frame)
     solution_col = '自定义字段(解决办法)'
-    if solution_col in jira_faults.columns:
-        solutions = jira_faults[solution_col].dropna()
+    if solution_col in jira.columns:
+        solutions = jira.loc[jira['问题类型'] == '故障', solution_col].dropna()
         results['solution_count'] = len(solutions)
     
     return results
 
-def analyze_resolution_stats(jira):
+def analyze_resolution_stats(cube):
     """Analyze resolution statistics"""
-    jira_faults = jira[jira['问题类型'] == '故障'].copy()
+    jira_faults = cube.where(issue_type='故障')
     
     results = {}
     
     # Status distribution
-    status_dist = jira_faults['状态'].value_counts().to_dict()
-    results['status_dist'] = status_dist
+    results['status_dist'] = jira_faults.counts('status').to_dict()
     
     # Resolution rate
-    total = len(jira_faults)
-    resolved = len(jira_faults[jira_faults['状态'] == '完成'])
+    total = jira_faults.count()
+    resolved = jira_faults.count(status='完成')
     results['total'] = total
     results['resolved'] = resolved
     results['resolution_rate'] = resolved / total * 100 if total > 0 else 0
     
     # P0 stats
-    severity_col = '自定义字段(严重程度)'
-    if severity_col in jira_faults.columns:
-        p0_df = jira_faults[jira_faults[severity_col].str.contains('P0', na=False)]
-        p0_total = len(p0_df)
-        p0_resolved = len(p0_df[p0_df['状态'] == '完成'])
-        results['p0_total'] = p0_total
-        results['p0_resolved'] = p0_resolved
-        results['p0_rate'] = p0_resolved / p0_total * 100 if p0_total > 0 else 0
-        
-        # P1 stats
-        p1_df = jira_faults[jira_faults[severity_col].str.contains('P1', na=False)]
-        p1_total = len(p1_df)
-        p1_resolved = len(p1_df[p1_df['状态'] == '完成'])
-        results['p1_total'] = p1_total
-        results['p1_resolved'] = p1_resolved
-        results['p1_rate'] = p1_resolved / p1_total * 100 if p1_total > 0 else 0
+    p0_total = jira_faults.count(severity_code=0)
+    p0_resolved = jira_faults.count(severity_code=0, status='完成')
+    results['p0_total'] = p0_total
+    results['p0_resolved'] = p0_resolved
+    results['p0_rate'] = p0_resolved / p0_total * 100 if p0_total > 0 else 0
+    
+    # P1 stats
+    p1_total = jira_faults.count(severity_code=1)
+    p1_resolved = jira_faults.count(severity_code=1, status='完成')
+    results['p1_total'] = p1_total
+    results['p1_resolved'] = p1_resolved
+    results['p1_rate'] = p1_resolved / p1_total * 100 if p1_total > 0 else 0
     
     # Unresolved by severity
-    unresolved_status = ['待办', '处理中', '挂起中', '重新打开']
-    unresolved = jira_faults[jira_faults['状态'].isin(unresolved_status)]
-    results['unresolved_count'] = len(unresolved)
+    results['unresolved_count'] = jira_faults.count(status=UNRESOLVED_STATUS)
     
     return results
 
-def generate_report(incidents, jira, matches, no_matches, distribution, root_causes, resolution):
+def generate_report(incidents, cube, matches, no_matches, distribution, root_causes, resolution):
     """Generate markdown report"""
     report = []
     
@@ -233,7 +215,7 @@ def generate_report(incidents, jira, matches, no_matches, distribution, root_cau
     report.append("## 一、执行摘要\n")
     report.append("本报告基于两个核心数据源进行分析：")
     report.append(f"- **线上故障问题表**：{len(incidents)}条重大线上故障记录")
-    report.append(f"- **Jira项目管理数据**：共{len(jira)}条记录，其中故障类型{len(jira[jira['问题类型']=='故障'])}条\n")
+    report.append(f"- **Jira项目管理数据**：共{cube.count()}条记录，其中故障类型{cube.count(issue_type='故障')}条\n")
     
     # Data matching analysis
     report.append("## 二、数据源对比分析\n")
@@ -442,11 +424,11 @@ def main():
     
     # Load data
     print("\n[1/6] 加载数据...")
-    incidents, jira = load_data()
+    incidents, jira, cube = load_data()
     incidents = clean_incident_data(incidents)
     print(f"  - 线上故障记录: {len(incidents)}条")
-    print(f"  - Jira记录: {len(jira)}条")
-    print(f"  - Jira故障记录: {len(jira[jira['问题类型']=='故障'])}条")
+    print(f"  - Jira记录: {cube.count()}条")
+    print(f"  - Jira故障记录: {cube.count(issue_type='故障')}条")
     
     # Match incidents with Jira
     print("\n[2/6] 对比线上故障与Jira数据...")
@@ -456,25 +438,25 @@ def main():
     
     # Analyze distribution
     print("\n[3/6] 分析故障分布...")
-    distribution = analyze_distribution(incidents, jira)
+    distribution = analyze_distribution(incidents, cube)
     print(f"  - 团队分布: {len(distribution.get('team_dist', {}))}个团队")
     print(f"  - 客户分布: {len(distribution.get('customer_dist', {}))}个客户")
     
     # Analyze root causes
     print("\n[4/6] 分析根本原因...")
-    root_causes = analyze_root_causes(jira)
+    root_causes = analyze_root_causes(jira, cube)
     print(f"  - 根本原因类型: {len(root_causes.get('root_causes', {}))}种")
     print(f"  - 缺陷类型: {len(root_causes.get('defect_types', {}))}种")
     
     # Analyze resolution
     print("\n[5/6] 分析解决效率...")
-    resolution = analyze_resolution_stats(jira)
+    resolution = analyze_resolution_stats(cube)
     print(f"  - 故障总数: {resolution['total']}")
     print(f"  - 解决率: {resolution['resolution_rate']:.1f}%")
     
     # Generate report
     print("\n[6/6] 生成分析报告...")
-    report = generate_report(incidents, jira, matches, no_matches, 
+    report = generate_report(incidents, cube, matches, no_matches, 
                             distribution, root_causes, resolution)
     
     with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
@@ -6,10 +6,15 @@ Based on incident table and Jira data
 Separates SaaS and Private deployment bugs
 """
 
+import sys
+from pathlib import Path
 import pandas as pd
-from collections import Counter
 from datetime import datetime
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from jira_data import (SEVERITY_CODE, UNRESOLVED_STATUS, any_contains, load_cube, load_jira, load_jira_values,
+                       multi_value_counts, sync_store)
+
 # File paths
 INCIDENT_FILE = '2025年线上故障问题表.csv'
 JIRA_FILE = 'Jira-项目管理 2026-01-30T12_27_55+0800.csv'
@@ -18,8 +23,13 @@ OUTPUT_FILE = '2025年度质量体系年终总结.md'
 def load_data():
     """Load CSV files"""
     incidents = pd.read_csv(INCIDENT_FILE, encoding='utf-8')
-    jira = pd.read_csv(JIRA_FILE, encoding='utf-8', low_memory=False)
-    return incidents, jira
+    store = sync_store(JIRA_FILE)
+    # Overall counts come from the aggregation cube; the frame and defect values
+    # serve the SaaS/private split, which is a full-text search and not a cube dimension
+    jira = load_jira(store)
+    cube = load_cube(store)
+    defect_types = load_jira_values('自定义字段(缺陷类型)', store)
+    return incidents, jira, cube, defect_types
 
 def clean_incident_data(df):
     """Clean incident data"""
@@ -67,14 +77,15 @@ def analyze_incidents(incidents):
     
     return results
 
-def analyze_jira_bugs(jira):
+def analyze_jira_bugs(jira, cube, defect_values):
     """Analyze Jira bug/fault data with SaaS/Private separation"""
     # Filter for bugs and faults
     bug_types = ['故障', '缺陷', 'Bug', 'bug']
     bugs = jira[jira['问题类型'].isin(bug_types)].copy()
+    bug_cube = cube.where(issue_type=bug_types)
     
     results = {}
-    results['total_bugs'] = len(bugs)
+    results['total_bugs'] = bug_cube.count()
     
     # Find environment column (may have encoding issues)
     env_col = None
@@ -89,15 +100,13 @@ def analyze_jira_bugs(jira):
             severity_col = col
             break
     
-    # Separate SaaS and Private bugs by searching row content
-    # Convert entire row to string and search
-    bugs['_row_str'] = bugs.apply(lambda x: ','.join(x.astype(str)), axis=1)
-    saas_bugs = bugs[bugs['_row_str'].str.contains('SaaS生产环境|SaaS客户', case=False, na=False)]
-    private_bugs = bugs[bugs['_row_str'].str.contains('私有化客户生产环境|私有化客户', case=False, na=False)]
+    # Separate SaaS and Private bugs by searching the loaded text columns
+    saas_bugs = bugs[any_contains(bugs, 'SaaS生产环境|SaaS客户', case=False)]
+    private_bugs = bugs[any_contains(bugs, '私有化客户生产环境|私有化客户', case=False)]
     
     # Separate SaaS and Private bugs
     if len(saas_bugs) > 0 or len(private_bugs) > 0:
-        other_bugs = bugs[~bugs['_row_str'].str.contains('SaaS生产环境|SaaS客户|私有化客户生产环境|私有化客户', case=False, na=True)]
+        other_bugs = bugs[~any_contains(bugs, 'SaaS生产环境|SaaS客户|私有化客户生产环境|私有化客户', case=False)]
         
         results['saas_bugs_total'] = len(saas_bugs)
         results['private_bugs_total'] = len(private_bugs)
@@ -115,81 +124,60 @@ def analyze_jira_bugs(jira):
         
         # SaaS P0/P1
         if severity_col is not None:
-            saas_p0 = saas_bugs[saas_bugs[severity_col].str.contains('P0', na=False)]
-            saas_p1 = saas_bugs[saas_bugs[severity_col].str.contains('P1', na=False)]
+            saas_p0 = saas_bugs[saas_bugs[SEVERITY_CODE] == 0]
+            saas_p1 = saas_bugs[saas_bugs[SEVERITY_CODE] == 1]
             results['saas_p0_total'] = len(saas_p0)
             results['saas_p0_resolved'] = len(saas_p0[saas_p0['状态'] == '完成'])
             results['saas_p1_total'] = len(saas_p1)
             results['saas_p1_resolved'] = len(saas_p1[saas_p1['状态'] == '完成'])
             
             # Private P0/P1
-            private_p0 = private_bugs[private_bugs[severity_col].str.contains('P0', na=False)]
-            private_p1 = private_bugs[private_bugs[severity_col].str.contains('P1', na=False)]
+            private_p0 = private_bugs[private_bugs[SEVERITY_CODE] == 0]
+            private_p1 = private_bugs[private_bugs[SEVERITY_CODE] == 1]
             results['private_p0_total'] = len(private_p0)
             results['private_p0_resolved'] = len(private_p0[private_p0['状态'] == '完成'])
             results['private_p1_total'] = len(private_p1)
             results['private_p1_resolved'] = len(private_p1[private_p1['状态'] == '完成'])
         
         # SaaS defect types
-        defect_cols = [c for c in bugs.columns if '缺陷类型' in c]
-        saas_defects = Counter()
-        for col in defect_cols:
-            for v in saas_bugs[col].dropna():
-                if v and str(v).strip():
-                    saas_defects[str(v).strip()] += 1
-        results['saas_defect_types'] = dict(saas_defects.most_common(10))
+        saas_defects = multi_value_counts(defect_values, saas_bugs)
+        results['saas_defect_types'] = saas_defects.head(10).to_dict()
         
         # Private defect types
-        private_defects = Counter()
-        for col in defect_cols:
-            for v in private_bugs[col].dropna():
-                if v and str(v).strip():
-                    private_defects[str(v).strip()] += 1
-        results['private_defect_types'] = dict(private_defects.most_common(10))
+        private_defects = multi_value_counts(defect_values, private_bugs)
+        results['private_defect_types'] = private_defects.head(10).to_dict()
         
         # Monthly trends for SaaS and Private
-        saas_bugs['创建日期_parsed'] = pd.to_datetime(saas_bugs['创建日期'], errors='coerce')
-        saas_2025 = saas_bugs[saas_bugs['创建日期_parsed'].dt.year == 2025]
-        results['saas_monthly'] = saas_2025.groupby(saas_2025['创建日期_parsed'].dt.month).size().to_dict()
+        saas_2025 = saas_bugs[saas_bugs['创建日期'].dt.year == 2025]
+        results['saas_monthly'] = saas_2025.groupby(saas_2025['创建日期'].dt.month).size().to_dict()
         
-        private_bugs['创建日期_parsed'] = pd.to_datetime(private_bugs['创建日期'], errors='coerce')
-        private_2025 = private_bugs[private_bugs['创建日期_parsed'].dt.year == 2025]
-        results['private_monthly'] = private_2025.groupby(private_2025['创建日期_parsed'].dt.month).size().to_dict()
+        private_2025 = private_bugs[private_bugs['创建日期'].dt.year == 2025]
+        results['private_monthly'] = private_2025.groupby(private_2025['创建日期'].dt.month).size().to_dict()
     
     # Overall stats
-    status_counts = bugs['状态'].value_counts().to_dict()
+    status_counts = bug_cube.counts('status').to_dict()
     results['status_dist'] = status_counts
     
-    resolved = len(bugs[bugs['状态'] == '完成'])
+    resolved = bug_cube.count(status='完成')
     results['resolved'] = resolved
-    results['resolution_rate'] = resolved / len(bugs) * 100 if len(bugs) > 0 else 0
+    results['resolution_rate'] = resolved / results['total_bugs'] * 100 if results['total_bugs'] > 0 else 0
     
     # Overall P0/P1
     if severity_col is not None:
-        p0_bugs = bugs[bugs[severity_col].str.contains('P0', na=False)]
-        p1_bugs = bugs[bugs[severity_col].str.contains('P1', na=False)]
-        
-        results['jira_p0_total'] = len(p0_bugs)
-        results['jira_p0_resolved'] = len(p0_bugs[p0_bugs['状态'] == '完成'])
+        results['jira_p0_total'] = bug_cube.count(severity_code=0)
+        results['jira_p0_resolved'] = bug_cube.count(severity_code=0, status='完成')
         results['jira_p0_rate'] = results['jira_p0_resolved'] / results['jira_p0_total'] * 100 if results['jira_p0_total'] > 0 else 0
         
-        results['jira_p1_total'] = len(p1_bugs)
-        results['jira_p1_resolved'] = len(p1_bugs[p1_bugs['状态'] == '完成'])
+        results['jira_p1_total'] = bug_cube.count(severity_code=1)
+        results['jira_p1_resolved'] = bug_cube.count(severity_code=1, status='完成')
         results['jira_p1_rate'] = results['jira_p1_resolved'] / results['jira_p1_total'] * 100 if results['jira_p1_total'] > 0 else 0
     
     # Overall defect types
-    defect_cols = [c for c in bugs.columns if '缺陷类型' in c]
-    defect_types = Counter()
-    for col in defect_cols:
-        for v in bugs[col].dropna():
-            if v and str(v).strip():
-                defect_types[str(v).strip()] += 1
-    results['defect_types'] = dict(defect_types.most_common(10))
+    defect_types = bug_cube.defect_types()
+    results['defect_types'] = defect_types.head(10).to_dict()
     
     # Unresolved
-    unresolved_status = ['待办', '处理中', '挂起中']
-    unresolved = bugs[bugs['状态'].isin(unresolved_status)]
-    results['unresolved'] = len(unresolved)
+    results['unresolved'] = bug_cube.count(status=UNRESOLVED_STATUS)
     
     return results
 
@@ -407,7 +395,7 @@ def main():
     
     # Load data
     print("\n[1/4] 加载数据...")
-    incidents, jira = load_data()
+    incidents, jira, cube, defect_values = load_data()
     incidents = clean_incident_data(incidents)
     print(f"  - 线上故障记录: {len(incidents)}条")
     print(f"  - Jira记录: {len(jira)}条")
@@ -421,7 +409,7 @@ def main():
     
     # Analyze Jira
     print("\n[3/4] 分析Jira数据...")
-    jira_stats = analyze_jira_bugs(jira)
+    jira_stats = analyze_jira_bugs(jira, cube, defect_values)
     print(f"  - Bug总数: {jira_stats['total_bugs']}")
     print(f"  - SaaS Bug: {jira_stats.get('saas_bugs_total', 0)} (解决率: {jira_stats.get('saas_resolution_rate', 0):.1f}%)")
     print(f"  - 私有化Bug: {jira_stats.get('private_bugs_total', 0)} (解决率: {jira_stats.get('private_resolution_rate', 0):.1f}%)")
@@ -10,11 +10,15 @@ Commands:
   search <keyword>         - Search by keyword
   incidents                - Show incident analysis
   products                 - Show product line progress
-  export                   - Export full analysis to JSON
+  kpis [metric]            - Show numeric KPIs extracted from reports
+  delivery [client] [date] - Show privatization delivery status (as of YYYY-MM-DD)
+  topics [YYYY-MM]         - Show rising topics month over month
+  export [--split] [--gzip] - Export full analysis to JSON
+                             (--split: per-section content-addressed files)
 """
 
 import sys
-from cto_weekly_report_analyzer import CTOWeeklyReportAnalyzer
+from cto_weekly_report_analyzer import CTOWeeklyReportAnalyzer, normalize_date
 from pathlib import Path
 
 
@@ -24,7 +28,7 @@ def load_analyzer():
     data_dir = Path(__file__).parent / "2025"
     
     if data_dir.exists():
-        for md_file in sorted(data_dir.glob("*.md")):
+        for md_file in sorted(data_dir.rglob("*周报*.md")):
             analyzer.load_markdown_file(str(md_file))
     
     return analyzer
@@ -108,8 +112,93 @@ def cmd_products(analyzer):
                 print(f"     [{date}] {activity[:60]}...")
 
 
-def cmd_export(analyzer):
+def cmd_kpis(analyzer, metric=None):
+    """Show KPI time series extracted from the reports."""
+    kpis = analyzer.analyze_kpis()
+    
+    print("\n=== KPI TIME SERIES ===\n")
+    if metric:
+        if metric not in kpis:
+            print(f"No observations for metric: {metric}")
+            return
+        kpis = {metric: kpis[metric]}
+    
+    if not kpis:
+        print("No KPIs extracted.")
+        return
+    
+    for name, stats in kpis.items():
+        print(f"\n📐 {name} ({stats['observations']} observations, {stats['aggregation']})")
+        for month, value in stats['monthly'].items():
+            print(f"  {month}: {value:.10g}")
+        if metric:
+            print("  By dimension:")
+            for dim, value in sorted(stats['by_dimension'].items(), key=lambda x: x[1], reverse=True)[:10]:
+                print(f"    {dim or '-'}: {value:.10g}")
+
+
+def cmd_delivery(analyzer, client_name=None, as_of=None):
+    """Show privatization delivery status, for all clients or one client."""
+    timeline = analyzer.delivery
+    
+    if not client_name:
+        print("\n=== PRIVATIZATION DELIVERY STATUS ===\n")
+        delivery = analyzer.analyze_delivery()
+        if not delivery:
+            print("No delivery events found.")
+            return
+        for client, info in delivery.items():
+            print(f"  [{info['date']}] {client}: {info['status']} - {info['detail'][:60]}")
+        return
+    
+    client = timeline.resolve(client_name)
+    if client is None:
+        print(f"No delivery events for client: {client_name}")
+        return
+    
+    if as_of:
+        try:
+            as_of = normalize_date(as_of)
+        except ValueError as e:
+            print(f"Error: {e}")
+            print("Usage: python analyze.py delivery [client] [YYYY-MM-DD]")
+            return
+    
+    print(f"\n=== Delivery Timeline: {client} ===\n")
+    event = timeline.as_of(client, as_of) if as_of else timeline.latest(client)
+    if event is None:
+        print(f"No status recorded as of {as_of}.")
+    else:
+        label = f"as of {as_of}" if as_of else "latest"
+        print(f"📌 Status ({label}): {event.status} [{event.date}]")
+        print(f"   {event.detail}")
+    
+    print("\n📅 History:")
+    for e in timeline.history(client):
+        print(f"  [{e.date}] {e.status}: {e.detail[:70]}")
+
+
+def cmd_topics(analyzer, month=None):
+    """Show topics rising against the trailing baseline."""
+    trends = analyzer.analyze_topic_trends(month=month)
+    
+    print("\n=== RISING TOPICS ===\n")
+    if not trends:
+        print("No topic trends available.")
+        return
+    
+    for m, risers in trends.items():
+        print(f"\n📈 {m}")
+        for r in risers[:10]:
+            print(f"  {r['term']}: {r['count']} (baseline {r['baseline_count']}, LLR {r['llr']})")
+
+
+def cmd_export(analyzer, options=()):
     """Export analysis to JSON."""
+    if "--split" in options:
+        output_dir = Path(__file__).parent / "weekly_report_analysis"
+        analyzer.export_analysis_incremental(str(output_dir), compress="--gzip" in options)
+        return
     output_path = Path(__file__).parent / "weekly_report_analysis.json"
     analyzer.export_analysis(str(output_path))
 
@@ -123,6 +212,10 @@ def print_help():
     print("  python analyze.py search 故障       # Search for incidents")
     print("  python analyze.py incidents         # Incident analysis")
     print("  python analyze.py products          # Product progress")
+    print("  python analyze.py kpis cost         # Monthly cost figures")
+    print("  python analyze.py delivery 好未来   # 好未来 delivery status")
+    print("  python analyze.py topics 2025-11    # Rising topics in Nov 2025")
+    print("  python analyze.py export --split    # Incremental per-section export")
 
 
 def main():
@@ -143,8 +236,14 @@ def main():
         cmd_incidents(analyzer)
     elif cmd == "products":
         cmd_products(analyzer)
+    elif cmd == "kpis":
+        cmd_kpis(analyzer, sys.argv[2] if len(sys.argv) > 2 else None)
+    elif cmd == "delivery":
+        cmd_delivery(analyzer, *sys.argv[2:4])
+    elif cmd == "topics":
+        cmd_topics(analyzer, sys.argv[2] if len(sys.argv) > 2 else None)
     elif cmd == "export":
-        cmd_export(analyzer)
+        cmd_export(analyzer, sys.argv[2:])
     else:
         print_help()
 
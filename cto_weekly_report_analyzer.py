@@ -7,20 +7,287 @@ A skill for analyzing engineering weekly reports to extract key insights.
 Features:
 - Parse markdown format weekly reports
 - Extract key metrics: clients, projects, incidents, personnel changes
+- Extract numeric KPIs (incidents per severity, effort, cost, versions) into a time series
+- Track privatization delivery status per client over time
+- Detect rising topics month over month from CJK n-gram counts
 - Generate statistical analysis and trend reports
 - Support incremental file addition
 """
 
 import re
 import os
-from collections import defaultdict
+import math
+import gzip
+import hashlib
+from array import array
+from bisect import bisect_right, insort
+from collections import Counter, defaultdict
 from datetime import datetime
 from dataclasses import dataclass, field
-from typing import List, Dict, Set, Optional, Tuple
+from typing import List, Dict, Set, Optional, Tuple, Callable, Iterator, NamedTuple, Sequence
 from pathlib import Path
 import json
 
 
+class KPIRow(NamedTuple):
+    """A single typed metric observation extracted from a weekly report."""
+    date: str
+    metric: str
+    dimension: str
+    value: float
+
+
+def _version_value(text: str) -> float:
+    """Encode a dotted version (1.3.2) as a sortable number (1003002)."""
+    parts = [int(p) for p in text.split('.')[:3]]
+    parts += [0] * (3 - len(parts))
+    return float(parts[0] * 1_000_000 + parts[1] * 1_000 + parts[2])
+
+
+def _count_one(_text: str) -> float:
+    """Each match counts as one observation (e.g. one incident table row)."""
+    return 1.0
+
+
+@dataclass(frozen=True)
+class KPIExtractor:
+    """
+    A regex rule that turns text into KPI rows.
+
+    The pattern must define a `value` group and may define a `dim` group.
+    Without `dim`, the row is attributed to the report section (top-level
+    bullet) the line belongs to, or to UNKNOWN_DIMENSION when that bullet
+    is a sentence rather than a heading. `how` is the default aggregation
+    used in reports ("sum" for counts and amounts, "max" for levels like
+    versions). With per_dimension, monthly figures are keyed per dimension
+    (e.g. per product) instead of mixing all dimensions.
+    """
+    metric: str
+    pattern: str
+    convert: Callable[[str], float] = float
+    how: str = "sum"
+    dimension_map: Dict[str, str] = field(default_factory=dict)
+    scale_map: Dict[str, float] = field(default_factory=dict)
+    per_dimension: bool = False
+
+
+UNKNOWN_DIMENSION = "unknown"
+# Top-level bullets longer than this are sentences, not section headings
+MAX_SECTION_DIMENSION = 12
+
+# Amounts in 万 only count as cost next to a cost word
+_COST_CONTEXT = r"(?:成本|费用|预算|花费|支出|开销|节省|节约|报价|金额|合同|采购)"
+
+DEFAULT_KPI_EXTRACTORS = [
+    # Incidents are listed as `|标题|客户|P0|[复盘链接](...)|` table rows
+    KPIExtractor("severity_count", r"\|\s*(?P<dim>P[0-3])(?P<value>)\s*\|", convert=_count_one),
+    KPIExtractor("effort_person_days", r"(?P<value>\d+(?:\.\d+)?)\s*(?:人天|人日)"),
+    KPIExtractor("effort_hours", r"(?P<value>\d+(?:\.\d+)?)\s*(?:h|小时)(?![A-Za-z])"),
+    KPIExtractor("cost", r"(?P<value>\d+(?:\.\d+)?)\s*(?P<dim>万元|美元|元)",
+                 dimension_map={"万元": "CNY", "元": "CNY", "美元": "USD"},
+                 scale_map={"万元": 10_000}),
+    KPIExtractor("cost", _COST_CONTEXT + r"[^，。；;\d]{0,10}?(?P<value>\d+(?:\.\d+)?)\s*(?P<dim>万)(?![人次个条台])",
+                 dimension_map={"万": "CNY"}, scale_map={"万": 10_000}),
+    KPIExtractor("version", r"(?<![A-Za-z])(?P<dim>co-sdk|co|CO)[-\s]?(?P<value>\d{1,3}\.\d{1,3}(?:\.\d{1,3})?)(?!\d)",
+                 convert=_version_value, how="max", dimension_map={"CO": "co"}, per_dimension=True),
+    KPIExtractor("customer_count", r"(?P<value>\d+)\s*(?:个|家)\s*(?:大)?(?:客户|企业)"),
+]
+
+
+class KPIStore:
+    """
+    Array-backed columnar store for KPI rows.
+
+    Dates are kept as YYYYMMDD integers and metric/dimension names are
+    interned, so a row costs a few bytes instead of a tuple of objects.
+    """
+
+    def __init__(self):
+        self._dates = array('L')
+        self._metrics = array('H')
+        self._dimensions = array('L')
+        self._values = array('d')
+        self._metric_names: List[str] = []
+        self._metric_ids: Dict[str, int] = {}
+        self._dimension_names: List[str] = []
+        self._dimension_ids: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    @staticmethod
+    def _intern(name: str, names: List[str], ids: Dict[str, int]) -> int:
+        idx = ids.get(name)
+        if idx is None:
+            idx = ids[name] = len(names)
+            names.append(name)
+        return idx
+
+    def append(self, date: str, metric: str, dimension: str, value: float) -> None:
+        """Append one observation."""
+        self._dates.append(int(date))
+        self._metrics.append(self._intern(metric, self._metric_names, self._metric_ids))
+        self._dimensions.append(self._intern(dimension, self._dimension_names, self._dimension_ids))
+        self._values.append(value)
+
+    @property
+    def metrics(self) -> List[str]:
+        return list(self._metric_names)
+
+    def rows(self, metric: Optional[str] = None) -> Iterator[KPIRow]:
+        """Iterate rows, optionally restricted to one metric."""
+        metric_id = self._metric_ids.get(metric, -1) if metric else None
+        for i in range(len(self._values)):
+            if metric_id is not None and self._metrics[i] != metric_id:
+                continue
+            yield KPIRow(str(self._dates[i]), self._metric_names[self._metrics[i]],
+                         self._dimension_names[self._dimensions[i]], self._values[i])
+
+    def aggregate(self, metric: str, by: str = "month", how: str = "sum") -> Dict[str, float]:
+        """
+        Aggregate one metric by "date", "month", "dimension" or
+        "dimension_month" (`<dimension> YYYY-MM`, e.g. one series per product).
+        `how` is one of "sum", "max", "count".
+        """
+        result: Dict[str, float] = {}
+        for row in self.rows(metric):
+            if by == "month":
+                key = f"{row.date[:4]}-{row.date[4:6]}"
+            elif by == "dimension_month":
+                key = f"{row.dimension} {row.date[:4]}-{row.date[4:6]}"
+            elif by == "dimension":
+                key = row.dimension
+            else:
+                key = row.date
+            if how == "count":
+                result[key] = result.get(key, 0) + 1
+            elif how == "max":
+                result[key] = max(result.get(key, row.value), row.value)
+            else:
+                result[key] = result.get(key, 0) + row.value
+        return dict(sorted(result.items()))
+
+    def to_records(self) -> List[Dict]:
+        """Export rows as JSON-friendly dicts."""
+        return [row._asdict() for row in self.rows()]
+
+
+def _section_dimension(section: str) -> str:
+    """Heading of a top-level bullet (text before ':'), or UNKNOWN_DIMENSION for sentences."""
+    heading = re.split(r"[:：]", section, maxsplit=1)[0].strip()
+    if not heading or len(heading) > MAX_SECTION_DIMENSION or re.search(r"[，。；;,]", heading):
+        return UNKNOWN_DIMENSION
+    return heading
+
+
+class KPIExtractorBank:
+    """
+    Compiles a list of KPIExtractor rules into one alternation regex, so
+    any number of extractors costs a single `finditer` per line.
+    Earlier extractors win when two rules match at the same position.
+    """
+
+    def __init__(self, extractors: Optional[List[KPIExtractor]] = None):
+        self.extractors = list(DEFAULT_KPI_EXTRACTORS if extractors is None else extractors)
+        branches = []
+        for i, ex in enumerate(self.extractors):
+            body = ex.pattern.replace("(?P<value>", f"(?P<k{i}_value>").replace("(?P<dim>", f"(?P<k{i}_dim>")
+            branches.append(f"(?P<k{i}>{body})")
+        self._regex = re.compile("|".join(branches)) if branches else None
+        self._has_dim = ["(?P<dim>" in ex.pattern for ex in self.extractors]
+
+    def scan(self, line: str, date: str, section: str, store: KPIStore) -> None:
+        """Extract all KPI rows from one line into the store."""
+        if self._regex is None:
+            return
+        for m in self._regex.finditer(line):
+            key = m.lastgroup
+            i = int(key[1:])
+            ex = self.extractors[i]
+            raw_dim = m.group(f"{key}_dim") if self._has_dim[i] else None
+            try:
+                value = ex.convert(m.group(f"{key}_value"))
+            except ValueError:
+                continue
+            if raw_dim is not None:
+                value *= ex.scale_map.get(raw_dim, 1)
+                dimension = ex.dimension_map.get(raw_dim, raw_dim)
+            else:
+                dimension = _section_dimension(section)
+            store.append(date, ex.metric, dimension, value)
+
+
+def normalize_date(text: str) -> str:
+    """Normalize a YYYYMMDD, YYYY-MM-DD or YYYY/MM/DD date to YYYYMMDD."""
+    for fmt in ("%Y%m%d", "%Y-%m-%d", "%Y/%m/%d"):
+        try:
+            return datetime.strptime(text.strip(), fmt).strftime("%Y%m%d")
+        except ValueError:
+            continue
+    raise ValueError(f"invalid date {text!r}, expected YYYY-MM-DD or YYYYMMDD")
+
+
+class DeliveryEvent(NamedTuple):
+    """A status observation for one privatization client in one week."""
+    date: str
+    client: str
+    status: str
+    detail: str
+
+
+class DeliveryTimeline:
+    """
+    Per-client index of privatization status events.
+
+    Events are kept sorted by date per client, so the latest status is the
+    last element (O(1)) and an as-of-date lookup is a bisect (O(log n)).
+    Events on the same date are ordered by status_order (earlier entries
+    take precedence and sort last); statuses not listed rank lowest, and
+    equal ranks keep the order the events were added in.
+    """
+
+    def __init__(self, status_order: Sequence[str] = ()):
+        self._rank = {status: len(status_order) - i for i, status in enumerate(status_order)}
+        self._events: Dict[str, List[DeliveryEvent]] = defaultdict(list)
+
+    def __len__(self) -> int:
+        return sum(len(events) for events in self._events.values())
+
+    def _key(self, event: DeliveryEvent) -> Tuple[int, int]:
+        return int(event.date), self._rank.get(event.status, 0)
+
+    def add(self, event: DeliveryEvent) -> None:
+        """Insert an event, keeping the client's history in date order."""
+        insort(self._events[event.client], event, key=self._key)
+
+    def clients(self) -> List[str]:
+        return sorted(self._events)
+
+    def resolve(self, name: str) -> Optional[str]:
+        """Map a (partial) client name to a tracked client."""
+        if name in self._events:
+            return name
+        candidates = [c for c in self._events if name in c or c in name]
+        return min(candidates, key=len) if candidates else None
+
+    def latest(self, client: str) -> Optional[DeliveryEvent]:
+        """Latest known status of a client."""
+        events = self._events.get(client)
+        return events[-1] if events else None
+
+    def as_of(self, client: str, date: str) -> Optional[DeliveryEvent]:
+        """Status of a client as of a date (inclusive); see normalize_date()."""
+        date = normalize_date(date)
+        events = self._events.get(client)
+        if not events:
+            return None
+        pos = bisect_right(events, int(date), key=lambda event: int(event.date))
+        return events[pos - 1] if pos else None
+
+    def history(self, client: str) -> List[DeliveryEvent]:
+        return list(self._events.get(client, []))
+
+
 @dataclass
 class WeeklyEntry:
     """Represents a single weekly report entry."""
@@ -57,6 +324,13 @@ class CTOWeeklyReportAnalyzer:
         "海信", "蓝信", "卡斯柯", "宜宾辰海", "武汉铁路局", "四川准则",
     ]
     
+    # Short or variant names used in privatization bullets -> canonical client
+    CLIENT_ALIASES = {
+        "微众": "微众银行",
+        "泛微合作": "泛微",
+        "中电信量子集团": "中电量子",
+    }
+    
     # Product lines to track
     PRODUCT_LINES = [
         "Drive", "应用表格", "轻文档", "专业文档", "表格计算", "极速SDK",
@@ -66,13 +340,41 @@ class CTOWeeklyReportAnalyzer:
     # Incident severity keywords
     INCIDENT_KEYWORDS = ["故障", "问题", "bug", "Bug", "BUG", "异常", "失败", "报错", "P0", "P1", "P2"]
     
-    def __init__(self):
+    # Personnel change keywords
+    PERSONNEL_KEYWORDS = ["人员", "离职", "入职", "调整", "组长", "负责人"]
+    
+    # Privatization sub-headings that group clients rather than name one
+    DELIVERY_CATEGORY_HINTS = ["POC", "部署", "升级", "迁移", "重点", "重要", "其它", "其他"]
+    
+    # Words that mark a privatization bullet as a topic rather than a client
+    DELIVERY_NON_CLIENT_WORDS = ["客户", "定版", "知识库", "立项", "离线", "故障", "漏洞",
+                                 "工具", "审核", "机房", "其它", "其他", "bug", "Bug"]
+    
+    # CJK n-gram sizes counted for topic trend detection
+    TOPIC_NGRAM_SIZES = (2, 3)
+    
+    # Delivery status keywords, checked in priority order
+    DELIVERY_STATUS_RULES = [
+        ("阻塞", ["阻塞", "暂停", "卡住", "搁置", "延期", "风险", "需等"]),
+        ("验收", ["验收", "上线", "切流", "交付完成"]),
+        ("升级", ["升级", "Patch", "patch", "割接"]),
+        ("部署", ["部署", "交付", "实施", "安装"]),
+        ("POC", ["POC", "Poc", "poc"]),
+    ]
+
+    def __init__(self, kpi_extractors: Optional[List[KPIExtractor]] = None):
         self.entries: List[WeeklyEntry] = []
         self.all_clients: Set[str] = set()
         self.client_mentions: Dict[str, int] = defaultdict(int)
         self.incident_count_by_month: Dict[str, int] = defaultdict(int)
         self.product_progress: Dict[str, List[Tuple[str, str]]] = defaultdict(list)
-        
+        self.kpi_bank = KPIExtractorBank(kpi_extractors)
+        self.kpis = KPIStore()
+        self.delivery = DeliveryTimeline([status for status, _ in self.DELIVERY_STATUS_RULES])
+        self.topic_vocab: Dict[str, int] = {}
+        self.topic_terms: List[str] = []
+        self.topic_counts: Dict[str, Counter] = defaultdict(Counter)
+
     def load_markdown_file(self, filepath: str) -> None:
         """Load and parse a markdown weekly report file."""
         with open(filepath, 'r', encoding='utf-8') as f:
@@ -109,49 +411,154 @@ class CTOWeeklyReportAnalyzer:
             if client in content:
                 entry.clients.add(client)
         
-        # Extract incidents
-        for line in content.split('\n'):
-            for keyword in self.INCIDENT_KEYWORDS:
-                if keyword in line and len(line.strip()) > 5:
-                    entry.incidents.append(line.strip())
-                    break
-        
-        # Extract product line mentions
-        for product in self.PRODUCT_LINES:
-            if product in content:
-                # Find relevant lines
-                for line in content.split('\n'):
-                    if product in line and len(line.strip()) > 5:
-                        if product not in entry.products:
-                            entry.products[product] = []
-                        entry.products[product].append(line.strip())
-        
-        # Extract personnel changes
-        personnel_keywords = ["人员", "离职", "入职", "调整", "组长", "负责人"]
-        for line in content.split('\n'):
-            for keyword in personnel_keywords:
+        # Single pass over the lines: incidents, product mentions,
+        # personnel changes and KPI rows all come from the same loop
+        products = [p for p in self.PRODUCT_LINES if p in content]
+        section = ""
+        priv_lines: List[Tuple[int, str]] = []
+        topic_ids: List[int] = []
+        for raw_line in content.split('\n'):
+            line = raw_line.strip()
+            if not line:
+                continue
+            if raw_line.startswith('* '):
+                section = line[2:].strip()
+            
+            # Collect the privatization block with its indentation
+            if section.startswith("私有化"):
+                priv_lines.append((len(raw_line) - len(raw_line.lstrip()), line))
+
+            # Extract incidents
+            if len(line) > 5:
+                for keyword in self.INCIDENT_KEYWORDS:
+                    if keyword in line:
+                        entry.incidents.append(line)
+                        break
+
+                # Extract product line mentions
+                for product in products:
+                    if product in line:
+                        entry.products.setdefault(product, []).append(line)
+
+            # Extract personnel changes
+            for keyword in self.PERSONNEL_KEYWORDS:
                 if keyword in line:
-                    entry.personnel.append(line.strip())
+                    entry.personnel.append(line)
                     break
+
+            # Extract numeric KPIs
+            self.kpi_bank.scan(line, date_str, section, self.kpis)
+            
+            # Count CJK n-grams for topic trends
+            for run in self._CJK_RUN.findall(line):
+                topic_ids.extend(self._ngram_ids(run))
         
-        # Extract privatization items
-        if "私有化" in content:
-            priv_section = self._extract_section(content, "私有化")
-            entry.privatization = [l.strip() for l in priv_section.split('\n') if l.strip()]
+        self.topic_counts[f"{date_str[:4]}-{date_str[4:6]}"].update(topic_ids)
+
+        # Extract privatization items and per-client delivery status
+        if priv_lines:
+            entry.privatization = [line for _, line in priv_lines]
+            for event in self._extract_delivery_events(date_str, priv_lines):
+                self.delivery.add(event)
         
         return entry
     
-    def _extract_section(self, content: str, section_name: str) -> str:
-        """Extract a named section from content."""
-        pattern = rf'\*\s*{section_name}.*?(?=\*\s*[A-Za-z\u4e00-\u9fff]|\Z)'
-        match = re.search(pattern, content, re.DOTALL)
-        return match.group(0) if match else ""
+    _CJK_RUN = re.compile(r'[\u4e00-\u9fff]{2,}')
+    
+    def _ngram_ids(self, run: str) -> List[int]:
+        """Integer ids of the CJK n-grams in a run of CJK characters."""
+        vocab = self.topic_vocab
+        ids = []
+        for n in self.TOPIC_NGRAM_SIZES:
+            for i in range(len(run) - n + 1):
+                gram = run[i:i + n]
+                idx = vocab.get(gram)
+                if idx is None:
+                    idx = vocab[gram] = len(self.topic_terms)
+                    self.topic_terms.append(gram)
+                ids.append(idx)
+        return ids
+    
+    def _client_name(self, text: str) -> str:
+        """Canonical client name at the start of a privatization bullet."""
+        for client in sorted(self.KNOWN_CLIENTS, key=len, reverse=True):
+            if text.startswith(client):
+                return client.upper() if client.isascii() else client
+        name = re.split(r'[-\s，,：:（(>]', text, maxsplit=1)[0].strip()
+        return self.CLIENT_ALIASES.get(name, name)
+    
+    def _delivery_status(self, text: str, category: str) -> str:
+        """Classify delivery status from a client's bullet tree."""
+        for status, keywords in self.DELIVERY_STATUS_RULES[:2]:
+            if any(k in text for k in keywords):
+                return status
+        for status in ("POC", "升级", "部署"):
+            keywords = dict(self.DELIVERY_STATUS_RULES)[status]
+            if any(k in category for k in keywords):
+                return status
+        for status, keywords in self.DELIVERY_STATUS_RULES[2:]:
+            if any(k in text for k in keywords):
+                return status
+        return "支持"
+    
+    def _extract_delivery_events(self, date_str: str, priv_lines: List[Tuple[int, str]]) -> List[DeliveryEvent]:
+        """Turn the indented privatization block into per-client status events."""
+        # Build the bullet tree; unbulleted lines are details of the last bullet
+        root = {"text": "", "indent": -1, "children": []}
+        stack = [root]
+        for indent, line in priv_lines[1:]:
+            if not line.startswith('* '):
+                stack[-1]["children"].append({"text": line, "indent": indent, "children": []})
+                continue
+            node = {"text": line[2:].strip().strip('*').strip(), "indent": indent, "children": []}
+            while len(stack) > 1 and stack[-1]["indent"] >= indent:
+                stack.pop()
+            stack[-1]["children"].append(node)
+            stack.append(node)
+        
+        def flatten(node):
+            for child in node["children"]:
+                yield child["text"]
+                yield from flatten(child)
+        
+        def is_client(node):
+            name = self._client_name(node["text"])
+            if any(node["text"].startswith(c) for c in self.KNOWN_CLIENTS):
+                return True
+            return (bool(node["children"]) and 2 <= len(name) <= 16
+                    and re.search(r'[\u4e00-\u9fff]', name) is not None
+                    and name not in self.PRODUCT_LINES
+                    and not any(w in name for w in self.DELIVERY_NON_CLIENT_WORDS + self.DELIVERY_CATEGORY_HINTS + ["问题"]))
+        
+        def is_category(node):
+            return (not any(node["text"].startswith(c) for c in self.KNOWN_CLIENTS)
+                    and any(h in node["text"] for h in self.DELIVERY_CATEGORY_HINTS))
+        
+        candidates = []
+        for node in root["children"]:
+            if is_category(node):
+                candidates.extend((child, node["text"]) for child in node["children"] if is_client(child))
+            elif is_client(node):
+                candidates.append((node, ""))
+        
+        events = []
+        for node, category in candidates:
+            details = list(flatten(node))
+            text = " ".join([node["text"]] + details)
+            events.append(DeliveryEvent(
+                date=date_str,
+                client=self._client_name(node["text"]),
+                status=self._delivery_status(text, category),
+                detail=(details[-1] if details else node["text"])[:120]
+            ))
+        return events
     
     def analyze_client_health(self) -> Dict[str, Dict]:
         """Analyze client health based on mention frequency and incident patterns."""
         client_health = {}
         
-        for client in self.all_clients:
+        # Sorted so ties in the ranking below come out the same every run
+        for client in sorted(self.all_clients):
             mentions = self.client_mentions[client]
             incidents = 0
             
@@ -221,7 +628,7 @@ class CTOWeeklyReportAnalyzer:
         return {
             "total_incidents": len(all_incidents),
             "monthly_distribution": dict(sorted(monthly_incidents.items())),
-            "client_incidents": dict(sorted(client_incidents.items(), key=lambda x: x[1], reverse=True)[:10]),
+            "client_incidents": dict(sorted(client_incidents.items(), key=lambda x: (-x[1], x[0]))[:10]),
             "recent_incidents": all_incidents[-10:]
         }
     
@@ -242,6 +649,97 @@ class CTOWeeklyReportAnalyzer:
             "events": all_personnel_events
         }
     
+    def analyze_delivery(self) -> Dict[str, Dict]:
+        """Latest privatization delivery status per client."""
+        delivery = {}
+        
+        for client in self.delivery.clients():
+            latest = self.delivery.latest(client)
+            delivery[client] = {
+                "status": latest.status,
+                "date": latest.date,
+                "detail": latest.detail,
+                "events": len(self.delivery.history(client))
+            }
+        
+        return dict(sorted(delivery.items(), key=lambda x: x[1]["date"], reverse=True))
+    
+    @staticmethod
+    def _log_likelihood(a: int, b: int, n1: int, n2: int) -> float:
+        """Dunning's G2 for a term seen a/n1 times in a month vs b/n2 in the baseline."""
+        e1 = n1 * (a + b) / (n1 + n2)
+        e2 = n2 * (a + b) / (n1 + n2)
+        g2 = a * math.log(a / e1) if a else 0.0
+        g2 += b * math.log(b / e2) if b else 0.0
+        return 2 * g2
+    
+    def analyze_topic_trends(self, month: Optional[str] = None, baseline_months: int = 3,
+                             top_n: int = 15, min_count: int = 3) -> Dict[str, List[Dict]]:
+        """
+        Find n-grams rising in a month against its trailing baseline.
+        
+        Each month's counts are compared with the sum of the previous
+        `baseline_months` months using the log-likelihood ratio; only terms
+        more frequent than in the baseline are reported. N-grams that are
+        fragments of (or overlap) a higher-ranked riser are dropped. Returns month -> risers for the
+        given month, or for every month that has a baseline.
+        """
+        months = sorted(self.topic_counts)
+        targets = [month] if month else months[1:]
+        trends = {}
+        
+        for target in targets:
+            if target not in self.topic_counts:
+                continue
+            idx = months.index(target)
+            baseline = Counter()
+            for m in months[max(0, idx - baseline_months):idx]:
+                baseline.update(self.topic_counts[m])
+            if not baseline:
+                continue
+            
+            current = self.topic_counts[target]
+            n1 = sum(current.values())
+            n2 = sum(baseline.values())
+            scored = []
+            for term_id, a in current.items():
+                b = baseline.get(term_id, 0)
+                if a < min_count or a * n2 <= b * n1:
+                    continue
+                scored.append((self._log_likelihood(a, b, n1, n2), term_id, a, b))
+            scored.sort(reverse=True)
+            
+            risers = []
+            for llr, term_id, a, b in scored:
+                term = self.topic_terms[term_id]
+                if any(term in r["term"] or term[:-1] == r["term"][1:] or term[1:] == r["term"][:-1]
+                       for r in risers):
+                    continue
+                risers.append({"term": term, "count": a, "baseline_count": b, "llr": round(llr, 2)})
+                if len(risers) >= top_n:
+                    break
+            trends[target] = risers
+        
+        return trends
+    
+    def analyze_kpis(self) -> Dict[str, Dict]:
+        """Aggregate extracted KPI rows per metric by month and dimension."""
+        how_by_metric = {ex.metric: ex.how for ex in self.kpi_bank.extractors}
+        per_dimension = {ex.metric for ex in self.kpi_bank.extractors if ex.per_dimension}
+        kpi_stats = {}
+        
+        for metric in self.kpis.metrics:
+            how = how_by_metric.get(metric, "sum")
+            kpi_stats[metric] = {
+                "observations": sum(1 for _ in self.kpis.rows(metric)),
+                "aggregation": how,
+                "monthly": self.kpis.aggregate(
+                    metric, by="dimension_month" if metric in per_dimension else "month", how=how),
+                "by_dimension": self.kpis.aggregate(metric, by="dimension", how=how)
+            }
+        
+        return kpi_stats
+    
     def get_executive_summary(self) -> str:
         """Generate an executive summary for CTO review."""
         client_health = self.analyze_client_health()
@@ -370,25 +868,103 @@ Recent Events:
                 })
         return results
     
-    def export_analysis(self, output_path: str) -> None:
-        """Export full analysis to JSON file."""
-        analysis = {
-            "generated_at": datetime.now().isoformat(),
+    def _export_header(self) -> Dict:
+        """Metadata shared by both export formats."""
+        return {
             "total_entries": len(self.entries),
             "date_range": {
                 "start": self.entries[-1].date if self.entries else None,
                 "end": self.entries[0].date if self.entries else None
-            },
+            }
+        }
+    
+    def _export_sections(self) -> Dict[str, Dict]:
+        """Analysis sections included in exports, keyed by section name."""
+        return {
             "client_health": self.analyze_client_health(),
             "product_progress": self.analyze_product_progress(),
             "incidents": self.analyze_incidents(),
-            "personnel": self.analyze_personnel()
+            "personnel": self.analyze_personnel(),
+            "delivery": self.analyze_delivery(),
+            "kpis": self.analyze_kpis()
         }
+    
+    def export_analysis(self, output_path: str) -> None:
+        """Export full analysis to JSON file."""
+        analysis = {"generated_at": datetime.now().isoformat()}
+        analysis.update(self._export_header())
+        analysis.update(self._export_sections())
         
         with open(output_path, 'w', encoding='utf-8') as f:
             json.dump(analysis, f, ensure_ascii=False, indent=2)
         
         print(f"Analysis exported to {output_path}")
+    
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes) -> None:
+        """Write bytes through a temp file so readers never see a partial file."""
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    
+    def export_analysis_incremental(self, output_dir: str, compress: bool = False) -> Dict[str, bool]:
+        """
+        Export each analysis section to its own content-addressed file.
+        
+        Section files are named `<section>.<sha256 prefix>.json[.gz]` and are
+        only written when their content changes. `index.json` points at the
+        current version of every section and is rewritten only when one of
+        them changes, so pollers can compare the index and fetch just the
+        sections that moved. Returns section name -> whether it was written.
+        """
+        out = Path(output_dir)
+        out.mkdir(parents=True, exist_ok=True)
+        index_path = out / "index.json"
+        
+        previous = {}
+        if index_path.exists():
+            with open(index_path, 'r', encoding='utf-8') as f:
+                previous = json.load(f)
+        
+        sections = {}
+        written = {}
+        for name, payload in self._export_sections().items():
+            # Compact serialization in insertion order, so ranked sections keep
+            # their order and identical content gives identical bytes
+            data = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+            digest = hashlib.sha256(data).hexdigest()
+            filename = f"{name}.{digest[:16]}.json" + (".gz" if compress else "")
+            path = out / filename
+            written[name] = not path.exists()
+            if written[name]:
+                self._write_atomic(path, gzip.compress(data, mtime=0) if compress else data)
+            sections[name] = {"file": filename, "sha256": digest, "bytes": len(data)}
+        
+        index = self._export_header()
+        index["sections"] = sections
+        unchanged = {k: v for k, v in previous.items() if k != "generated_at"} == index
+        if unchanged:
+            print(f"Analysis in {output_dir} is up to date")
+            return written
+        
+        index = {"generated_at": datetime.now().isoformat(), **index}
+        self._write_atomic(index_path, json.dumps(index, ensure_ascii=False, indent=2).encode('utf-8'))
+        
+        # Keep the current and previous versions so in-flight readers of the
+        # old index can still fetch their files. Only section files this
+        # export names are removed; anything else in the directory stays.
+        keep = {s["file"] for s in sections.values()}
+        keep.update(s["file"] for s in previous.get("sections", {}).values())
+        section_file = re.compile(
+            r"(?:%s)\.[0-9a-f]{16}\.json(?:\.gz)?" % "|".join(re.escape(name) for name in sections))
+        for path in out.glob("*.json*"):
+            if section_file.fullmatch(path.name) and path.name not in keep:
+                path.unlink()
+        
+        changed = [name for name, w in written.items() if w]
+        print(f"Analysis exported to {output_dir} ({len(changed)} of {len(sections)} sections changed)")
+        return written
 
 
 def main():
@@ -399,7 +975,7 @@ def main():
     data_dir = Path(__file__).parent / "2025"
     
     if data_dir.exists():
-        for md_file in sorted(data_dir.glob("*.md")):
+        for md_file in sorted(data_dir.rglob("*周报*.md")):
             print(f"Loading: {md_file}")
             analyzer.load_markdown_file(str(md_file))
     
@@ -1,162 +1,215 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
+import sys
+from functools import partial
+from pathlib import Path
 import pandas as pd
-from collections import Counter
-
-file_path = '2025/2025研发质量分析/Jira-项目管理 2026-01-30T12_27_55+0800.csv'
-df = pd.read_csv(file_path, encoding='utf-8', low_memory=False)
-
-# Filter only bug types
-bug_df = df[df['问题类型'].isin(['故障', '缺陷', 'Bug', 'bug'])].copy()
-
-output = []
-
-output.append("=" * 80)
-output.append("一、Bug总体情况")
-output.append("=" * 80)
-output.append(f"总Bug数量: {len(bug_df)}")
-
-# Status
-output.append("\n【状态分布】")
-for status, count in bug_df['状态'].value_counts().items():
-    output.append(f"  {status}: {count}")
-
-# Priority
-output.append("\n【优先级分布】")
-for p, c in bug_df['优先级'].value_counts().items():
-    if pd.notna(p): output.append(f"  {p}: {c}")
-
-# Severity
-severity_col = '自定义字段(严重程度)'
-output.append("\n【严重程度分布】")
-for s, c in bug_df[severity_col].value_counts().items():
-    if pd.notna(s): output.append(f"  {s}: {c}")
-
-output.append("\n" + "=" * 80)
-output.append("二、Bug类型分析")
-output.append("=" * 80)
-
-# Defect types
-defect_cols = [c for c in bug_df.columns if '缺陷类型' in c]
-defect_types = Counter()
-for col in defect_cols:
-    for v in bug_df[col].dropna():
-        if v and str(v).strip(): defect_types[str(v).strip()] += 1
-output.append("\n【缺陷类型分布】")
-for dt, c in defect_types.most_common(15):
-    output.append(f"  {dt}: {c}")
-
-# Root cause
-root_col = '自定义字段(根本原因)'
-if root_col in bug_df.columns:
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from jira_data import (BUG_TYPES, CHUNK_ROWS, JIRA_CSV, UNRESOLVED_STATUS, BugCube, LatencyAggregates,
+                       iter_jira_chunks, latency_frame, latency_percentiles, load_cube, load_jira, sync_store)
+
+
+def bug_report(cube, percentiles):
+    """Report lines from the aggregation cube and the bugs' latency percentiles."""
+    bugs = cube.where(issue_type=BUG_TYPES)
+    p0 = bugs.where(severity_code=0)
+    p1 = bugs.where(severity_code=1)
+    unresolved = bugs.where(status=UNRESOLVED_STATUS)
+    output = []
+
+    output.append("=" * 80)
+    output.append("一、Bug总体情况")
+    output.append("=" * 80)
+    output.append(f"总Bug数量: {bugs.count()}")
+
+    # Status
+    output.append("\n【状态分布】")
+    for status, count in bugs.counts('status').items():
+        output.append(f"  {status}: {count}")
+
+    # Priority
+    output.append("\n【优先级分布】")
+    for p, c in bugs.counts('priority').items():
+        output.append(f"  {p}: {c}")
+
+    # Severity
+    output.append("\n【严重程度分布】")
+    for s, c in bugs.counts('severity').items():
+        output.append(f"  {s}: {c}")
+
+    output.append("\n" + "=" * 80)
+    output.append("二、Bug类型分析")
+    output.append("=" * 80)
+
+    # Defect types
+    output.append("\n【缺陷类型分布】")
+    for dt, c in bugs.defect_types().head(15).items():
+        output.append(f"  {dt}: {c}")
+
+    # Root cause
     output.append("\n【根本原因分布】")
-    for r, c in bug_df[root_col].value_counts().head(10).items():
-        if pd.notna(r) and str(r).strip(): output.append(f"  {r}: {c}")
+    for r, c in bugs.counts('root_cause').head(10).items():
+        if str(r).strip(): output.append(f"  {r}: {c}")
 
-output.append("\n" + "=" * 80)
-output.append("三、Bug环境分析")
-output.append("=" * 80)
+    output.append("\n" + "=" * 80)
+    output.append("三、Bug环境分析")
+    output.append("=" * 80)
 
-env_col = '自定义字段(缺陷发现环境)'
-if env_col in bug_df.columns:
     output.append("\n【缺陷发现环境分布】")
-    for e, c in bug_df[env_col].value_counts().items():
-        if pd.notna(e): output.append(f"  {e}: {c}")
+    for e, c in bugs.counts('environment').items():
+        output.append(f"  {e}: {c}")
 
-output.append("\n" + "=" * 80)
-output.append("四、归属分析")
-output.append("=" * 80)
+    output.append("\n" + "=" * 80)
+    output.append("四、归属分析")
+    output.append("=" * 80)
 
-# Assignee
-output.append("\n【经办人分布(Top15)】")
-for a, c in bug_df['经办人'].value_counts().head(15).items():
-    if pd.notna(a): output.append(f"  {a}: {c}")
+    # Assignee
+    output.append("\n【经办人分布(Top15)】")
+    for a, c in bugs.counts('assignee').head(15).items():
+        output.append(f"  {a}: {c}")
 
-# Customer
-customer_col = '自定义字段(客户名称)'
-if customer_col in bug_df.columns:
+    # Customer
     output.append("\n【客户分布(Top15)】")
-    for cu, c in bug_df[customer_col].value_counts().head(15).items():
-        if pd.notna(cu) and str(cu).strip(): output.append(f"  {cu}: {c}")
-
-output.append("\n" + "=" * 80)
-output.append("五、时间趋势分析")
-output.append("=" * 80)
-
-bug_df['创建日期_parsed'] = pd.to_datetime(bug_df['创建日期'], errors='coerce')
-bug_df['month'] = bug_df['创建日期_parsed'].dt.to_period('M')
-output.append("\n【月度Bug创建趋势(2025年)】")
-y2025 = bug_df[bug_df['创建日期_parsed'].dt.year == 2025]
-for m, c in y2025.groupby('month').size().items():
-    output.append(f"  {m}: {c}")
-
-output.append("\n" + "=" * 80)
-output.append("六、P0/P1高优先级Bug分析")
-output.append("=" * 80)
-
-p0_df = bug_df[bug_df[severity_col].str.contains('P0', na=False)]
-output.append(f"\n【P0 Bug数量】: {len(p0_df)}")
-output.append("\n【P0 Bug状态分布】")
-for s, c in p0_df['状态'].value_counts().items():
-    output.append(f"  {s}: {c}")
-
-output.append("\n【P0 Bug客户分布(Top10)】")
-for cu, c in p0_df[customer_col].value_counts().head(10).items():
-    if pd.notna(cu) and str(cu).strip(): output.append(f"  {cu}: {c}")
-
-p0_types = Counter()
-for col in defect_cols:
-    for v in p0_df[col].dropna():
-        if v and str(v).strip(): p0_types[str(v).strip()] += 1
-output.append("\n【P0 Bug缺陷类型分布】")
-for dt, c in p0_types.most_common(10):
-    output.append(f"  {dt}: {c}")
-
-p1_df = bug_df[bug_df[severity_col].str.contains('P1', na=False)]
-output.append(f"\n【P1 Bug数量】: {len(p1_df)}")
-output.append("\n【P1 Bug状态分布】")
-for s, c in p1_df['状态'].value_counts().items():
-    output.append(f"  {s}: {c}")
-
-output.append("\n" + "=" * 80)
-output.append("七、未解决Bug分析")
-output.append("=" * 80)
-
-unresolved_status = ['待办', '处理中', '挂起中', '重新打开']
-unresolved = bug_df[bug_df['状态'].isin(unresolved_status)]
-output.append(f"\n【未解决Bug数量】: {len(unresolved)}")
-output.append("\n【未解决Bug状态分布】")
-for s, c in unresolved['状态'].value_counts().items():
-    output.append(f"  {s}: {c}")
-output.append("\n【未解决Bug严重程度分布】")
-for sv, c in unresolved[severity_col].value_counts().items():
-    if pd.notna(sv): output.append(f"  {sv}: {c}")
-
-output.append("\n" + "=" * 80)
-output.append("八、年度关键指标汇总")
-output.append("=" * 80)
-
-total = len(bug_df)
-resolved = len(bug_df[bug_df['状态'] == '完成'])
-rate = resolved / total * 100 if total > 0 else 0
-
-p0_total = len(p0_df)
-p0_res = len(p0_df[p0_df['状态'] == '完成'])
-p0_rate = p0_res / p0_total * 100 if p0_total > 0 else 0
-
-p1_total = len(p1_df)
-p1_res = len(p1_df[p1_df['状态'] == '完成'])
-p1_rate = p1_res / p1_total * 100 if p1_total > 0 else 0
-
-output.append(f"\n  总Bug数: {total}")
-output.append(f"  已解决Bug数: {resolved}")
-output.append(f"  总体解决率: {rate:.1f}%")
-output.append(f"\n  P0 Bug总数: {p0_total}")
-output.append(f"  P0 Bug已解决: {p0_res}")
-output.append(f"  P0 解决率: {p0_rate:.1f}%")
-output.append(f"\n  P1 Bug总数: {p1_total}")
-output.append(f"  P1 Bug已解决: {p1_res}")
-output.append(f"  P1 解决率: {p1_rate:.1f}%")
+    for cu, c in bugs.counts('customer').head(15).items():
+        if str(cu).strip(): output.append(f"  {cu}: {c}")
+
+    output.append("\n" + "=" * 80)
+    output.append("五、时间趋势分析")
+    output.append("=" * 80)
+
+    output.append("\n【月度Bug创建趋势(2025年)】")
+    for m, c in bugs.counts('month', year=2025).sort_index().items():
+        output.append(f"  2025-{m:02d}: {c}")
+
+    output.append("\n" + "=" * 80)
+    output.append("六、P0/P1高优先级Bug分析")
+    output.append("=" * 80)
+
+    p0_total = p0.count()
+    output.append(f"\n【P0 Bug数量】: {p0_total}")
+    output.append("\n【P0 Bug状态分布】")
+    for s, c in p0.counts('status').items():
+        output.append(f"  {s}: {c}")
+
+    output.append("\n【P0 Bug客户分布(Top10)】")
+    for cu, c in p0.counts('customer').head(10).items():
+        if str(cu).strip(): output.append(f"  {cu}: {c}")
+
+    output.append("\n【P0 Bug缺陷类型分布】")
+    for dt, c in p0.defect_types().head(10).items():
+        output.append(f"  {dt}: {c}")
+
+    p1_total = p1.count()
+    output.append(f"\n【P1 Bug数量】: {p1_total}")
+    output.append("\n【P1 Bug状态分布】")
+    for s, c in p1.counts('status').items():
+        output.append(f"  {s}: {c}")
+
+    output.append("\n" + "=" * 80)
+    output.append("七、未解决Bug分析")
+    output.append("=" * 80)
+
+    output.append(f"\n【未解决Bug数量】: {unresolved.count()}")
+    output.append("\n【未解决Bug状态分布】")
+    for s, c in unresolved.counts('status').items():
+        output.append(f"  {s}: {c}")
+    output.append("\n【未解决Bug严重程度分布】")
+    for sv, c in unresolved.counts('severity').items():
+        output.append(f"  {sv}: {c}")
+
+    output.append("\n" + "=" * 80)
+    output.append("八、年度关键指标汇总")
+    output.append("=" * 80)
+
+    total = bugs.count()
+    resolved = bugs.count(status='完成')
+    rate = resolved / total * 100 if total > 0 else 0
+
+    p0_res = p0.count(status='完成')
+    p0_rate = p0_res / p0_total * 100 if p0_total > 0 else 0
+
+    p1_res = p1.count(status='完成')
+    p1_rate = p1_res / p1_total * 100 if p1_total > 0 else 0
+
+    output.append(f"\n  总Bug数: {total}")
+    output.append(f"  已解决Bug数: {resolved}")
+    output.append(f"  总体解决率: {rate:.1f}%")
+    output.append(f"\n  P0 Bug总数: {p0_total}")
+    output.append(f"  P0 Bug已解决: {p0_res}")
+    output.append(f"  P0 解决率: {p0_rate:.1f}%")
+    output.append(f"\n  P1 Bug总数: {p1_total}")
+    output.append(f"  P1 Bug已解决: {p1_res}")
+    output.append(f"  P1 解决率: {p1_rate:.1f}%")
+
+    output.extend(latency_report(percentiles))
+    return output
+
+
+def latency_lines(stats, top=None):
+    """One line per group of a percentiles table."""
+    lines = []
+    for name, row in stats.head(top).iterrows():
+        if pd.notna(name) and str(name).strip():
+            lines.append(f"  {name}: {int(row['count'])}个, P50 {row['p50']:.1f}h, "
+                         f"P90 {row['p90']:.1f}h, P99 {row['p99']:.1f}h")
+    return lines
+
+
+def latency_report(percentiles):
+    """
+    Report lines on resolution time (MTTR) percentiles.
+
+    percentiles(dim=None, resolved=True) gives a latency_percentiles()-shaped
+    table: exact from the issue frame, or LatencyAggregates.percentiles when
+    streaming.
+    """
+    output = []
+    output.append("\n" + "=" * 80)
+    output.append("九、Bug解决时长(MTTR)分析")
+    output.append("=" * 80)
+    output.append("(创建日期 → 已解决, 单位小时; 未解决Bug按 已更新 时的存续时长单独统计)")
+
+    output.append("\n【已解决Bug解决时长】")
+    output.extend(latency_lines(percentiles()))
+    output.append("\n【未解决Bug存续时长】")
+    output.extend(latency_lines(percentiles(resolved=False)))
+
+    output.append("\n【按严重程度】")
+    output.extend(latency_lines(percentiles('severity').sort_index()))
+    output.append("\n【按部署类型】")
+    output.extend(latency_lines(percentiles('deployment')))
+    output.append("\n【按解决月份(2025年)】")
+    by_month = percentiles('month').sort_index()
+    output.extend(latency_lines(by_month[[m.year == 2025 for m in by_month.index]]))
+    output.append("\n【按客户(Top10)】")
+    output.extend(latency_lines(percentiles('customer'), 10))
+    output.append("\n【按经办人(Top15)】")
+    output.extend(latency_lines(percentiles('assignee'), 15))
+    return output
+
+
+def bug_chunks(latency):
+    """CSV chunks for the cube, adding each chunk's bugs to latency on the way."""
+    for chunk in iter_jira_chunks(JIRA_CSV, chunksize=CHUNK_ROWS):
+        latency.update(chunk[chunk['问题类型'].isin(BUG_TYPES)])
+        yield chunk
+
+
+# Counts come from the aggregation cube; --stream builds it and the latency
+# sketches in one chunked pass over the CSV export instead of loading it whole.
+# Without --stream the frame is in memory, so latency percentiles are exact.
+if '--stream' in sys.argv:
+    latency = LatencyAggregates()
+    cube = BugCube.from_chunks(bug_chunks(latency))
+    percentiles = latency.percentiles
+else:
+    store = sync_store()
+    cube = load_cube(store)
+    df = load_jira(store)
+    percentiles = partial(latency_percentiles, latency_frame(df[df['问题类型'].isin(BUG_TYPES)]))
+
+output = bug_report(cube, percentiles)
 
 # Write to file
 with open('2025/2025研发质量分析/bug_analysis_result.txt', 'w', encoding='utf-8') as f:
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Issue Link Analysis: tangles, blocker chains and epic rollups
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from jira_data import BUG_TYPES, ISSUE_KEY, load_jira, load_link_graph, sync_store
+
+# Read data
+store = sync_store()
+df = load_jira(store)
+graph = load_link_graph(store, df[ISSUE_KEY])
+bug_keys = df.loc[df['问题类型'].isin(BUG_TYPES), ISSUE_KEY]
+open_keys = df.loc[df['问题类型'].isin(BUG_TYPES) & (df['状态'] != '完成'), ISSUE_KEY]
+open_bugs = graph.mask(open_keys)
+in_export = graph.mask(df[ISSUE_KEY])
+
+output = []
+output.append("=" * 80)
+output.append("2025年度问题链接分析")
+output.append("=" * 80)
+
+output.append("\n【链接概况】")
+output.append(f"  节点数: {len(graph)} (导出内问题 {int(in_export.sum())}, 外部关联事项 {int((~in_export).sum())})")
+linked = graph.mask(graph.edges['src']) | graph.mask(graph.edges['dst'])
+output.append(f"  有链接的Bug: {int((linked & graph.mask(bug_keys)).sum())} / {len(bug_keys)}")
+for t, c in graph.edges['type'].value_counts().items():
+    if c: output.append(f"  {t}: {c}")
+
+# Connected tangles, ignoring direction
+components = graph.components()
+# Component ids are numbered by size, largest first
+tangles = components.value_counts().sort_index()
+tangles = tangles[tangles > 1]
+output.append(f"\n【关联问题簇(Top10)】 共 {len(tangles)} 个")
+for comp, size in tangles.head(10).items():
+    nodes = components.index[components.to_numpy() == comp]
+    n_open = int(open_bugs[graph.index(nodes)].sum())
+    sample = ', '.join(nodes[:5]) + (' ...' if size > 5 else '')
+    output.append(f"  簇{comp + 1}: {size}个事项, 未解决Bug {n_open}个  [{sample}]")
+
+output.append("\n【最长阻塞链】")
+chain = graph.longest_blocker_chain()
+output.append(f"  长度: {max(len(chain) - 1, 0)}")
+if chain:
+    output.append("  " + " → ".join(chain))
+depth = graph.blocker_depth()
+if (depth < 0).any():
+    output.append(f"  循环阻塞事项: {', '.join(depth.index[depth < 0])}")
+
+output.append("\n【被未解决Bug阻塞最多的事项(Top10)】")
+for key, c in graph.blocked(open_bugs).head(10).items():
+    output.append(f"  {key}: {c}个未解决Bug阻塞")
+
+output.append("\n【史诗汇总】")
+rollup = graph.epic_rollup(open_bugs)
+for epic, row in rollup.iterrows():
+    output.append(f"  {epic}: 关联问题 {row['members']}个, 未解决 {row['open_members']}个, "
+                  f"外部阻塞的未解决Bug {row['open_blockers']}个")
+    blockers = graph.blockers_of_epic(epic, open_bugs)
+    if blockers:
+        output.append(f"    阻塞链上的未解决Bug: {', '.join(blockers)}")
+
+# Write to file
+with open('2025/2025研发质量分析/问题链接分析结果.txt', 'w', encoding='utf-8') as f:
+    f.write('\n'.join(output))
+
+print("分析完成，结果已保存到 问题链接分析结果.txt")
@@ -4,78 +4,57 @@
 SaaS Monthly Bug Analysis
 """
 
-import pandas as pd
+import sys
+from pathlib import Path
 import matplotlib.pyplot as plt
 import matplotlib
 from collections import Counter
 import numpy as np
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from jira_data import BUG_TYPES, CHUNK_ROWS, JIRA_CSV, SAAS, aggregate_cube, load_cube, sync_store
+
 # Set Chinese font support
 matplotlib.rcParams['font.sans-serif'] = ['Arial Unicode MS', 'SimHei', 'STHeiti', 'PingFang SC']
 matplotlib.rcParams['axes.unicode_minus'] = False
 
-# Read data
-file_path = '2025/2025研发质量分析/Jira-项目管理 2026-01-30T12_27_55+0800.csv'
-df = pd.read_csv(file_path, encoding='utf-8', low_memory=False)
-bug_df = df[df['问题类型'].isin(['故障', '缺陷', 'Bug', 'bug'])].copy()
-
-# Filter SaaS bugs
-customer_col = '自定义字段(客户名称)'
-env_col = '自定义字段(缺陷发现环境)'
-
-def is_saas(row):
-    env = str(row.get(env_col, '')) if pd.notna(row.get(env_col)) else ''
-    customer = str(row.get(customer_col, '')) if pd.notna(row.get(customer_col)) else ''
-    if 'SaaS' in env or 'saas' in env.lower():
-        return True
-    if customer == 'SaaS客户' or customer == 'SaaS':
-        return True
-    return False
-
-saas_df = bug_df[bug_df.apply(is_saas, axis=1)].copy()
-saas_df['创建日期_parsed'] = pd.to_datetime(saas_df['创建日期'], errors='coerce')
-saas_df['month'] = saas_df['创建日期_parsed'].dt.month
-saas_df['year'] = saas_df['创建日期_parsed'].dt.year
-
-# Filter 2025 data
-saas_2025 = saas_df[saas_df['year'] == 2025].copy()
-
-severity_col = '自定义字段(严重程度)'
-defect_cols = [c for c in bug_df.columns if '缺陷类型' in c]
+# Read data: every number below comes from the aggregation cube.
+# --stream builds it from the CSV export in chunks instead of loading it whole
+if '--stream' in sys.argv:
+    cube = aggregate_cube(JIRA_CSV, chunksize=CHUNK_ROWS)
+else:
+    cube = load_cube(sync_store())
+saas_2025 = cube.where(issue_type=BUG_TYPES, deployment=SAAS, year=2025)
 
 output = []
 output.append("=" * 100)
 output.append("2025年度 SaaS Bug 月度分析报告")
 output.append("=" * 100)
-output.append(f"\nSaaS Bug总数(2025年): {len(saas_2025)}")
+output.append(f"\nSaaS Bug总数(2025年): {saas_2025.count()}")
 
 # Monthly data collection
 monthly_data = {}
 months = range(1, 13)
 
 for m in months:
-    month_df = saas_2025[saas_2025['month'] == m]
+    month_cube = saas_2025.where(month=m)
     
     # Basic counts
-    total = len(month_df)
-    resolved = len(month_df[month_df['状态'] == '完成'])
+    total = month_cube.count()
+    resolved = month_cube.count(status='完成')
     resolution_rate = resolved / total * 100 if total > 0 else 0
     
     # Severity
-    p0 = len(month_df[month_df[severity_col].str.contains('P0', na=False)])
-    p1 = len(month_df[month_df[severity_col].str.contains('P1', na=False)])
-    p2 = len(month_df[month_df[severity_col].str.contains('P2', na=False)])
-    p3 = len(month_df[month_df[severity_col].str.contains('P3', na=False)])
+    p0 = month_cube.count(severity_code=0)
+    p1 = month_cube.count(severity_code=1)
+    p2 = month_cube.count(severity_code=2)
+    p3 = month_cube.count(severity_code=3)
     
     # Defect types
-    defect_types = Counter()
-    for col in defect_cols:
-        for v in month_df[col].dropna():
-            if v and str(v).strip():
-                defect_types[str(v).strip()] += 1
+    defect_types = month_cube.defect_types()
     
     # Status
-    status_counts = month_df['状态'].value_counts().to_dict()
+    status_counts = month_cube.counts('status').to_dict()
     
     monthly_data[m] = {
         'total': total,
@@ -102,7 +81,7 @@ for m in months:
         output.append(f"    - {s}: {c}")
     
     output.append(f"  缺陷类型Top5:")
-    for dt, c in data['defect_types'].most_common(5):
+    for dt, c in data['defect_types'].head(5).items():
         output.append(f"    - {dt}: {c}")
 
 # Summary table
@@ -180,7 +159,7 @@ ax3 = fig.add_subplot(3, 2, 3)
 # Get top defect types across all months
 all_defects = Counter()
 for m in months:
-    all_defects.update(monthly_data[m]['defect_types'])
+    all_defects.update(monthly_data[m]['defect_types'].to_dict())
 top_defects = [d[0] for d in all_defects.most_common(8)]
 
 # Create matrix
@@ -4,66 +4,36 @@
 SaaS vs Private Deployment Bug Analysis
 """
 
+import sys
+from pathlib import Path
 import pandas as pd
 import matplotlib.pyplot as plt
 import matplotlib
-from collections import Counter
 import numpy as np
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from jira_data import (BUG_TYPES, CHUNK_ROWS, JIRA_CSV, PRIVATE, SAAS, UNCLASSIFIED, aggregate_cube, load_cube,
+                       sync_store)
+
 # Set Chinese font support
 matplotlib.rcParams['font.sans-serif'] = ['Arial Unicode MS', 'SimHei', 'STHeiti', 'PingFang SC']
 matplotlib.rcParams['axes.unicode_minus'] = False
 
-# Read data
-file_path = '2025/2025研发质量分析/Jira-项目管理 2026-01-30T12_27_55+0800.csv'
-df = pd.read_csv(file_path, encoding='utf-8', low_memory=False)
-bug_df = df[df['问题类型'].isin(['故障', '缺陷', 'Bug', 'bug'])].copy()
-
-# Classify SaaS vs Private based on environment and customer
-env_col = '自定义字段(缺陷发现环境)'
-customer_col = '自定义字段(客户名称)'
-
-def classify_deployment(row):
-    env = str(row.get(env_col, '')) if pd.notna(row.get(env_col)) else ''
-    customer = str(row.get(customer_col, '')) if pd.notna(row.get(customer_col)) else ''
-    
-    # Check environment first
-    if 'SaaS' in env or 'saas' in env.lower():
-        return 'SaaS'
-    if '私有化' in env:
-        return '私有化'
-    
-    # Check customer name
-    if customer == 'SaaS客户' or 'SaaS' in customer:
-        return 'SaaS'
-    
-    # SDK customers are typically private deployment
-    if 'SDK' in customer or 'sdk' in customer.lower():
-        return '私有化'
-    
-    # Known private customers
-    private_keywords = ['福田', '南方电网', 'OPPO', '广东电信', '唯品会', '好未来', '招商', 
-                       '新华三', '跨越', 'TCL', '百度', '小红书', '格力', '猿辅导', 
-                       '360', '玉溪', '东风', '融云', '滴滴', '作业帮']
-    for kw in private_keywords:
-        if kw in customer:
-            return '私有化'
-    
-    # Default based on environment content
-    if customer and customer.strip():
-        return '私有化'
-    
-    return '未分类'
-
-bug_df['部署类型'] = bug_df.apply(classify_deployment, axis=1)
-
-# Separate dataframes
-saas_df = bug_df[bug_df['部署类型'] == 'SaaS']
-private_df = bug_df[bug_df['部署类型'] == '私有化']
-unclassified_df = bug_df[bug_df['部署类型'] == '未分类']
-
-severity_col = '自定义字段(严重程度)'
-defect_cols = [c for c in bug_df.columns if '缺陷类型' in c]
+# Read data: every number below comes from the aggregation cube.
+# --stream builds it from the CSV export in chunks instead of loading it whole
+if '--stream' in sys.argv:
+    cube = aggregate_cube(JIRA_CSV, chunksize=CHUNK_ROWS)
+else:
+    cube = load_cube(sync_store())
+bugs = cube.where(issue_type=BUG_TYPES)
+
+# SaaS vs Private label, classified once by the loader
+saas = bugs.where(deployment=SAAS)
+private = bugs.where(deployment=PRIVATE)
+bug_total = bugs.count()
+saas_total = saas.count()
+private_total = private.count()
+unclassified_total = bugs.count(deployment=UNCLASSIFIED)
 
 # Output analysis results
 output = []
@@ -72,105 +42,95 @@ output.append("2025年度Bug分析报告 - SaaS vs 私有化对比")
 output.append("=" * 80)
 
 output.append(f"\n【数据分类概况】")
-output.append(f"  SaaS Bug数量: {len(saas_df)}")
-output.append(f"  私有化 Bug数量: {len(private_df)}")
-output.append(f"  未分类 Bug数量: {len(unclassified_df)}")
-output.append(f"  总计: {len(bug_df)}")
+output.append(f"  SaaS Bug数量: {saas_total}")
+output.append(f"  私有化 Bug数量: {private_total}")
+output.append(f"  未分类 Bug数量: {unclassified_total}")
+output.append(f"  总计: {bug_total}")
 
 # ========== SaaS Analysis ==========
 output.append("\n" + "=" * 80)
 output.append("一、SaaS Bug分析")
 output.append("=" * 80)
 
-output.append(f"\n【SaaS Bug总数】: {len(saas_df)}")
+output.append(f"\n【SaaS Bug总数】: {saas_total}")
 
 output.append("\n【状态分布】")
-for s, c in saas_df['状态'].value_counts().items():
+for s, c in saas.counts('status').items():
     output.append(f"  {s}: {c}")
 
 output.append("\n【严重程度分布】")
-for s, c in saas_df[severity_col].value_counts().items():
+for s, c in saas.counts('severity').items():
     if pd.notna(s): output.append(f"  {s}: {c}")
 
 output.append("\n【缺陷类型分布】")
-saas_defects = Counter()
-for col in defect_cols:
-    for v in saas_df[col].dropna():
-        if v and str(v).strip(): saas_defects[str(v).strip()] += 1
-for dt, c in saas_defects.most_common(10):
+saas_defects = saas.defect_types()
+for dt, c in saas_defects.head(10).items():
     output.append(f"  {dt}: {c}")
 
 # SaaS monthly trend
-saas_df['创建日期_parsed'] = pd.to_datetime(saas_df['创建日期'], errors='coerce')
-saas_2025 = saas_df[saas_df['创建日期_parsed'].dt.year == 2025]
 output.append("\n【月度趋势(2025年)】")
-saas_monthly = saas_2025.groupby(saas_2025['创建日期_parsed'].dt.month).size()
+saas_monthly = saas.counts('month', year=2025)
 for m in range(1, 13):
     output.append(f"  {m}月: {saas_monthly.get(m, 0)}")
 
 # SaaS P0/P1
-saas_p0 = saas_df[saas_df[severity_col].str.contains('P0', na=False)]
-saas_p1 = saas_df[saas_df[severity_col].str.contains('P1', na=False)]
-saas_resolved = len(saas_df[saas_df['状态'] == '完成'])
-saas_p0_resolved = len(saas_p0[saas_p0['状态'] == '完成'])
-saas_p1_resolved = len(saas_p1[saas_p1['状态'] == '完成'])
+saas_p0_total = saas.count(severity_code=0)
+saas_p1_total = saas.count(severity_code=1)
+saas_resolved = saas.count(status='完成')
+saas_p0_resolved = saas.count(severity_code=0, status='完成')
+saas_p1_resolved = saas.count(severity_code=1, status='完成')
 
 output.append(f"\n【SaaS关键指标】")
-output.append(f"  总数: {len(saas_df)}, 已解决: {saas_resolved}, 解决率: {saas_resolved/len(saas_df)*100:.1f}%")
-output.append(f"  P0: {len(saas_p0)}, 已解决: {saas_p0_resolved}, 解决率: {saas_p0_resolved/len(saas_p0)*100 if len(saas_p0) else 0:.1f}%")
-output.append(f"  P1: {len(saas_p1)}, 已解决: {saas_p1_resolved}, 解决率: {saas_p1_resolved/len(saas_p1)*100 if len(saas_p1) else 0:.1f}%")
+output.append(f"  总数: {saas_total}, 已解决: {saas_resolved}, 解决率: {saas_resolved/saas_total*100:.1f}%")
+output.append(f"  P0: {saas_p0_total}, 已解决: {saas_p0_resolved}, 解决率: {saas_p0_resolved/saas_p0_total*100 if saas_p0_total else 0:.1f}%")
+output.append(f"  P1: {saas_p1_total}, 已解决: {saas_p1_resolved}, 解决率: {saas_p1_resolved/saas_p1_total*100 if saas_p1_total else 0:.1f}%")
 
 # ========== Private Analysis ==========
 output.append("\n" + "=" * 80)
 output.append("二、私有化 Bug分析")
 output.append("=" * 80)
 
-output.append(f"\n【私有化 Bug总数】: {len(private_df)}")
+output.append(f"\n【私有化 Bug总数】: {private_total}")
 
 output.append("\n【状态分布】")
-for s, c in private_df['状态'].value_counts().items():
+for s, c in private.counts('status').items():
     output.append(f"  {s}: {c}")
 
 output.append("\n【严重程度分布】")
-for s, c in private_df[severity_col].value_counts().items():
+for s, c in private.counts('severity').items():
     if pd.notna(s): output.append(f"  {s}: {c}")
 
 output.append("\n【缺陷类型分布】")
-private_defects = Counter()
-for col in defect_cols:
-    for v in private_df[col].dropna():
-        if v and str(v).strip(): private_defects[str(v).strip()] += 1
-for dt, c in private_defects.most_common(10):
+private_defects = private.defect_types()
+for dt, c in private_defects.head(10).items():
     output.append(f"  {dt}: {c}")
 
 # Private monthly trend
-private_df['创建日期_parsed'] = pd.to_datetime(private_df['创建日期'], errors='coerce')
-private_2025 = private_df[private_df['创建日期_parsed'].dt.year == 2025]
 output.append("\n【月度趋势(2025年)】")
-private_monthly = private_2025.groupby(private_2025['创建日期_parsed'].dt.month).size()
+private_monthly = private.counts('month', year=2025)
 for m in range(1, 13):
     output.append(f"  {m}月: {private_monthly.get(m, 0)}")
 
 # Private customers breakdown
 output.append("\n【私有化客户Bug分布Top15】")
-for cu, c in private_df[customer_col].value_counts().head(15).items():
+for cu, c in private.counts('customer').head(15).items():
     if pd.notna(cu) and str(cu).strip(): output.append(f"  {cu}: {c}")
 
 # Private P0/P1
-private_p0 = private_df[private_df[severity_col].str.contains('P0', na=False)]
-private_p1 = private_df[private_df[severity_col].str.contains('P1', na=False)]
-private_resolved = len(private_df[private_df['状态'] == '完成'])
-private_p0_resolved = len(private_p0[private_p0['状态'] == '完成'])
-private_p1_resolved = len(private_p1[private_p1['状态'] == '完成'])
+private_p0_total = private.count(severity_code=0)
+private_p1_total = private.count(severity_code=1)
+private_resolved = private.count(status='完成')
+private_p0_resolved = private.count(severity_code=0, status='完成')
+private_p1_resolved = private.count(severity_code=1, status='完成')
 
 output.append(f"\n【私有化关键指标】")
-output.append(f"  总数: {len(private_df)}, 已解决: {private_resolved}, 解决率: {private_resolved/len(private_df)*100:.1f}%")
-output.append(f"  P0: {len(private_p0)}, 已解决: {private_p0_resolved}, 解决率: {private_p0_resolved/len(private_p0)*100 if len(private_p0) else 0:.1f}%")
-output.append(f"  P1: {len(private_p1)}, 已解决: {private_p1_resolved}, 解决率: {private_p1_resolved/len(private_p1)*100 if len(private_p1) else 0:.1f}%")
+output.append(f"  总数: {private_total}, 已解决: {private_resolved}, 解决率: {private_resolved/private_total*100:.1f}%")
+output.append(f"  P0: {private_p0_total}, 已解决: {private_p0_resolved}, 解决率: {private_p0_resolved/private_p0_total*100 if private_p0_total else 0:.1f}%")
+output.append(f"  P1: {private_p1_total}, 已解决: {private_p1_resolved}, 解决率: {private_p1_resolved/private_p1_total*100 if private_p1_total else 0:.1f}%")
 
 # P0 customers for private
 output.append("\n【私有化P0问题客户分布】")
-for cu, c in private_p0[customer_col].value_counts().items():
+for cu, c in private.counts('customer', severity_code=0).items():
     if pd.notna(cu) and str(cu).strip(): output.append(f"  {cu}: {c}")
 
 # ========== Comparison ==========
@@ -179,20 +139,20 @@ output.append("三、SaaS vs 私有化 对比汇总")
 output.append("=" * 80)
 
 output.append("\n【Bug数量对比】")
-output.append(f"  SaaS: {len(saas_df)} ({len(saas_df)/len(bug_df)*100:.1f}%)")
-output.append(f"  私有化: {len(private_df)} ({len(private_df)/len(bug_df)*100:.1f}%)")
+output.append(f"  SaaS: {saas_total} ({saas_total/bug_total*100:.1f}%)")
+output.append(f"  私有化: {private_total} ({private_total/bug_total*100:.1f}%)")
 
 output.append("\n【解决率对比】")
-output.append(f"  SaaS: {saas_resolved/len(saas_df)*100:.1f}%")
-output.append(f"  私有化: {private_resolved/len(private_df)*100:.1f}%")
+output.append(f"  SaaS: {saas_resolved/saas_total*100:.1f}%")
+output.append(f"  私有化: {private_resolved/private_total*100:.1f}%")
 
 output.append("\n【P0解决率对比】")
-output.append(f"  SaaS P0: {len(saas_p0)}个, 解决率 {saas_p0_resolved/len(saas_p0)*100 if len(saas_p0) else 0:.1f}%")
-output.append(f"  私有化 P0: {len(private_p0)}个, 解决率 {private_p0_resolved/len(private_p0)*100 if len(private_p0) else 0:.1f}%")
+output.append(f"  SaaS P0: {saas_p0_total}个, 解决率 {saas_p0_resolved/saas_p0_total*100 if saas_p0_total else 0:.1f}%")
+output.append(f"  私有化 P0: {private_p0_total}个, 解决率 {private_p0_resolved/private_p0_total*100 if private_p0_total else 0:.1f}%")
 
 output.append("\n【P1解决率对比】")
-output.append(f"  SaaS P1: {len(saas_p1)}个, 解决率 {saas_p1_resolved/len(saas_p1)*100 if len(saas_p1) else 0:.1f}%")
-output.append(f"  私有化 P1: {len(private_p1)}个, 解决率 {private_p1_resolved/len(private_p1)*100 if len(private_p1) else 0:.1f}%")
+output.append(f"  SaaS P1: {saas_p1_total}个, 解决率 {saas_p1_resolved/saas_p1_total*100 if saas_p1_total else 0:.1f}%")
+output.append(f"  私有化 P1: {private_p1_total}个, 解决率 {private_p1_resolved/private_p1_total*100 if private_p1_total else 0:.1f}%")
 
 # Write results
 with open('2025/2025研发质量分析/SaaS私有化对比分析结果.txt', 'w', encoding='utf-8') as f:
@@ -208,8 +168,8 @@ fig1 = plt.figure(figsize=(20, 16))
 
 # 1.1 Bug count comparison (pie)
 ax1 = fig1.add_subplot(2, 3, 1)
-sizes = [len(saas_df), len(private_df), len(unclassified_df)]
-labels = [f'SaaS\n{len(saas_df)}个', f'私有化\n{len(private_df)}个', f'未分类\n{len(unclassified_df)}个']
+sizes = [saas_total, private_total, unclassified_total]
+labels = [f'SaaS\n{saas_total}个', f'私有化\n{private_total}个', f'未分类\n{unclassified_total}个']
 colors = ['#3498DB', '#E74C3C', '#95A5A6']
 if sizes[2] == 0:
     sizes = sizes[:2]
@@ -222,7 +182,7 @@ ax1.set_title('Bug数量分布: SaaS vs 私有化', fontsize=14, fontweight='bol
 # 1.2 Resolution rate comparison
 ax2 = fig1.add_subplot(2, 3, 2)
 categories = ['SaaS', '私有化']
-totals = [len(saas_df), len(private_df)]
+totals = [saas_total, private_total]
 resolved_counts = [saas_resolved, private_resolved]
 x = np.arange(len(categories))
 width = 0.35
@@ -242,7 +202,7 @@ ax2.spines['right'].set_visible(False)
 # 1.3 P0/P1 comparison
 ax3 = fig1.add_subplot(2, 3, 3)
 p_categories = ['SaaS P0', 'SaaS P1', '私有化 P0', '私有化 P1']
-p_totals = [len(saas_p0), len(saas_p1), len(private_p0), len(private_p1)]
+p_totals = [saas_p0_total, saas_p1_total, private_p0_total, private_p1_total]
 p_resolved = [saas_p0_resolved, saas_p1_resolved, private_p0_resolved, private_p1_resolved]
 x3 = np.arange(len(p_categories))
 bars_p_total = ax3.bar(x3 - width/2, p_totals, width, label='总数', color='#F5B7B1')
@@ -278,7 +238,7 @@ ax4.spines['right'].set_visible(False)
 
 # 1.5 SaaS severity distribution
 ax5 = fig1.add_subplot(2, 3, 5)
-saas_severity = saas_df[severity_col].value_counts()
+saas_severity = saas.counts('severity')
 sev_labels = ['P2', 'P3', 'P1', 'P0']
 sev_values = [saas_severity.get('P2（非核心功能问题）', 0),
               saas_severity.get('P3（不影响客户功能使用问题）', 0),
@@ -296,7 +256,7 @@ ax5.spines['right'].set_visible(False)
 
 # 1.6 Private severity distribution
 ax6 = fig1.add_subplot(2, 3, 6)
-private_severity = private_df[severity_col].value_counts()
+private_severity = private.counts('severity')
 priv_sev_values = [private_severity.get('P2（非核心功能问题）', 0),
                    private_severity.get('P3（不影响客户功能使用问题）', 0),
                    private_severity.get('P1（核心功能问题）', 0),
@@ -319,7 +279,7 @@ fig2 = plt.figure(figsize=(20, 12))
 
 # 2.1 SaaS defect types
 ax21 = fig2.add_subplot(2, 3, 1)
-saas_defect_items = saas_defects.most_common(8)
+saas_defect_items = list(saas_defects.head(8).items())
 saas_dt_names = [d[0] for d in saas_defect_items][::-1]
 saas_dt_values = [d[1] for d in saas_defect_items][::-1]
 colors_dt = plt.cm.Blues(np.linspace(0.3, 0.9, len(saas_dt_names)))
@@ -334,7 +294,7 @@ ax21.spines['right'].set_visible(False)
 
 # 2.2 Private defect types
 ax22 = fig2.add_subplot(2, 3, 2)
-private_defect_items = private_defects.most_common(8)
+private_defect_items = list(private_defects.head(8).items())
 priv_dt_names = [d[0] for d in private_defect_items][::-1]
 priv_dt_values = [d[1] for d in private_defect_items][::-1]
 colors_dt2 = plt.cm.Oranges(np.linspace(0.3, 0.9, len(priv_dt_names)))
@@ -349,7 +309,7 @@ ax22.spines['right'].set_visible(False)
 
 # 2.3 Private customers
 ax23 = fig2.add_subplot(2, 3, 3)
-priv_cust = private_df[customer_col].value_counts().head(10)
+priv_cust = private.counts('customer').head(10)
 priv_cust_names = list(priv_cust.index)[::-1]
 priv_cust_values = list(priv_cust.values)[::-1]
 colors_cust = plt.cm.Reds(np.linspace(0.3, 0.9, len(priv_cust_names)))
@@ -392,7 +352,7 @@ ax24.spines['right'].set_visible(False)
 
 # 2.5 Private P0 customers
 ax25 = fig2.add_subplot(2, 3, 5)
-p0_cust = private_p0[customer_col].value_counts()
+p0_cust = private.counts('customer', severity_code=0)
 if len(p0_cust) > 0:
     p0_cust_names = list(p0_cust.index)
     p0_cust_values = list(p0_cust.values)
@@ -413,20 +373,20 @@ summary_text = f"""
 ╠══════════════════════════════════════════╣
 ║                                          ║
 ║  【Bug数量】                              ║
-║    SaaS:    {len(saas_df):>5}个  ({len(saas_df)/len(bug_df)*100:>5.1f}%)       ║
-║    私有化:  {len(private_df):>5}个  ({len(private_df)/len(bug_df)*100:>5.1f}%)       ║
+║    SaaS:    {saas_total:>5}个  ({saas_total/bug_total*100:>5.1f}%)       ║
+║    私有化:  {private_total:>5}个  ({private_total/bug_total*100:>5.1f}%)       ║
 ║                                          ║
 ║  【总体解决率】                           ║
-║    SaaS:    {saas_resolved/len(saas_df)*100:>5.1f}%                   ║
-║    私有化:  {private_resolved/len(private_df)*100:>5.1f}%                   ║
+║    SaaS:    {saas_resolved/saas_total*100:>5.1f}%                   ║
+║    私有化:  {private_resolved/private_total*100:>5.1f}%                   ║
 ║                                          ║
 ║  【P0阻塞问题】                           ║
-║    SaaS:    {len(saas_p0):>3}个, 解决率 {saas_p0_resolved/len(saas_p0)*100 if len(saas_p0) else 0:>5.1f}%     ║
-║    私有化:  {len(private_p0):>3}个, 解决率 {private_p0_resolved/len(private_p0)*100 if len(private_p0) else 0:>5.1f}%     ║
+║    SaaS:    {saas_p0_total:>3}个, 解决率 {saas_p0_resolved/saas_p0_total*100 if saas_p0_total else 0:>5.1f}%     ║
+║    私有化:  {private_p0_total:>3}个, 解决率 {private_p0_resolved/private_p0_total*100 if private_p0_total else 0:>5.1f}%     ║
 ║                                          ║
 ║  【P1核心问题】                           ║
-║    SaaS:    {len(saas_p1):>3}个, 解决率 {saas_p1_resolved/len(saas_p1)*100 if len(saas_p1) else 0:>5.1f}%     ║
-║    私有化:  {len(private_p1):>3}个, 解决率 {private_p1_resolved/len(private_p1)*100 if len(private_p1) else 0:>5.1f}%     ║
+║    SaaS:    {saas_p1_total:>3}个, 解决率 {saas_p1_resolved/saas_p1_total*100 if saas_p1_total else 0:>5.1f}%     ║
+║    私有化:  {private_p1_total:>3}个, 解决率 {private_p1_resolved/private_p1_total*100 if private_p1_total else 0:>5.1f}%     ║
 ║                                          ║
 ╚══════════════════════════════════════════╝
 """
@@ -4,29 +4,35 @@
 Bug Data Visualization
 """
 
-import pandas as pd
+import sys
+from pathlib import Path
 import matplotlib.pyplot as plt
 import matplotlib
-from collections import Counter
 import numpy as np
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from jira_data import (BUG_TYPES, DEPLOYMENT_COL, latency_frame, latency_percentiles, load_cube, load_jira,
+                       open_backlog, sync_store)
+
 # Set Chinese font support
 matplotlib.rcParams['font.sans-serif'] = ['Arial Unicode MS', 'SimHei', 'STHeiti', 'PingFang SC']
 matplotlib.rcParams['axes.unicode_minus'] = False
 
-# Read data
-file_path = '2025/2025研发质量分析/Jira-项目管理 2026-01-30T12_27_55+0800.csv'
-df = pd.read_csv(file_path, encoding='utf-8', low_memory=False)
-bug_df = df[df['问题类型'].isin(['故障', '缺陷', 'Bug', 'bug'])].copy()
+# Read data: counts come from the aggregation cube, the per-issue frame is
+# only needed for resolution times and the backlog sweep
+store = sync_store()
+bugs = load_cube(store).where(issue_type=BUG_TYPES)
+p0 = bugs.where(severity_code=0)
+p1 = bugs.where(severity_code=1)
+df = load_jira(store)
+bug_df = df[df['问题类型'].isin(BUG_TYPES)]
 
 # Create figure with multiple subplots
 fig = plt.figure(figsize=(20, 24))
 
 # 1. Monthly trend chart
 ax1 = fig.add_subplot(3, 2, 1)
-bug_df['创建日期_parsed'] = pd.to_datetime(bug_df['创建日期'], errors='coerce')
-y2025 = bug_df[bug_df['创建日期_parsed'].dt.year == 2025]
-monthly = y2025.groupby(y2025['创建日期_parsed'].dt.month).size()
+monthly = bugs.counts('month', year=2025)
 months = ['1月', '2月', '3月', '4月', '5月', '6月', '7月', '8月', '9月', '10月', '11月', '12月']
 values = [monthly.get(i, 0) for i in range(1, 13)]
 bars = ax1.bar(months, values, color='#4A90D9', edgecolor='white', linewidth=0.7)
@@ -45,7 +51,7 @@ ax1.spines['right'].set_visible(False)
 # 2. Severity distribution pie chart
 ax2 = fig.add_subplot(3, 2, 2)
 severity_col = '自定义字段(严重程度)'
-severity_counts = bug_df[severity_col].value_counts()
+severity_counts = bugs.counts('severity')
 labels = ['P2\n非核心功能问题', 'P3\n不影响功能', 'P1\n核心功能问题', 'P0\n阻塞性问题']
 sizes = [severity_counts.get('P2（非核心功能问题）', 0), 
          severity_counts.get('P3（不影响客户功能使用问题）', 0),
@@ -62,15 +68,9 @@ for autotext in autotexts:
 
 # 3. Defect type bar chart (horizontal)
 ax3 = fig.add_subplot(3, 2, 3)
-defect_cols = [c for c in bug_df.columns if '缺陷类型' in c]
-defect_types = Counter()
-for col in defect_cols:
-    for v in bug_df[col].dropna():
-        if v and str(v).strip(): 
-            defect_types[str(v).strip()] += 1
-top_defects = defect_types.most_common(10)
-defect_names = [d[0] for d in top_defects][::-1]
-defect_values = [d[1] for d in top_defects][::-1]
+top_defects = bugs.defect_types().head(10)
+defect_names = list(top_defects.index)[::-1]
+defect_values = list(top_defects)[::-1]
 colors_defect = plt.cm.Blues(np.linspace(0.3, 0.9, len(defect_names)))
 bars3 = ax3.barh(defect_names, defect_values, color=colors_defect, edgecolor='white', height=0.7)
 ax3.set_title('Bug缺陷类型分布 Top10', fontsize=14, fontweight='bold', pad=15)
@@ -83,7 +83,7 @@ ax3.spines['right'].set_visible(False)
 
 # 4. Status distribution
 ax4 = fig.add_subplot(3, 2, 4)
-status_counts = bug_df['状态'].value_counts()
+status_counts = bugs.counts('status')
 status_labels = ['完成', '待办', '挂起中', '处理中', '其他']
 status_values = [status_counts.get('完成', 0), 
                  status_counts.get('待办', 0),
@@ -100,8 +100,7 @@ for autotext in autotexts4:
 
 # 5. Top customers bar chart
 ax5 = fig.add_subplot(3, 2, 5)
-customer_col = '自定义字段(客户名称)'
-customer_counts = bug_df[customer_col].value_counts().head(10)
+customer_counts = bugs.counts('customer').head(10)
 customer_names = list(customer_counts.index)[::-1]
 customer_values = list(customer_counts.values)[::-1]
 colors_customer = plt.cm.Oranges(np.linspace(0.3, 0.9, len(customer_names)))
@@ -116,14 +115,12 @@ ax5.spines['right'].set_visible(False)
 
 # 6. P0/P1 resolution rate comparison
 ax6 = fig.add_subplot(3, 2, 6)
-p0_df = bug_df[bug_df[severity_col].str.contains('P0', na=False)]
-p1_df = bug_df[bug_df[severity_col].str.contains('P1', na=False)]
-p0_total = len(p0_df)
-p0_resolved = len(p0_df[p0_df['状态'] == '完成'])
-p1_total = len(p1_df)
-p1_resolved = len(p1_df[p1_df['状态'] == '完成'])
-total_bugs = len(bug_df)
-total_resolved = len(bug_df[bug_df['状态'] == '完成'])
+p0_total = p0.count()
+p0_resolved = p0.count(status='完成')
+p1_total = p1.count()
+p1_resolved = p1.count(status='完成')
+total_bugs = bugs.count()
+total_resolved = bugs.count(status='完成')
 
 categories = ['P0阻塞性问题', 'P1核心功能问题', '总体']
 totals = [p0_total, p1_total, total_bugs]
@@ -181,7 +178,7 @@ ax7.spines['right'].set_visible(False)
 
 # P0 customer distribution
 ax8 = fig2.add_subplot(2, 2, 2)
-p0_customers = p0_df[customer_col].value_counts()
+p0_customers = p0.counts('customer')
 p0_cust_names = list(p0_customers.index)
 p0_cust_values = list(p0_customers.values)
 colors_p0 = plt.cm.Reds(np.linspace(0.3, 0.9, len(p0_cust_names)))
@@ -193,7 +190,7 @@ for autotext in autotexts8:
 
 # Assignee workload
 ax9 = fig2.add_subplot(2, 2, 3)
-assignee_counts = bug_df['经办人'].value_counts().head(10)
+assignee_counts = bugs.counts('assignee').head(10)
 assignee_names = list(assignee_counts.index)[::-1]
 assignee_values = list(assignee_counts.values)[::-1]
 colors_assignee = plt.cm.Greens(np.linspace(0.3, 0.9, len(assignee_names)))
@@ -208,14 +205,9 @@ ax9.spines['right'].set_visible(False)
 
 # P0 defect types
 ax10 = fig2.add_subplot(2, 2, 4)
-p0_types = Counter()
-for col in defect_cols:
-    for v in p0_df[col].dropna():
-        if v and str(v).strip(): 
-            p0_types[str(v).strip()] += 1
-p0_type_items = p0_types.most_common()
-p0_type_names = [d[0] for d in p0_type_items]
-p0_type_values = [d[1] for d in p0_type_items]
+p0_types = p0.defect_types()
+p0_type_names = list(p0_types.index)
+p0_type_values = list(p0_types)
 colors_p0_type = plt.cm.Purples(np.linspace(0.3, 0.9, len(p0_type_names)))
 bars10 = ax10.bar(range(len(p0_type_names)), p0_type_values, color=colors_p0_type, edgecolor='white')
 ax10.set_title('P0问题缺陷类型分布', fontsize=14, fontweight='bold', pad=15)
@@ -233,3 +225,116 @@ plt.savefig('2025/2025研发质量分析/2025年度Bug分析图表2.png', dpi=15
 plt.close()
 
 print("图表已保存到: 2025/2025研发质量分析/2025年度Bug分析图表2.png")
+
+# Third figure: resolution time (MTTR) percentiles
+latency = latency_frame(bug_df)
+fig3 = plt.figure(figsize=(16, 10))
+pct_cols = ['p50', 'p90', 'p99']
+pct_colors = ['#27AE60', '#F39C12', '#E74C3C']
+
+# Percentiles per severity
+ax11 = fig3.add_subplot(2, 2, 1)
+sev_latency = latency_percentiles(latency, 'severity').sort_index()
+x11 = np.arange(len(sev_latency))
+for i, (col, color) in enumerate(zip(pct_cols, pct_colors)):
+    ax11.bar(x11 + (i - 1) * 0.25, sev_latency[col], 0.25, label=col.upper(), color=color, edgecolor='white')
+ax11.set_title('各严重程度Bug解决时长', fontsize=14, fontweight='bold', pad=15)
+ax11.set_ylabel('小时', fontsize=11)
+ax11.set_xticks(x11)
+ax11.set_xticklabels([str(s).split('（')[0] for s in sev_latency.index], fontsize=10)
+ax11.legend()
+ax11.spines['top'].set_visible(False)
+ax11.spines['right'].set_visible(False)
+
+# Percentiles per deployment
+ax12 = fig3.add_subplot(2, 2, 2)
+dep_latency = latency_percentiles(latency, 'deployment')
+x12 = np.arange(len(dep_latency))
+for i, (col, color) in enumerate(zip(pct_cols, pct_colors)):
+    ax12.bar(x12 + (i - 1) * 0.25, dep_latency[col], 0.25, label=col.upper(), color=color, edgecolor='white')
+ax12.set_title('SaaS/私有化Bug解决时长', fontsize=14, fontweight='bold', pad=15)
+ax12.set_ylabel('小时', fontsize=11)
+ax12.set_xticks(x12)
+ax12.set_xticklabels(list(dep_latency.index), fontsize=10)
+ax12.legend()
+ax12.spines['top'].set_visible(False)
+ax12.spines['right'].set_visible(False)
+
+# Monthly trend (resolution month)
+ax13 = fig3.add_subplot(2, 2, (3, 4))
+month_latency = latency_percentiles(latency, 'month').sort_index()
+month_latency = month_latency[[m.year == 2025 for m in month_latency.index]]
+month_labels = [f'{m.month}月' for m in month_latency.index]
+for col, color in zip(pct_cols, pct_colors):
+    ax13.plot(month_labels, month_latency[col], 'o-', color=color, linewidth=2, markersize=7, label=col.upper())
+ax13.set_title('2025年月度Bug解决时长趋势(按解决月份)', fontsize=14, fontweight='bold', pad=15)
+ax13.set_ylabel('小时', fontsize=11)
+ax13.legend()
+ax13.grid(axis='y', alpha=0.3)
+ax13.spines['top'].set_visible(False)
+ax13.spines['right'].set_visible(False)
+
+plt.tight_layout(pad=3.0)
+plt.savefig('2025/2025研发质量分析/2025年度Bug解决时长图表.png', dpi=150, bbox_inches='tight', facecolor='white')
+plt.close()
+
+print("图表已保存到: 2025/2025研发质量分析/2025年度Bug解决时长图表.png")
+
+# Fourth figure: open backlog per day (creation +1, resolution -1)
+fig4 = plt.figure(figsize=(16, 10))
+backlog_range = dict(start='2025-01-01', end='2025-12-31')
+
+# Total open backlog
+ax14 = fig4.add_subplot(2, 2, 1)
+total_backlog = open_backlog(bug_df, **backlog_range).iloc[:, 0]
+ax14.plot(total_backlog.index, total_backlog.values, color='#4A90D9', linewidth=2)
+ax14.fill_between(total_backlog.index, total_backlog.values, color='#4A90D9', alpha=0.2)
+ax14.set_title('2025年未解决Bug积压趋势', fontsize=14, fontweight='bold', pad=15)
+ax14.set_ylabel('未解决Bug数', fontsize=11)
+ax14.spines['top'].set_visible(False)
+ax14.spines['right'].set_visible(False)
+
+# Open backlog per severity
+ax15 = fig4.add_subplot(2, 2, 2)
+sev_backlog = open_backlog(bug_df, by=severity_col, **backlog_range)
+sev_backlog = sev_backlog[sorted(sev_backlog.columns)]
+ax15.stackplot(sev_backlog.index, sev_backlog.T.values,
+               labels=[str(s).split('（')[0] for s in sev_backlog.columns],
+               colors=['#E74C3C', '#F39C12', '#F1C40F', '#27AE60'][:len(sev_backlog.columns)], alpha=0.8)
+ax15.set_title('各严重程度未解决Bug积压', fontsize=14, fontweight='bold', pad=15)
+ax15.set_ylabel('未解决Bug数', fontsize=11)
+ax15.legend(loc='upper left')
+ax15.spines['top'].set_visible(False)
+ax15.spines['right'].set_visible(False)
+
+# Open backlog per deployment
+ax16 = fig4.add_subplot(2, 2, 3)
+dep_backlog = open_backlog(bug_df, by=DEPLOYMENT_COL, **backlog_range)
+dep_colors = {'SaaS': '#3498DB', '私有化': '#E74C3C', '未分类': '#95A5A6'}
+for dep in dep_backlog.columns:
+    ax16.plot(dep_backlog.index, dep_backlog[dep], color=dep_colors.get(dep), linewidth=2, label=dep)
+ax16.set_title('SaaS/私有化未解决Bug积压', fontsize=14, fontweight='bold', pad=15)
+ax16.set_ylabel('未解决Bug数', fontsize=11)
+ax16.legend()
+ax16.spines['top'].set_visible(False)
+ax16.spines['right'].set_visible(False)
+
+# Open load of the assignees with the largest year-end backlog
+ax17 = fig4.add_subplot(2, 2, 4)
+assignee_backlog = open_backlog(bug_df, by='经办人', **backlog_range)
+top_assignees = assignee_backlog.iloc[-1].sort_values(ascending=False, kind='stable').head(6).index
+colors_backlog = plt.cm.tab10(np.arange(len(top_assignees)))
+for name, color in zip(top_assignees, colors_backlog):
+    ax17.plot(assignee_backlog.index, assignee_backlog[name], color=color, linewidth=1.8, label=name)
+ax17.set_title('经办人未解决Bug负载 Top6(年末)', fontsize=14, fontweight='bold', pad=15)
+ax17.set_ylabel('未解决Bug数', fontsize=11)
+ax17.legend(fontsize=9)
+ax17.spines['top'].set_visible(False)
+ax17.spines['right'].set_visible(False)
+
+fig4.autofmt_xdate()
+plt.tight_layout(pad=3.0)
+plt.savefig('2025/2025研发质量分析/2025年度Bug积压趋势图表.png', dpi=150, bbox_inches='tight', facecolor='white')
+plt.close()
+
+print("图表已保存到: 2025/2025研发质量分析/2025年度Bug积压趋势图表.png")
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""
+Shared loading and analysis helpers for the Jira bug export.
+"""
+
+from .aggregate import (
+    BUG_TYPES,
+    CHUNK_ROWS,
+    UNRESOLVED_STATUS,
+    BugAggregates,
+    aggregate_bugs,
+    iter_jira_chunks,
+    ordered_counts,
+)
+from .backlog import (
+    open_backlog,
+)
+from .cube import (
+    CUBE_DIMS,
+    BugCube,
+    aggregate_cube,
+    load_cube,
+)
+from .deployment import (
+    DEPLOYMENT_COL,
+    DEPLOYMENT_LABELS,
+    PRIVATE,
+    SAAS,
+    UNCLASSIFIED,
+    classify_deployment,
+)
+from .latency import (
+    LATENCY_DIMS,
+    QUANTILES,
+    LatencyAggregates,
+    LatencySketch,
+    latency_frame,
+    latency_percentiles,
+)
+from .links import (
+    EDGE_TYPES,
+    LinkGraph,
+    link_edges,
+    load_link_graph,
+    load_links,
+)
+from .loader import (
+    JIRA_CSV,
+    JIRA_COLUMNS,
+    SEVERITY_COL,
+    SEVERITY_CODE,
+    load_jira,
+    load_jira_values,
+    memory_report,
+    optimize_dtypes,
+    print_memory_report,
+    read_jira,
+    read_jira_csv,
+    value_counts,
+)
+from .normalize import (
+    ISSUE_KEY,
+    collapse_repeated,
+    explode_repeated,
+    multi_value_counts,
+    normalize_repeated,
+    repeated_groups,
+)
+from .search import (
+    any_contains,
+    contains,
+    text_columns,
+)
+from .shared import (
+    HOT_COLUMNS,
+    SharedJira,
+    SharedView,
+    attach,
+    publish,
+)
+from .store import (
+    JIRA_STORE,
+    IngestStats,
+    IssueStore,
+    sync_store,
+)
+from .worklog import (
+    WORKLOG_COL,
+    effort,
+    load_worklogs,
+    parse_worklogs,
+)
+
+__all__ = [
+    'DEPLOYMENT_COL',
+    'DEPLOYMENT_LABELS',
+    'EDGE_TYPES',
+    'HOT_COLUMNS',
+    'BUG_TYPES',
+    'BugAggregates',
+    'BugCube',
+    'CHUNK_ROWS',
+    'CUBE_DIMS',
+    'ISSUE_KEY',
+    'JIRA_CSV',
+    'JIRA_COLUMNS',
+    'JIRA_STORE',
+    'LATENCY_DIMS',
+    'LatencyAggregates',
+    'LatencySketch',
+    'LinkGraph',
+    'PRIVATE',
+    'QUANTILES',
+    'SAAS',
+    'IngestStats',
+    'IssueStore',
+    'SEVERITY_COL',
+    'SEVERITY_CODE',
+    'SharedJira',
+    'SharedView',
+    'UNCLASSIFIED',
+    'UNRESOLVED_STATUS',
+    'WORKLOG_COL',
+    'aggregate_bugs',
+    'aggregate_cube',
+    'any_contains',
+    'attach',
+    'classify_deployment',
+    'collapse_repeated',
+    'contains',
+    'effort',
+    'explode_repeated',
+    'iter_jira_chunks',
+    'latency_frame',
+    'latency_percentiles',
+    'link_edges',
+    'load_cube',
+    'load_jira',
+    'load_jira_values',
+    'load_link_graph',
+    'load_links',
+    'load_worklogs',
+    'memory_report',
+    'multi_value_counts',
+    'normalize_repeated',
+    'open_backlog',
+    'optimize_dtypes',
+    'ordered_counts',
+    'parse_worklogs',
+    'print_memory_report',
+    'publish',
+    'read_jira',
+    'read_jira_csv',
+    'repeated_groups',
+    'sync_store',
+    'text_columns',
+    'value_counts',
+]
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""
+Mergeable bug aggregates for streaming over large Jira exports.
+
+BugAggregates holds only counters, so it can be filled chunk by chunk from
+a CSV read with `chunksize` and merged across chunks (or files) with `+=`.
+Counters are updated in first-appearance order, so most_common() breaks
+ties the same way value_counts() does on the whole frame, and the reports
+come out identical in streaming and in-memory mode.
+"""
+
+from collections import Counter
+from dataclasses import dataclass, field, fields
+from typing import Iterable, Iterator, List
+
+import numpy as np
+import pandas as pd
+
+from .deployment import DEPLOYMENT_COL
+from .latency import LatencyAggregates
+from .loader import (JIRA_COLUMNS, JIRA_CSV, SEVERITY_COL, SEVERITY_CODE, optimize_dtypes,
+                     read_jira_header)
+from .normalize import ISSUE_KEY, explode_repeated, multi_value_counts, repeated_groups
+
+
+BUG_TYPES = ('故障', '缺陷', 'Bug', 'bug')
+UNRESOLVED_STATUS = ('待办', '处理中', '挂起中', '重新打开')
+DEFECT_TYPE_COL = '自定义字段(缺陷类型)'
+ROOT_CAUSE_COL = '自定义字段(根本原因)'
+ENVIRONMENT_COL = '自定义字段(缺陷发现环境)'
+CUSTOMER_COL = '自定义字段(客户名称)'
+
+CHUNK_ROWS = 50_000
+
+
+def ordered_counts(series: pd.Series) -> Counter:
+    """Counter of non-null values, keys in first-appearance order."""
+    codes, uniques = pd.factorize(series)
+    counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+    return Counter(dict(zip(uniques, counts.tolist())))
+
+
+def _merge_copies(copies: List[Counter]) -> Counter:
+    """Sum per-header-copy counters in column order (column-major first appearance)."""
+    total = Counter()
+    for counter in copies:
+        total.update(counter)
+    return total
+
+
+@dataclass
+class BugAggregates:
+    """Counters behind the bug report; merge with `+=`."""
+    status: Counter = field(default_factory=Counter)
+    priority: Counter = field(default_factory=Counter)
+    severity: Counter = field(default_factory=Counter)
+    root_cause: Counter = field(default_factory=Counter)
+    environment: Counter = field(default_factory=Counter)
+    deployment: Counter = field(default_factory=Counter)
+    assignee: Counter = field(default_factory=Counter)
+    customer: Counter = field(default_factory=Counter)
+    month: Counter = field(default_factory=Counter)
+    p0_status: Counter = field(default_factory=Counter)
+    p0_customer: Counter = field(default_factory=Counter)
+    p1_status: Counter = field(default_factory=Counter)
+    unresolved_status: Counter = field(default_factory=Counter)
+    unresolved_severity: Counter = field(default_factory=Counter)
+    # One counter per copy of the repeated 缺陷类型 header
+    defect_type_copies: List[Counter] = field(default_factory=list)
+    p0_defect_type_copies: List[Counter] = field(default_factory=list)
+    latency: LatencyAggregates = field(default_factory=LatencyAggregates)
+
+    def __iadd__(self, other: 'BugAggregates') -> 'BugAggregates':
+        for f in fields(self):
+            mine, theirs = getattr(self, f.name), getattr(other, f.name)
+            if isinstance(mine, list):
+                mine.extend(Counter() for _ in range(len(theirs) - len(mine)))
+                for counter, update in zip(mine, theirs):
+                    counter.update(update)
+            elif isinstance(mine, Counter):
+                mine.update(theirs)
+            else:
+                mine += theirs
+        return self
+
+    @property
+    def defect_type(self) -> Counter:
+        return _merge_copies(self.defect_type_copies)
+
+    @property
+    def p0_defect_type(self) -> Counter:
+        return _merge_copies(self.p0_defect_type_copies)
+
+    @property
+    def total(self) -> int:
+        return sum(self.status.values())
+
+    def update(self, df: pd.DataFrame, defect_values: pd.DataFrame = None) -> 'BugAggregates':
+        """
+        Add the bugs of an optimized frame or chunk.
+
+        Defect types come from the child table when given, otherwise from
+        the frame's own `缺陷类型`, `缺陷类型.1`, ... columns.
+        """
+        bugs = df[df['问题类型'].isin(BUG_TYPES)]
+        p0 = bugs[bugs[SEVERITY_CODE] == 0]
+        p1 = bugs[bugs[SEVERITY_CODE] == 1]
+        unresolved = bugs[bugs['状态'].isin(UNRESOLVED_STATUS)]
+
+        self.status.update(ordered_counts(bugs['状态']))
+        self.priority.update(ordered_counts(bugs['优先级']))
+        self.severity.update(ordered_counts(bugs[SEVERITY_COL]))
+        for name, col in (('root_cause', ROOT_CAUSE_COL), ('environment', ENVIRONMENT_COL),
+                          ('deployment', DEPLOYMENT_COL), ('customer', CUSTOMER_COL)):
+            if col in bugs.columns:
+                getattr(self, name).update(ordered_counts(bugs[col]))
+        self.assignee.update(ordered_counts(bugs['经办人']))
+        self.month.update(ordered_counts(bugs['创建日期'].dt.to_period('M')))
+        self.p0_status.update(ordered_counts(p0['状态']))
+        if CUSTOMER_COL in p0.columns:
+            self.p0_customer.update(ordered_counts(p0[CUSTOMER_COL]))
+        self.p1_status.update(ordered_counts(p1['状态']))
+        self.unresolved_status.update(ordered_counts(unresolved['状态']))
+        self.unresolved_severity.update(ordered_counts(unresolved[SEVERITY_COL]))
+        self.latency.update(bugs)
+
+        self += BugAggregates(defect_type_copies=_defect_copies(bugs, defect_values),
+                              p0_defect_type_copies=_defect_copies(p0, defect_values))
+        return self
+
+
+def _defect_copies(df: pd.DataFrame, defect_values: pd.DataFrame = None) -> List[Counter]:
+    if defect_values is not None:
+        return [Counter(multi_value_counts(defect_values, df).to_dict())]
+    copies = repeated_groups(df.columns).get(DEFECT_TYPE_COL, [DEFECT_TYPE_COL])
+    return [ordered_counts(explode_repeated(df, [col])['value'])
+            for col in copies if col in df.columns]
+
+
+def iter_jira_chunks(path=JIRA_CSV, columns: Iterable[str] = JIRA_COLUMNS,
+                     chunksize: int = CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """Optimized frames of at most chunksize rows, reading only the named columns."""
+    wanted = set(columns)
+    usecols = [i for i, name in enumerate(read_jira_header(path)) if name in wanted]
+    # Categories are built per chunk; ordered_counts only needs the values
+    with pd.read_csv(path, encoding='utf-8', usecols=usecols, chunksize=chunksize,
+                     dtype={ISSUE_KEY: str}) as reader:
+        for chunk in reader:
+            yield optimize_dtypes(chunk)
+
+
+def aggregate_bugs(path=JIRA_CSV, chunksize: int = CHUNK_ROWS) -> BugAggregates:
+    """Stream an export and return its bug aggregates; memory is bounded by chunksize."""
+    agg = BugAggregates()
+    for chunk in iter_jira_chunks(path, chunksize=chunksize):
+        agg.update(chunk)
+    return agg
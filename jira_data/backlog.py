@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""
+Open-backlog time series by event sweep.
+
+Every issue is one +1 event on its 创建日期 day and, once resolved, one -1
+event on its 已解决 day. The events are bucketed per (day, group) in a
+single pass and a cumulative sum over the days gives the number of issues
+open at the end of each day, for every group at once:
+
+    open_backlog(bugs, by=SEVERITY_COL)   # days x severity
+    open_backlog(bugs, by='经办人')        # each assignee's open load
+
+This replaces filtering the frame once per day (O(days x n)) with O(n)
+for the events plus O(days x groups) for the cumulative sum.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .latency import CREATED_COL, RESOLVED_COL
+
+TOTAL = '全部'
+
+
+def _days(series: pd.Series) -> np.ndarray:
+    """Day numbers (days since the epoch) as float, NaN for NaT."""
+    days = series.to_numpy(dtype='datetime64[D]').astype('int64').astype(float)
+    days[series.isna().to_numpy()] = np.nan
+    return days
+
+
+def open_backlog(df: pd.DataFrame, by: str = None, start=None, end=None) -> pd.DataFrame:
+    """
+    Issues open at the end of each day from start to end, one column per group.
+
+    Without by there is a single TOTAL column. Rows with a missing group are
+    left out of the per-group columns. start / end default to the first
+    creation and the last creation or resolution; issues opened before start
+    are carried into the first day.
+    """
+    created, resolved = _days(df[CREATED_COL]), _days(df[RESOLVED_COL])
+    if by is None:
+        codes, groups = np.zeros(len(df), dtype=np.intp), pd.Index([TOTAL])
+    else:
+        codes, groups = pd.factorize(df[by])
+    known = ~np.isnan(created) & (codes >= 0)
+
+    first = np.nanmin(created) if start is None else _days(pd.Series([pd.Timestamp(start)]))[0]
+    last = np.nanmax(np.fmax(created, resolved)) if end is None else _days(pd.Series([pd.Timestamp(end)]))[0]
+    n_days, n_groups = int(last - first) + 1, len(groups)
+
+    # Events before start land on day 0, events after end are dropped
+    deltas = np.zeros(n_days * n_groups, dtype=np.int64)
+    for days, sign in ((created, 1), (resolved, -1)):
+        hit = known & ~np.isnan(days) & (days <= last)
+        slot = np.maximum(days[hit] - first, 0).astype(np.intp)
+        deltas += sign * np.bincount(slot * n_groups + codes[hit], minlength=len(deltas))
+
+    counts = deltas.reshape(n_days, n_groups).cumsum(axis=0)
+    index = pd.date_range(pd.Timestamp(int(first), unit='D'), periods=n_days, freq='D')
+    return pd.DataFrame(counts, index=index, columns=pd.Index(groups, name=by))
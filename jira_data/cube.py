@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+"""
+Aggregation cube over the Jira issues.
+
+One grouped pass counts issues over issue type x status x priority x
+severity x created year/month x deployment x customer x root cause x
+environment x assignee, and a second one does the same per defect type from
+the 缺陷类型 child table. Reports then read every
+number from the cube by filtering its cells (at most one per issue, far
+fewer in practice) instead of re-scanning the issue frame:
+
+    cube = load_cube()
+    saas = cube.where(issue_type=BUG_TYPES, deployment=SAAS, year=2025)
+    saas.count(status='完成'), saas.counts('status'), saas.defect_types()
+
+Cells keep the first-appearance order of their rows, so counts() and
+defect_types() break ties exactly like value_counts() on the frame.
+BugCube.from_chunks() / aggregate_cube() build the same cube chunk by chunk.
+"""
+
+from functools import reduce
+from typing import Dict, Iterable
+
+import numpy as np
+import pandas as pd
+
+from .aggregate import CHUNK_ROWS, iter_jira_chunks
+from .deployment import DEPLOYMENT_COL
+from .loader import (JIRA_COLUMNS, JIRA_CSV, SEVERITY_COL, SEVERITY_CODE, _cache_file, _read_frame,
+                     _write_frame, cache_base, load_jira, load_jira_values)
+from .normalize import ISSUE_KEY, explode_repeated, repeated_groups
+
+
+# Cube dimension -> issue frame column
+CUBE_DIMS: Dict[str, str] = {
+    'issue_type': '问题类型',
+    'status': '状态',
+    'priority': '优先级',
+    'severity': SEVERITY_COL,
+    'severity_code': SEVERITY_CODE,
+    'year': '创建日期',
+    'month': '创建日期',
+    'deployment': DEPLOYMENT_COL,
+    'customer': '自定义字段(客户名称)',
+    'root_cause': '自定义字段(根本原因)',
+    'environment': '自定义字段(缺陷发现环境)',
+    'assignee': '经办人',
+}
+DEFECT_TYPE_COL = '自定义字段(缺陷类型)'
+
+
+def _dim_columns(df: pd.DataFrame) -> pd.DataFrame:
+    dims = {}
+    for dim, col in CUBE_DIMS.items():
+        if dim == 'year':
+            dims[dim] = df[col].dt.year.astype('Int16')
+        elif dim == 'month':
+            dims[dim] = df[col].dt.month.astype('Int8')
+        else:
+            dims[dim] = df[col]
+    return pd.DataFrame(dims, index=df.index)
+
+
+def _categorize(cells: pd.DataFrame) -> pd.DataFrame:
+    for col in cells.columns:
+        if cells[col].dtype == object or pd.api.types.is_string_dtype(cells[col].dtype):
+            cells[col] = pd.Categorical(cells[col], categories=pd.unique(cells[col].dropna()))
+    return cells
+
+
+def _group_cells(dims: pd.DataFrame) -> pd.DataFrame:
+    """Count rows per distinct combination, cells in first-appearance order."""
+    cells = dims.groupby(list(dims.columns), sort=False, dropna=False, observed=True).size()
+    return _categorize(cells.rename('count').astype('int32').reset_index())
+
+
+def _merge_cells(first: pd.DataFrame, second: pd.DataFrame) -> pd.DataFrame:
+    """Sum the counts of equal cells, keeping first-appearance order across both."""
+    if first.empty or second.empty:
+        return second if first.empty else first
+    both = pd.concat([first, second], ignore_index=True)
+    dims = [col for col in both.columns if col != 'count']
+    cells = both.groupby(dims, sort=False, dropna=False, observed=True)['count'].sum()
+    return _categorize(cells.astype('int32').reset_index())
+
+
+def _defect_cells(dims: pd.DataFrame, keys: pd.Series, defect_values: pd.DataFrame) -> pd.DataFrame:
+    """Cells of the defect-type child table, each value under its issue's dimensions."""
+    rows = dims.set_index(keys.to_numpy())
+    joined = rows.reindex(defect_values['issue_key'].to_numpy()).reset_index(drop=True)
+    joined['defect_type'] = defect_values['value'].to_numpy()
+    return _group_cells(joined)
+
+
+def _no_defects(cells: pd.DataFrame) -> pd.DataFrame:
+    return cells.iloc[:0].assign(defect_type=pd.Series(dtype='str'))
+
+
+class BugCube:
+    """Issue and defect-type counts over the cube dimensions."""
+
+    def __init__(self, cells: pd.DataFrame, defect_cells: pd.DataFrame):
+        self.cells = cells
+        self.defect_cells = defect_cells
+
+    @classmethod
+    def build(cls, df: pd.DataFrame, defect_values: pd.DataFrame = None) -> 'BugCube':
+        """Build the cube from an optimized issue frame and its 缺陷类型 child table."""
+        dims = _dim_columns(df)
+        cells = _group_cells(dims)
+        if defect_values is None:
+            return cls(cells, _no_defects(cells))
+        return cls(cells, _defect_cells(dims, df[ISSUE_KEY], defect_values))
+
+    @classmethod
+    def from_chunks(cls, chunks: Iterable[pd.DataFrame]) -> 'BugCube':
+        """
+        Build the cube from optimized frames of consecutive rows.
+
+        Defect types come from each chunk's own 缺陷类型 columns. They are
+        merged per repeated column and the columns are combined last, the
+        column-major order of the child table, so the cube equals build() on
+        the whole export. No chunks give an empty cube.
+        """
+        cells = None
+        copies: Dict[int, pd.DataFrame] = {}
+        for chunk in chunks:
+            dims = _dim_columns(chunk)
+            part = _group_cells(dims)
+            cells = part if cells is None else _merge_cells(cells, part)
+            columns = repeated_groups(chunk.columns).get(DEFECT_TYPE_COL, [DEFECT_TYPE_COL])
+            for i, col in enumerate(c for c in columns if c in chunk.columns):
+                part = _defect_cells(dims, chunk[ISSUE_KEY], explode_repeated(chunk, [col]))
+                copies[i] = _merge_cells(copies[i], part) if i in copies else part
+        if cells is None:
+            cells = _group_cells(pd.DataFrame(columns=list(CUBE_DIMS)))
+        if not copies:
+            return cls(cells, _no_defects(cells))
+        return cls(cells, reduce(_merge_cells, [copies[i] for i in sorted(copies)]))
+
+    def _mask(self, cells: pd.DataFrame, filters: dict) -> np.ndarray:
+        mask = np.ones(len(cells), dtype=bool)
+        for dim, value in filters.items():
+            col = cells[dim]
+            if callable(value):
+                hit = value(col)
+            elif isinstance(value, (list, tuple, set, frozenset)):
+                hit = col.isin(list(value))
+            else:
+                hit = col == value
+            mask &= np.asarray(pd.Series(hit).fillna(False), dtype=bool)
+        return mask
+
+    def where(self, **filters) -> 'BugCube':
+        """
+        Sub-cube of the matching cells.
+
+        A filter value is a scalar, a collection (isin) or a callable taking
+        the dimension column and returning a mask.
+        """
+        return BugCube(self.cells[self._mask(self.cells, filters)],
+                       self.defect_cells[self._mask(self.defect_cells, filters)])
+
+    def count(self, **filters) -> int:
+        """Number of issues matching filters."""
+        return int(self.cells.loc[self._mask(self.cells, filters), 'count'].sum())
+
+    @staticmethod
+    def _breakdown(cells: pd.DataFrame, dim: str) -> pd.Series:
+        counts = cells.groupby(dim, sort=False, observed=True)['count'].sum()
+        counts = counts[counts > 0].sort_values(ascending=False, kind='stable')
+        return counts.astype('int64')
+
+    def counts(self, dim: str, **filters) -> pd.Series:
+        """Issue counts per value of dim, largest first; like value_counts()."""
+        return self._breakdown(self.cells[self._mask(self.cells, filters)], dim)
+
+    def defect_types(self, **filters) -> pd.Series:
+        """Defect-type counts of the matching issues, largest first."""
+        return self._breakdown(self.defect_cells[self._mask(self.defect_cells, filters)], 'defect_type')
+
+
+def load_cube(path=JIRA_CSV, refresh: bool = False) -> BugCube:
+    """Cube for an export or issue store, built once and cached with the issue frame."""
+    base = cache_base(path, JIRA_COLUMNS)
+    cells_file, defect_file = _cache_file(base, 'cube'), _cache_file(base, 'cube.defects')
+    if cells_file.exists() and defect_file.exists() and not refresh:
+        return BugCube(_read_frame(cells_file), _read_frame(defect_file))
+    cube = BugCube.build(load_jira(path, refresh=refresh), load_jira_values(DEFECT_TYPE_COL, path))
+    _write_frame(cube.defect_cells, defect_file)
+    _write_frame(cube.cells, cells_file)
+    return cube
+
+
+def aggregate_cube(path=JIRA_CSV, chunksize: int = CHUNK_ROWS) -> BugCube:
+    """Stream a CSV export and return its cube; memory is bounded by chunksize."""
+    return BugCube.from_chunks(iter_jira_chunks(path, chunksize=chunksize))
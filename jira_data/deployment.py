@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+Vectorized SaaS / private deployment classifier.
+
+Every report labels bugs with the same rules, in priority order:
+
+1. environment mentions SaaS (any case)   -> SaaS
+2. environment mentions 私有化             -> 私有化
+3. customer mentions SaaS                 -> SaaS
+4. customer mentions SDK (any case)       -> 私有化
+5. customer matches a known private name  -> 私有化
+6. any other non-blank customer           -> 私有化
+7. otherwise                              -> 未分类
+
+The string tests run once per distinct value (see search.py), so the cost
+depends on the number of distinct values, not on the number of rows. The
+loader stores the label as the categorical DEPLOYMENT_COL.
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .search import contains
+except ImportError:  # run as a script
+    from search import contains
+
+
+DEPLOYMENT_COL = '部署类型'
+SAAS = 'SaaS'
+PRIVATE = '私有化'
+UNCLASSIFIED = '未分类'
+DEPLOYMENT_LABELS = (SAAS, PRIVATE, UNCLASSIFIED)
+
+DEPLOYMENT_ENV_COL = '自定义字段(缺陷发现环境)'
+DEPLOYMENT_CUSTOMER_COL = '自定义字段(客户名称)'
+
+PRIVATE_CUSTOMERS = (
+    '福田', '南方电网', 'OPPO', '广东电信', '唯品会', '好未来', '招商',
+    '新华三', '跨越', 'TCL', '百度', '小红书', '格力', '猿辅导',
+    '360', '玉溪', '东风', '融云', '滴滴', '作业帮',
+)
+PRIVATE_CUSTOMER_PATTERN = re.compile('|'.join(map(re.escape, PRIVATE_CUSTOMERS)))
+
+
+def classify_deployment(df: pd.DataFrame) -> pd.Series:
+    """Categorical SaaS / 私有化 / 未分类 label per row."""
+    missing = pd.Series(pd.NA, index=df.index, dtype='string')
+    env = df[DEPLOYMENT_ENV_COL] if DEPLOYMENT_ENV_COL in df.columns else missing
+    customer = df[DEPLOYMENT_CUSTOMER_COL] if DEPLOYMENT_CUSTOMER_COL in df.columns else missing
+
+    conditions = [
+        contains(env, 'saas', case=False),
+        contains(env, '私有化'),
+        contains(customer, 'SaaS'),
+        contains(customer, 'sdk', case=False),
+        contains(customer, PRIVATE_CUSTOMER_PATTERN.pattern),
+        contains(customer, r'\S'),
+    ]
+    choices = [0, 1, 0, 1, 1, 1]
+    codes = np.select(conditions, choices, default=2).astype(np.int8)
+    return pd.Series(pd.Categorical.from_codes(codes, categories=list(DEPLOYMENT_LABELS)),
+                     index=df.index, name=DEPLOYMENT_COL)
@@ -0,0 +1,312 @@
+# -*- coding: utf-8 -*-
+"""
+Issue link graph with CSR adjacency.
+
+The export spreads links over the 事务的内向链接 (X) / 向外链接的问题(X)
+columns (Blocks, Cloners, Relates, Defect, Tests; repeated headers come as
+`.1`, `.2` copies) plus the 父链接 and 史诗链接 fields. link_edges() turns
+them into one deduplicated edge table (src, dst, type):
+
+- blocks / clones / defect: src -> dst as worded on the outward side, so
+  for blocks the blocker is src;
+- relates: stored once per pair, traversed both ways;
+- epic / parent: member -> epic / parent.
+
+Link targets outside the export (stories, epics of other projects) become
+nodes too. LinkGraph numbers the nodes once and keeps one CSR structure
+(indptr, indices) per edge type and direction, so components, blocker
+chains, "open bugs blocking epic X" and epic rollups are single O(V + E)
+passes:
+
+    graph = load_link_graph()
+    graph.components()
+    graph.longest_blocker_chain()
+    graph.blockers_of_epic('BUSINESS-56', open_bugs)
+"""
+
+import re
+from collections import deque
+from typing import Dict, Iterable, List
+
+import numpy as np
+import pandas as pd
+
+from .loader import (JIRA_COLUMNS, JIRA_CSV, _cache_file, _read_frame, _write_frame, cache_base, read_jira,
+                     read_jira_header)
+from .normalize import ISSUE_KEY, explode_repeated, repeated_groups
+
+
+INWARD_PREFIX = '事务的内向链接'
+OUTWARD_PREFIX = '向外链接的问题'
+EPIC_LINK_COL = '自定义字段(史诗链接)'
+PARENT_LINK_COL = '自定义字段(父链接)'
+# Jira link type -> edge type
+LINK_TYPES = {'Blocks': 'blocks', 'Cloners': 'clones', 'Relates': 'relates', 'Defect': 'defect', 'Tests': 'tests'}
+EDGE_TYPES = tuple(LINK_TYPES.values()) + ('epic', 'parent')
+
+_LINK_HEADER = re.compile(rf'^(?P<side>{INWARD_PREFIX}|{OUTWARD_PREFIX})\s*\((?P<kind>[^)]+)\)$')
+EDGE_COLUMNS = ('src', 'dst', 'type')
+
+
+def link_columns(columns: Iterable[str]) -> Dict[str, tuple]:
+    """Link column (any `.n` copy) -> (edge type, outward) for the known link types."""
+    found = {}
+    groups = repeated_groups(columns)
+    for col in columns:
+        m = _LINK_HEADER.match(col)
+        if m and m.group('kind') in LINK_TYPES:
+            edge = (LINK_TYPES[m.group('kind')], m.group('side') == OUTWARD_PREFIX)
+            for copy in groups.get(col, [col]):
+                found[copy] = edge
+    for col, edge_type in ((EPIC_LINK_COL, 'epic'), (PARENT_LINK_COL, 'parent')):
+        if col in columns:
+            found[col] = (edge_type, True)
+    return found
+
+
+def link_edges(df: pd.DataFrame) -> pd.DataFrame:
+    """Deduplicated (src, dst, type) edges from the link columns of a raw frame."""
+    parts = []
+    for col, (edge_type, outward) in link_columns(df.columns).items():
+        values = explode_repeated(df, [col])
+        own, other = values['issue_key'].to_numpy(), values['value'].to_numpy()
+        src, dst = (own, other) if outward else (other, own)
+        parts.append(pd.DataFrame({'src': src, 'dst': dst, 'type': edge_type}))
+    edges = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=list(EDGE_COLUMNS))
+    # Relates has no direction: keep each pair once
+    relates = edges['type'] == 'relates'
+    lo = edges[['src', 'dst']].min(axis=1).where(relates, edges['src'])
+    hi = edges[['src', 'dst']].max(axis=1).where(relates, edges['dst'])
+    edges = pd.DataFrame({'src': lo, 'dst': hi, 'type': edges['type']})
+    edges = edges[edges['src'] != edges['dst']].drop_duplicates(ignore_index=True)
+    edges['type'] = pd.Categorical(edges['type'], categories=list(EDGE_TYPES))
+    return edges
+
+
+class CSR:
+    """Compressed adjacency: neighbours of node i are indices[indptr[i]:indptr[i + 1]]."""
+
+    def __init__(self, src: np.ndarray, dst: np.ndarray, n: int):
+        order = np.argsort(src, kind='stable')
+        self.indices = dst[order].astype(np.int32)
+        self.indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=n), out=self.indptr[1:])
+
+    def __getitem__(self, i: int) -> np.ndarray:
+        return self.indices[self.indptr[i]:self.indptr[i + 1]]
+
+    def degree(self) -> np.ndarray:
+        return np.diff(self.indptr)
+
+
+class LinkGraph:
+    """Issues and link targets numbered 0..n-1, with CSR adjacency per edge type."""
+
+    def __init__(self, edges: pd.DataFrame, keys: Iterable[str] = ()):
+        self.edges = edges
+        self.nodes = pd.Index(pd.unique(np.concatenate([
+            np.asarray(list(keys), dtype=object),
+            edges['src'].to_numpy(dtype=object),
+            edges['dst'].to_numpy(dtype=object),
+        ])))
+        n = len(self.nodes)
+        src, dst = self.nodes.get_indexer(edges['src']), self.nodes.get_indexer(edges['dst'])
+        types = edges['type'].to_numpy()
+        self.out: Dict[str, CSR] = {}
+        self.inward: Dict[str, CSR] = {}
+        for edge_type in EDGE_TYPES:
+            hit = types == edge_type
+            self.out[edge_type] = CSR(src[hit], dst[hit], n)
+            self.inward[edge_type] = CSR(dst[hit], src[hit], n)
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def index(self, keys: Iterable[str]) -> np.ndarray:
+        """Node numbers of keys; -1 for unknown keys."""
+        return self.nodes.get_indexer(list(keys))
+
+    def mask(self, keys: Iterable[str]) -> np.ndarray:
+        """Boolean node mask that is True for keys."""
+        mask = np.zeros(len(self), dtype=bool)
+        idx = self.index(keys)
+        mask[idx[idx >= 0]] = True
+        return mask
+
+    def components(self, types: Iterable[str] = EDGE_TYPES) -> pd.Series:
+        """
+        Connected-component id per node, ignoring direction.
+
+        Ids are numbered by size, largest first; isolated nodes get their
+        own component.
+        """
+        adjacency = [csr for t in types for csr in (self.out[t], self.inward[t])]
+        label = np.full(len(self), -1, dtype=np.int64)
+        n_components = 0
+        for start in range(len(self)):
+            if label[start] >= 0:
+                continue
+            label[start] = n_components
+            queue = deque([start])
+            while queue:
+                node = queue.popleft()
+                for csr in adjacency:
+                    for nxt in csr[node]:
+                        if label[nxt] < 0:
+                            label[nxt] = n_components
+                            queue.append(nxt)
+            n_components += 1
+        sizes = np.bincount(label)
+        rank = np.empty_like(sizes)
+        rank[np.argsort(-sizes, kind='stable')] = np.arange(len(sizes))
+        return pd.Series(rank[label], index=self.nodes, name='component')
+
+    def blocker_depth(self) -> pd.Series:
+        """
+        Length of the longest chain of blockers ending at each node.
+
+        Kahn's topological sort over the blocks edges with a longest-path
+        update; nodes on a blocking cycle (never released) get -1.
+        """
+        out, inward = self.out['blocks'], self.inward['blocks']
+        remaining = inward.degree().copy()
+        depth = np.zeros(len(self), dtype=np.int64)
+        queue = deque(np.flatnonzero(remaining == 0).tolist())
+        while queue:
+            node = queue.popleft()
+            for nxt in out[node]:
+                depth[nxt] = max(depth[nxt], depth[node] + 1)
+                remaining[nxt] -= 1
+                if remaining[nxt] == 0:
+                    queue.append(nxt)
+        depth[remaining > 0] = -1
+        return pd.Series(depth, index=self.nodes, name='depth')
+
+    def longest_blocker_chain(self) -> List[str]:
+        """Keys of one longest blocker chain, first blocker first."""
+        depth = self.blocker_depth().to_numpy()
+        if not len(depth) or depth.max() <= 0:
+            return []
+        node = int(np.argmax(depth))
+        chain = [node]
+        while depth[node] > 0:
+            preds = self.inward['blocks'][node]
+            node = int(preds[np.argmax(depth[preds] == depth[node] - 1)])
+            chain.append(node)
+        return list(self.nodes[chain[::-1]])
+
+    def members(self, epic: str) -> np.ndarray:
+        """Node numbers of the epic and of every issue under it (epic and parent links, transitively)."""
+        return self._reach(self.index([epic]), [self.inward['epic'], self.inward['parent']])
+
+    def blockers_of_epic(self, epic: str, open_bugs: np.ndarray = None) -> List[str]:
+        """
+        Keys of the issues blocking the epic or any of its members, transitively.
+
+        open_bugs is an optional node mask (e.g. mask(open bug keys)) the
+        result is restricted to.
+        """
+        members = self.members(epic)
+        blockers = np.setdiff1d(self._reach(members, [self.inward['blocks']]), members)
+        if open_bugs is not None:
+            blockers = blockers[open_bugs[blockers]]
+        return list(self.nodes[blockers])
+
+    def epic_of(self) -> np.ndarray:
+        """
+        Epic (top epic / parent link target) of each node, -1 if none.
+
+        One multi-source BFS down the epic and parent links from every top
+        epic; a node under two epics keeps the first one reached.
+        """
+        under = [self.inward['epic'], self.inward['parent']]
+        has_members = (under[0].degree() > 0) | (under[1].degree() > 0)
+        has_epic = (self.out['epic'].degree() > 0) | (self.out['parent'].degree() > 0)
+        epic = np.full(len(self), -1, dtype=np.int64)
+        tops = np.flatnonzero(has_members & ~has_epic)
+        epic[tops] = tops
+        queue = deque(tops.tolist())
+        while queue:
+            node = queue.popleft()
+            for csr in under:
+                for nxt in csr[node]:
+                    if epic[nxt] < 0:
+                        epic[nxt] = epic[node]
+                        queue.append(nxt)
+        return epic
+
+    def epic_rollup(self, open_bugs: np.ndarray = None) -> pd.DataFrame:
+        """
+        Per top epic: members, open members, and the open issues outside the
+        epic directly blocking it or one of its members. Largest first.
+
+        open_bugs is a node mask; without it every node counts as open.
+        """
+        open_bugs = np.ones(len(self), dtype=bool) if open_bugs is None else open_bugs
+        epic = self.epic_of()
+        tops = np.flatnonzero(epic == np.arange(len(self)))
+        member = (epic >= 0) & (epic != np.arange(len(self)))
+        members = np.bincount(epic[member], minlength=len(self))
+        open_members = np.bincount(epic[member & open_bugs], minlength=len(self))
+
+        # Blocks edges into an epic from open issues outside it, counted once per (blocker, epic)
+        src = self.inward['blocks'].indices
+        dst = np.repeat(np.arange(len(self)), self.inward['blocks'].degree())
+        target = epic[dst]
+        hit = (target >= 0) & (epic[src] != target) & open_bugs[src]
+        pairs = np.unique(np.stack([src[hit], target[hit]]), axis=1)
+        blockers = np.bincount(pairs[1], minlength=len(self))
+
+        rollup = pd.DataFrame({'members': members[tops], 'open_members': open_members[tops],
+                               'open_blockers': blockers[tops]},
+                              index=pd.Index(self.nodes[tops], name='epic'))
+        return rollup.sort_values('members', ascending=False, kind='stable')
+
+    def blocked(self, open_bugs: np.ndarray = None) -> pd.Series:
+        """Number of (open) direct blockers per blocked node, largest first."""
+        src = self.inward['blocks'].indices
+        dst = np.repeat(np.arange(len(self)), self.inward['blocks'].degree())
+        if open_bugs is not None:
+            dst = dst[open_bugs[src]]
+        counts = pd.Series(np.bincount(dst, minlength=len(self)), index=self.nodes, name='blockers')
+        return counts[counts > 0].sort_values(ascending=False, kind='stable')
+
+    def _reach(self, starts: np.ndarray, adjacency: List[CSR]) -> np.ndarray:
+        """Nodes reachable from starts (included) along adjacency, by BFS."""
+        seen = np.zeros(len(self), dtype=bool)
+        starts = starts[starts >= 0]
+        seen[starts] = True
+        queue = deque(starts.tolist())
+        while queue:
+            node = queue.popleft()
+            for csr in adjacency:
+                for nxt in csr[node]:
+                    if not seen[nxt]:
+                        seen[nxt] = True
+                        queue.append(nxt)
+        return np.flatnonzero(seen)
+
+
+def _source_header(path) -> List[str]:
+    """Unique header names of an export or issue store."""
+    from .store import IssueStore, is_store
+    if is_store(path):
+        with IssueStore(path) as store:
+            return list(dict.fromkeys(store.header()))
+    return list(dict.fromkeys(read_jira_header(path)))
+
+
+def load_links(path=JIRA_CSV, refresh: bool = False) -> pd.DataFrame:
+    """Link edge table for an export or issue store, built once and cached with the issue frame."""
+    target = _cache_file(cache_base(path, JIRA_COLUMNS), 'links')
+    if target.exists() and not refresh:
+        return _read_frame(target)
+    columns = (ISSUE_KEY,) + tuple(link_columns(_source_header(path)))
+    edges = link_edges(read_jira(path, columns))
+    _write_frame(edges, target)
+    return edges
+
+
+def load_link_graph(path=JIRA_CSV, keys: Iterable[str] = (), refresh: bool = False) -> LinkGraph:
+    """LinkGraph over the export's links; keys adds nodes without links (e.g. every issue)."""
+    return LinkGraph(load_links(path, refresh=refresh), keys)
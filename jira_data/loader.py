@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Jira export loader with a columnar cache.
+
+The export has 192 columns but the quality scripts use about twenty. The
+CSV is parsed once keeping only those columns and cached next to it in
+`.jira_cache/` as Parquet (pickle when pyarrow is missing), keyed by the
+CSV's sha256. Later loads read the cache instead of the CSV. The path may
+also be an issue store (see store.py); its cache is keyed by the store's
+revision.
+
+Low-cardinality fields are stored as categoricals, the P0-P3 severity is
+extracted to an int8 code, the SaaS / private deployment label (see
+deployment.py) is added as a categorical, and the date columns are parsed
+once with an explicit format. The CSV is read with pyarrow's multithreaded
+reader when pyarrow is installed, otherwise with pandas' C engine.
+Repeated headers are split off into child tables (see normalize.py) and
+cached alongside; load them with load_jira_values().
+Run `python jira_data/loader.py` for a memory report, or with
+`--bench [ROWS]` to time both CSV engines on the real export and on a
+synthetic one.
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Iterable, List
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .deployment import DEPLOYMENT_COL, DEPLOYMENT_CUSTOMER_COL, DEPLOYMENT_ENV_COL, classify_deployment
+    from .normalize import ISSUE_KEY, normalize_repeated
+except ImportError:  # run as a script
+    from deployment import DEPLOYMENT_COL, DEPLOYMENT_CUSTOMER_COL, DEPLOYMENT_ENV_COL, classify_deployment
+    from normalize import ISSUE_KEY, normalize_repeated
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    CACHE_FORMAT = 'parquet'
+    CSV_ENGINE = 'pyarrow'
+except ImportError:
+    pa = None
+    CACHE_FORMAT = 'pickle'
+    CSV_ENGINE = 'c'
+
+
+JIRA_CSV = (Path(__file__).resolve().parent.parent / '2025' / '2025研发质量分析'
+            / 'Jira-项目管理 2026-01-30T12_27_55+0800.csv')
+
+# Columns read by the quality scripts. Repeated headers such as 缺陷类型
+# become child tables, see load_jira_values().
+JIRA_COLUMNS = (
+    '概要',
+    ISSUE_KEY,
+    '问题ID',
+    '问题类型',
+    '状态',
+    '优先级',
+    '经办人',
+    '创建日期',
+    '已更新',
+    '已解决',
+    '描述',
+    '自定义字段(严重程度)',
+    '自定义字段(缺陷类型)',
+    '自定义字段(根本原因)',
+    '自定义字段(解决办法)',
+    '自定义字段(缺陷发现环境)',
+    '自定义字段(影响的环境)',
+    '自定义字段(客户名称)',
+)
+
+SEVERITY_COL = '自定义字段(严重程度)'
+# int8 P0-P3 severity derived from SEVERITY_COL; -1 when missing
+SEVERITY_CODE = '严重程度代码'
+# Parsed as integers; every other column is read as text
+INT_COLUMNS = ('问题ID',)
+DATE_COLUMNS = ('创建日期', '已更新', '已解决')
+DATE_FORMAT = '%Y-%m-%d  %H:%M:%S'
+# Repeated headers are matched by prefix, so `.1`, `.2` copies are included
+CATEGORY_COLUMNS = (
+    '问题类型',
+    '状态',
+    '优先级',
+    '经办人',
+    SEVERITY_COL,
+    '自定义字段(缺陷类型)',
+    '自定义字段(缺陷发现环境)',
+    '自定义字段(影响的环境)',
+    '自定义字段(客户名称)',
+)
+
+CACHE_DIR = '.jira_cache'
+# Bump when the cached frame's layout changes
+CACHE_VERSION = 5
+
+
+def file_digest(path) -> str:
+    """sha256 of a file, read in chunks."""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def read_jira_header(path) -> List[str]:
+    """Raw header names, duplicates included."""
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        return next(csv.reader(f))
+
+
+def mangle_header(header: List[str]) -> List[str]:
+    """Unique column names the way pandas makes them: `name`, `name.1`, ..."""
+    seen = {}
+    names = []
+    for name in header:
+        n = seen.get(name, 0)
+        names.append(name if n == 0 else f"{name}.{n}")
+        seen[name] = n + 1
+    return names
+
+
+def _read_csv_pyarrow(path, header: List[str], usecols: List[int]) -> pd.DataFrame:
+    names = mangle_header(header)
+    include = [names[i] for i in usecols]
+    # Known columns get explicit types; anything else asked for is inferred
+    counts = {}
+    for name in header:
+        counts[name] = counts.get(name, 0) + 1
+    types = {}
+    for i in usecols:
+        if header[i] in INT_COLUMNS:
+            types[names[i]] = pa.int64()
+        elif header[i] in JIRA_COLUMNS or counts[header[i]] > 1:
+            types[names[i]] = pa.string()
+    table = pa_csv.read_csv(
+        path,
+        read_options=pa_csv.ReadOptions(column_names=names, skip_rows=1, use_threads=True),
+        parse_options=pa_csv.ParseOptions(newlines_in_values=True),
+        convert_options=pa_csv.ConvertOptions(include_columns=include, column_types=types,
+                                              strings_can_be_null=True),
+    )
+    df = table.to_pandas()
+    # Empty columns come back as None objects; pandas reads them as float NaN
+    for field in table.schema:
+        if pa.types.is_null(field.type):
+            df[field.name] = np.nan
+    return df
+
+
+def read_jira_csv(path=JIRA_CSV, columns: Iterable[str] = JIRA_COLUMNS, engine: str = None) -> pd.DataFrame:
+    """
+    Parse the export, keeping only the named columns (all copies of repeated ones).
+
+    engine is 'pyarrow' (multithreaded, explicit types for the known
+    columns) or 'c'; it defaults to CSV_ENGINE. Both return the same frame
+    for JIRA_COLUMNS and repeated headers.
+    """
+    engine = engine or CSV_ENGINE
+    wanted = set(columns)
+    header = read_jira_header(path)
+    usecols = [i for i, name in enumerate(header) if name in wanted]
+    if engine == 'pyarrow':
+        if pa is None:
+            raise ImportError("engine='pyarrow' needs pyarrow")
+        return _read_csv_pyarrow(path, header, usecols)
+    return pd.read_csv(path, encoding='utf-8', usecols=usecols, low_memory=False)
+
+
+def read_jira(path=JIRA_CSV, columns: Iterable[str] = JIRA_COLUMNS) -> pd.DataFrame:
+    """Raw frame from a CSV export or an issue store."""
+    from .store import is_store, read_store
+    if is_store(path):
+        return read_store(path, columns)
+    return read_jira_csv(path, columns)
+
+
+def source_digest(path) -> str:
+    """Identity of the data behind path: file sha256, or store revision."""
+    from .store import is_store, store_revision
+    if is_store(path):
+        return hashlib.sha256(store_revision(path).encode('utf-8')).hexdigest()
+    return file_digest(path)
+
+
+def optimize_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convert a raw export frame to compact dtypes in place and return it.
+
+    Categories keep first-appearance order, so ties in value_counts come
+    out in the same order as for plain strings.
+    """
+    for col in df.columns:
+        if col.split('.')[0] in CATEGORY_COLUMNS or col in CATEGORY_COLUMNS:
+            df[col] = pd.Categorical(df[col], categories=pd.unique(df[col].dropna()))
+    for col in DATE_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], format=DATE_FORMAT, errors='coerce')
+    if SEVERITY_COL in df.columns:
+        code = df[SEVERITY_COL].astype('string').str.extract(r'P([0-3])', expand=False)
+        df[SEVERITY_CODE] = pd.to_numeric(code).fillna(-1).astype('int8')
+    if DEPLOYMENT_ENV_COL in df.columns or DEPLOYMENT_CUSTOMER_COL in df.columns:
+        df[DEPLOYMENT_COL] = classify_deployment(df)
+    return df
+
+
+def value_counts(series: pd.Series) -> pd.Series:
+    """
+    value_counts() that behaves the same for categorical and string columns.
+
+    Categories absent from the series are left out, and ties are ordered by
+    first appearance in the series rather than by category order.
+    """
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        return series.value_counts()
+    codes = series.cat.codes.to_numpy()
+    codes = codes[codes >= 0]
+    present, first, counts = np.unique(codes, return_index=True, return_counts=True)
+    order = np.lexsort((first, -counts))
+    index = pd.Index(series.cat.categories[present[order]], name=series.name)
+    return pd.Series(counts[order], index=index, name='count')
+
+
+def memory_report(df: pd.DataFrame) -> pd.DataFrame:
+    """Deep memory usage per column, largest first."""
+    usage = df.memory_usage(deep=True, index=False)
+    report = pd.DataFrame({'dtype': df.dtypes.astype(str), 'bytes': usage})
+    return report.sort_values('bytes', ascending=False)
+
+
+def print_memory_report(df: pd.DataFrame, baseline: pd.DataFrame = None) -> None:
+    """Print per-column memory, optionally next to an unoptimized frame."""
+    report = memory_report(df)
+    if baseline is not None:
+        base = memory_report(baseline)
+        report['raw_dtype'] = base['dtype']
+        report['raw_bytes'] = base['bytes']
+    print(f"{'column':<28} {'dtype':<10} {'bytes':>12}" + (f" {'raw dtype':<10} {'raw bytes':>12}" if baseline is not None else ''))
+    for col, row in report.iterrows():
+        line = f"{col:<28} {row['dtype']:<10} {row['bytes']:>12,}"
+        if baseline is not None and pd.notna(row['raw_bytes']):
+            line += f" {row['raw_dtype']:<10} {int(row['raw_bytes']):>12,}"
+        print(line)
+    total = int(report['bytes'].sum())
+    if baseline is not None:
+        raw_total = int(base['bytes'].sum())
+        print(f"Total: {total:,} bytes (raw {raw_total:,} bytes, {raw_total / max(total, 1):.1f}x smaller)")
+    else:
+        print(f"Total: {total:,} bytes")
+
+
+def cache_base(path, columns: Iterable[str] = JIRA_COLUMNS) -> Path:
+    """
+    Common prefix of the cache files for this export and column selection.
+
+    The name embeds the source digest, so caches of an older export or
+    store revision can be recognized and removed.
+    """
+    path = Path(path)
+    key = hashlib.sha256(json.dumps([CACHE_VERSION, list(columns)], ensure_ascii=False).encode('utf-8'))
+    return path.parent / CACHE_DIR / f"{path.stem}.{source_digest(path)[:16]}.{key.hexdigest()[:8]}"
+
+
+def _cache_file(base: Path, part: str) -> Path:
+    suffix = 'parquet' if CACHE_FORMAT == 'parquet' else 'pkl'
+    return base.with_name(f"{base.name}.{part}.{suffix}")
+
+
+def _write_frame(df: pd.DataFrame, target: Path) -> None:
+    tmp = target.with_name(target.name + '.tmp')
+    if CACHE_FORMAT == 'parquet':
+        df.to_parquet(tmp, index=False)
+    else:
+        df.to_pickle(tmp)
+    os.replace(tmp, target)
+
+
+def _read_frame(target: Path) -> pd.DataFrame:
+    if CACHE_FORMAT == 'parquet':
+        return pd.read_parquet(target)
+    return pd.read_pickle(target)
+
+
+def _build_cache(path, columns, base: Path) -> pd.DataFrame:
+    """Parse the source and write the issue frame and its child tables."""
+    df, children = normalize_repeated(read_jira(path, columns))
+    df = optimize_dtypes(df)
+
+    base.parent.mkdir(exist_ok=True)
+    for name, values in children.items():
+        _write_frame(values, _cache_file(base, f"values.{name}"))
+    # Written last: its presence means the child tables are complete
+    _write_frame(df, _cache_file(base, 'issues'))
+
+    digest = base.name.split('.')[-2]
+    for stale in base.parent.glob(f"{Path(path).stem}.*"):
+        if not stale.name.startswith(f"{Path(path).stem}.{digest}."):
+            stale.unlink()
+    return df
+
+
+def load_jira(path=JIRA_CSV, columns: Iterable[str] = JIRA_COLUMNS, refresh: bool = False) -> pd.DataFrame:
+    """
+    Load the Jira export or issue store, parsing it only when no cache
+    matches it.
+
+    Repeated headers are not part of the returned frame; use
+    load_jira_values() for them. Caches of older exports are removed when
+    a new one is written.
+    """
+    columns = tuple(columns)
+    base = cache_base(path, columns)
+    issues = _cache_file(base, 'issues')
+    if issues.exists() and not refresh:
+        return _read_frame(issues)
+    return _build_cache(path, columns, base)
+
+
+def load_jira_values(field: str, path=JIRA_CSV, columns: Iterable[str] = JIRA_COLUMNS,
+                     refresh: bool = False) -> pd.DataFrame:
+    """
+    Child table (issue_key, value) for a repeated header such as 缺陷类型.
+
+    Fields outside `columns` are added to the selection, which gets its own
+    cache.
+    """
+    columns = tuple(columns)
+    if field not in columns:
+        columns += (field,)
+    base = cache_base(path, columns)
+    if refresh or not _cache_file(base, 'issues').exists():
+        _build_cache(path, columns, base)
+    target = _cache_file(base, f"values.{field}")
+    if not target.exists():
+        raise KeyError(f"{field} is not a repeated header in {path}")
+    return _read_frame(target)
+
+
+def write_synthetic_export(path, rows: int, source=JIRA_CSV) -> None:
+    """Export of `rows` rows made by repeating the real export's records."""
+    with open(source, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        records = list(reader)
+    with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        for i in range(rows):
+            writer.writerow(records[i % len(records)])
+
+
+def run_benchmark(rows: int = 1_000_000) -> None:
+    """Time each available CSV engine on the real export and on a synthetic one."""
+    engines = ['c'] + (['pyarrow'] if pa is not None else [])
+
+    def timed(path):
+        for engine in engines:
+            start = time.perf_counter()
+            df = read_jira_csv(path, JIRA_COLUMNS, engine=engine)
+            print(f"  {engine:<8} {time.perf_counter() - start:8.2f}s  {len(df):>9,} rows")
+
+    print(f"{JIRA_CSV.name} ({JIRA_CSV.stat().st_size / 1e6:.1f} MB)")
+    timed(JIRA_CSV)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'synthetic.csv'
+        write_synthetic_export(path, rows)
+        print(f"synthetic export ({path.stat().st_size / 1e6:.1f} MB)")
+        timed(path)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Jira export memory report and CSV engine benchmark')
+    parser.add_argument('--bench', type=int, nargs='?', const=1_000_000, metavar='ROWS',
+                        help='benchmark the CSV engines (synthetic export of ROWS rows, default 1M)')
+    args = parser.parse_args()
+    if args.bench:
+        run_benchmark(args.bench)
+    else:
+        raw = read_jira_csv()
+        print_memory_report(optimize_dtypes(raw.copy()), baseline=raw)
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Normalization of repeated headers in the Jira export.
+
+The export repeats headers such as 缺陷类型 (x3), 影响版本 (x7) and
+登记工作日志 (x20); pandas reads them as `name`, `name.1`, `name.2`, ...
+Each repeated group is collapsed once into a child table with one row per
+(issue_key, value), in the same column-major order the old per-column
+loops used, so multi-value counts become a single value_counts.
+"""
+
+import re
+from typing import Dict, List, Tuple
+
+import pandas as pd
+
+
+ISSUE_KEY = '问题关键字'
+
+_MANGLED = re.compile(r'^(?P<base>.+)\.(?P<n>\d+)$')
+
+
+def repeated_groups(columns) -> Dict[str, List[str]]:
+    """Map each repeated header to its pandas column names, in file order."""
+    columns = list(columns)
+    present = set(columns)
+    groups: Dict[str, List[str]] = {}
+    for col in columns:
+        m = _MANGLED.match(col)
+        if m and m.group('base') in present:
+            groups.setdefault(m.group('base'), [m.group('base')]).append(col)
+    return groups
+
+
+def explode_repeated(df: pd.DataFrame, columns: List[str], key: str = ISSUE_KEY) -> pd.DataFrame:
+    """
+    Stack a repeated column group into an (issue_key, value) table.
+
+    Values are stripped; empty cells are dropped.
+    """
+    long = df[[key] + list(columns)].melt(id_vars=key, value_name='value')
+    values = long['value'].astype('string').str.strip()
+    keep = values.notna() & (values != '')
+    return pd.DataFrame({
+        'issue_key': long.loc[keep, key].to_numpy(),
+        'value': values[keep].astype(str).to_numpy(),
+    })
+
+
+def collapse_repeated(values: pd.DataFrame, keys: pd.Series) -> pd.Series:
+    """List-valued column aligned to keys, built from a child table."""
+    lists = values.groupby('issue_key', sort=False)['value'].agg(list)
+    return pd.Series([lists.get(k, []) for k in keys], index=keys.index)
+
+
+def normalize_repeated(df: pd.DataFrame, key: str = ISSUE_KEY) -> Tuple[pd.DataFrame, Dict[str, pd.DataFrame]]:
+    """
+    Replace every repeated column group with a child table.
+
+    Returns the frame without the repeated columns, plus a child table per
+    repeated header name.
+    """
+    children = {}
+    drop = []
+    for base, cols in repeated_groups(df.columns).items():
+        children[base] = explode_repeated(df, cols, key)
+        drop.extend(cols)
+    return df.drop(columns=drop), children
+
+
+def multi_value_counts(values: pd.DataFrame, issues: pd.DataFrame = None, key: str = ISSUE_KEY,
+                       by=None) -> pd.Series:
+    """
+    Count child-table values, optionally only for the given issues.
+
+    Ties keep first-appearance order, matching Counter.most_common over the
+    original per-column loops. With `by` (a column of issues, or a Series
+    aligned to it) the counts of every group come from one groupby, as a
+    (group, value) indexed Series: groups ascending, counts descending
+    within each group, so counts.get(group) equals the count for that
+    group's issues alone; grouping needs issues.
+    """
+    if by is not None and issues is None:
+        raise ValueError(f"grouping by {getattr(by, 'name', by)} needs the issue frame")
+    if issues is not None:
+        values = values[values['issue_key'].isin(issues[key])]
+    if by is None:
+        return values['value'].value_counts()
+
+    group = issues[by] if isinstance(by, str) else by
+    group = values['issue_key'].map(pd.Series(group.to_numpy(), index=issues[key].to_numpy()))
+    counts = (values.groupby([group.rename(group.name or 'group'), values['value']],
+                             sort=False, observed=True)
+              .size().rename('count').reset_index())
+    # groupby(sort=False) lists pairs in first-appearance order
+    counts['first'] = range(len(counts))
+    counts = counts.sort_values([counts.columns[0], 'count', 'first'], ascending=[True, False, True],
+                                kind='stable')
+    return counts.set_index([counts.columns[0], 'value'])['count']
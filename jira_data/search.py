@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+"""
+Regex search over low-cardinality columns.
+
+Jira columns hold few distinct values, so the regex runs only on each
+column's uniques (the categories of a categorical, pd.factorize otherwise)
+and the boolean result is mapped back to the rows through the codes. This
+replaces joining whole rows into strings and searching those.
+"""
+
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+
+def contains(series: pd.Series, pattern: str, case: bool = True) -> np.ndarray:
+    """Boolean mask of non-null cells matching the regex pattern."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes, uniques = series.cat.codes.to_numpy(), series.cat.categories
+    else:
+        codes, uniques = pd.factorize(series)
+    hits = pd.Index(uniques).astype(str).str.contains(pattern, case=case, regex=True)
+    # Code -1 (missing) indexes the trailing False
+    return np.append(np.asarray(hits, dtype=bool), False)[codes]
+
+
+def text_columns(df: pd.DataFrame) -> list:
+    """Columns holding strings or categories."""
+    return [c for c in df.columns
+            if isinstance(df[c].dtype, pd.CategoricalDtype)
+            or pd.api.types.is_string_dtype(df[c].dtype)]
+
+
+def any_contains(df: pd.DataFrame, pattern: str, columns: Iterable[str] = None, case: bool = True) -> pd.Series:
+    """Rows where any of columns (default: every text column) matches pattern."""
+    mask = np.zeros(len(df), dtype=bool)
+    for col in (text_columns(df) if columns is None else columns):
+        mask |= contains(df[col], pattern, case=case)
+    return pd.Series(mask, index=df.index)
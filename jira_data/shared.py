@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""
+Hot Jira columns published in shared memory for process workers.
+
+publish() packs category codes, severity codes, deployment labels and date
+ordinals into a single multiprocessing.shared_memory block and returns a
+small picklable spec. Workers attach() to it and get NumPy views over the
+same pages, so fanning report sections out over a process pool neither
+re-loads nor unpickles the issue frame.
+
+    with SharedJira(load_jira()) as shared:
+        results = shared.map(section_fn, sections, workers=4)
+
+where section_fn(view, section) receives a SharedView.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Callable, Dict, Iterable, List
+
+import numpy as np
+import pandas as pd
+
+from .deployment import DEPLOYMENT_COL
+from .loader import CATEGORY_COLUMNS, DATE_COLUMNS, SEVERITY_CODE
+
+
+HOT_COLUMNS = CATEGORY_COLUMNS + DATE_COLUMNS + (SEVERITY_CODE, DEPLOYMENT_COL)
+# Day ordinal (days since 1970-01-01) standing in for NaT
+NO_DATE = np.iinfo(np.int32).min
+_ALIGN = 64
+
+
+def date_ordinals(series: pd.Series) -> np.ndarray:
+    """int32 days since the epoch; NaT becomes NO_DATE."""
+    days = series.to_numpy(dtype='datetime64[D]').astype('int64')
+    return np.where(series.isna().to_numpy(), NO_DATE, days).astype(np.int32)
+
+
+def _hot_arrays(df: pd.DataFrame, columns: Iterable[str]) -> Dict[str, tuple]:
+    """column -> (array, categories or None)."""
+    arrays = {}
+    for col in columns:
+        if col not in df.columns:
+            continue
+        series = df[col]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            arrays[col] = (series.cat.codes.to_numpy(), list(series.cat.categories))
+        elif pd.api.types.is_datetime64_any_dtype(series):
+            arrays[col] = (date_ordinals(series), None)
+        else:
+            arrays[col] = (series.to_numpy(), None)
+    return arrays
+
+
+def _attach_block(name: str) -> shared_memory.SharedMemory:
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13: pool workers share the owner's resource tracker,
+        # which only unlinks the block once
+        return shared_memory.SharedMemory(name=name)
+
+
+class SharedView:
+    """Read-only NumPy views over a published block."""
+
+    def __init__(self, spec: dict):
+        self.spec = spec
+        self._shm = _attach_block(spec['name'])
+        self.arrays: Dict[str, np.ndarray] = {}
+        for col, (offset, dtype, length) in spec['arrays'].items():
+            view = np.ndarray((length,), dtype=np.dtype(dtype), buffer=self._shm.buf, offset=offset)
+            view.flags.writeable = False
+            self.arrays[col] = view
+
+    def __len__(self) -> int:
+        return self.spec['rows']
+
+    def __getitem__(self, col: str) -> np.ndarray:
+        return self.arrays[col]
+
+    def categories(self, col: str) -> List:
+        return self.spec['categories'][col]
+
+    def code(self, col: str, value) -> int:
+        """Code of a category value, -1 if absent."""
+        cats = self.categories(col)
+        return cats.index(value) if value in cats else -1
+
+    def counts(self, col: str, mask: np.ndarray = None) -> pd.Series:
+        """Counts per category, optionally of masked rows, largest first."""
+        codes = self.arrays[col] if mask is None else self.arrays[col][mask]
+        counts = np.bincount(codes[codes >= 0].astype(np.intp), minlength=len(self.categories(col)))
+        series = pd.Series(counts, index=pd.Index(self.categories(col), name=col), name='count')
+        return series[series > 0].sort_values(ascending=False, kind='stable')
+
+    def close(self) -> None:
+        self.arrays.clear()
+        self._shm.close()
+
+
+class SharedJira:
+    """Owner of a published block; unlinks it on close."""
+
+    def __init__(self, df: pd.DataFrame, columns: Iterable[str] = HOT_COLUMNS):
+        arrays = _hot_arrays(df, columns)
+        layout, size = {}, 0
+        for col, (arr, _) in arrays.items():
+            layout[col] = (size, arr.dtype.str, len(arr))
+            size += -(-arr.nbytes // _ALIGN) * _ALIGN
+        self._shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        for col, (arr, _) in arrays.items():
+            offset, dtype, length = layout[col]
+            np.ndarray((length,), dtype=arr.dtype, buffer=self._shm.buf, offset=offset)[:] = arr
+        self.spec = {
+            'name': self._shm.name,
+            'rows': len(df),
+            'arrays': layout,
+            'categories': {col: cats for col, (_, cats) in arrays.items() if cats is not None},
+        }
+
+    @property
+    def nbytes(self) -> int:
+        return self._shm.size
+
+    def map(self, fn: Callable, sections: Iterable, workers: int = None) -> list:
+        """
+        Run fn(view, section) for each section in a process pool.
+
+        Each worker attaches once; fn must be a module-level function.
+        """
+        sections = list(sections)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(self.spec,)) as pool:
+            return list(pool.map(_run_section, [fn] * len(sections), sections))
+
+    def close(self) -> None:
+        self._shm.close()
+        self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def publish(df: pd.DataFrame, columns: Iterable[str] = HOT_COLUMNS) -> SharedJira:
+    return SharedJira(df, columns)
+
+
+def attach(spec: dict) -> SharedView:
+    return SharedView(spec)
+
+
+_worker_view = None
+
+
+def _init_worker(spec: dict) -> None:
+    global _worker_view
+    _worker_view = SharedView(spec)
+
+
+def _run_section(fn: Callable, section):
+    return fn(_worker_view, section)
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Incremental SQLite store for Jira exports.
+
+Each export is upserted by 问题ID (falling back to 问题关键字, so moved
+issues keep their row). Issues whose 已更新 matches the stored value are
+skipped without comparing fields; every insert or update is recorded in a
+change log with the fields that differed. An export already ingested is
+recognized by its sha256 and not read again.
+
+The analysis scripts call sync_store() and load from the store path; the
+loader caches the store like a CSV, keyed by the store's revision.
+
+    python jira_data/store.py [export.csv ...]     ingest exports
+    python jira_data/store.py --log 20             show recent changes
+"""
+
+import argparse
+import csv
+import json
+import sqlite3
+import sys
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import pandas as pd
+
+try:
+    from .loader import JIRA_COLUMNS, JIRA_CSV, file_digest
+    from .normalize import ISSUE_KEY
+except ImportError:  # run as a script
+    from loader import JIRA_COLUMNS, JIRA_CSV, file_digest
+    from normalize import ISSUE_KEY
+
+
+JIRA_STORE = JIRA_CSV.parent / 'jira_store.sqlite'
+STORE_SUFFIXES = ('.sqlite', '.db')
+
+ISSUE_ID = '问题ID'
+UPDATED = '已更新'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS exports (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    digest TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    ingested_at TEXT NOT NULL,
+    header TEXT NOT NULL,
+    rows INTEGER NOT NULL DEFAULT 0,
+    inserted INTEGER NOT NULL DEFAULT 0,
+    updated INTEGER NOT NULL DEFAULT 0,
+    unchanged INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS issues (
+    issue_key TEXT PRIMARY KEY,
+    issue_id INTEGER UNIQUE,
+    updated TEXT,
+    fields TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS changes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    export_id INTEGER NOT NULL REFERENCES exports(id),
+    issue_key TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    old_updated TEXT,
+    new_updated TEXT,
+    fields TEXT NOT NULL
+);
+"""
+
+
+@dataclass
+class IngestStats:
+    """Outcome of ingesting one export."""
+    export: str
+    rows: int = 0
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    skipped: bool = False
+
+
+def is_store(path) -> bool:
+    """True when path names an issue store rather than a CSV export."""
+    return Path(path).suffix in STORE_SUFFIXES
+
+
+def row_fields(header: List[str], row: List[str]) -> Dict[str, object]:
+    """
+    Non-empty cells of a CSV row by header name.
+
+    Repeated headers map to a list of their copies, positions kept (None
+    for gaps), so the same `.1`, `.2` columns can be rebuilt later.
+    """
+    fields: Dict[str, object] = {}
+    counts: Dict[str, int] = {}
+    for name in header:
+        counts[name] = counts.get(name, 0) + 1
+    for name, value in zip(header, row):
+        if counts[name] > 1:
+            fields.setdefault(name, []).append(value if value != '' else None)
+        elif value != '':
+            fields[name] = value
+    for name, count in counts.items():
+        if count > 1:
+            values = fields[name]
+            while values and values[-1] is None:
+                values.pop()
+            if not values:
+                del fields[name]
+    return fields
+
+
+def _issue_id(value) -> Optional[int]:
+    return int(value) if value and str(value).isdigit() else None
+
+
+class IssueStore:
+    """SQLite issue table with upsert-by-key ingestion and a change log."""
+
+    def __init__(self, path=JIRA_STORE):
+        self.path = Path(path)
+        self.conn = sqlite3.connect(str(self.path))
+        with self.conn:
+            self.conn.executescript(SCHEMA)
+            self.conn.execute("INSERT OR IGNORE INTO meta VALUES ('store_id', ?)", (uuid.uuid4().hex,))
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def revision(self) -> str:
+        """Changes whenever ingestion modifies an issue."""
+        store_id = self.conn.execute("SELECT value FROM meta WHERE name = 'store_id'").fetchone()[0]
+        last = self.conn.execute("SELECT COALESCE(MAX(id), 0) FROM changes").fetchone()[0]
+        return f"{store_id}:{last}"
+
+    def header(self) -> List[str]:
+        """Header of the most recent export, duplicates included."""
+        row = self.conn.execute("SELECT header FROM exports ORDER BY id DESC LIMIT 1").fetchone()
+        return json.loads(row[0]) if row else []
+
+    def ingest(self, csv_path) -> IngestStats:
+        """Upsert every issue of an export; unchanged issues are not rewritten."""
+        csv_path = Path(csv_path)
+        stats = IngestStats(export=csv_path.name)
+        digest = file_digest(csv_path)
+        if self.conn.execute("SELECT 1 FROM exports WHERE digest = ?", (digest,)).fetchone():
+            stats.skipped = True
+            return stats
+
+        by_id: Dict[int, tuple] = {}
+        by_key: Dict[str, tuple] = {}
+        for key, issue_id, updated in self.conn.execute("SELECT issue_key, issue_id, updated FROM issues"):
+            by_key[key] = (key, updated)
+            if issue_id is not None:
+                by_id[issue_id] = (key, updated)
+
+        with open(csv_path, 'r', encoding='utf-8-sig', newline='') as f, self.conn:
+            reader = csv.reader(f)
+            header = next(reader)
+            export_id = self.conn.execute(
+                "INSERT INTO exports (digest, name, ingested_at, header) VALUES (?, ?, ?, ?)",
+                (digest, csv_path.name, datetime.now().isoformat(timespec='seconds'),
+                 json.dumps(header, ensure_ascii=False))).lastrowid
+            for row in reader:
+                if not row:
+                    continue
+                stats.rows += 1
+                fields = row_fields(header, row)
+                key = fields.get(ISSUE_KEY)
+                issue_id = _issue_id(fields.get(ISSUE_ID))
+                updated = fields.get(UPDATED)
+                old = by_id.get(issue_id) or by_key.get(key)
+                if old is not None and old == (key, updated):
+                    stats.unchanged += 1
+                    continue
+
+                data = json.dumps(fields, ensure_ascii=False)
+                if old is None:
+                    self.conn.execute("INSERT INTO issues VALUES (?, ?, ?, ?)", (key, issue_id, updated, data))
+                    changed = sorted(fields)
+                    kind = 'insert'
+                    stats.inserted += 1
+                else:
+                    before = json.loads(self.conn.execute(
+                        "SELECT fields FROM issues WHERE issue_key = ?", (old[0],)).fetchone()[0])
+                    changed = sorted(n for n in set(before) | set(fields) if before.get(n) != fields.get(n))
+                    # UPDATE keeps the rowid, so issues stay in first-ingest order
+                    self.conn.execute(
+                        "UPDATE issues SET issue_key = ?, issue_id = ?, updated = ?, fields = ? WHERE issue_key = ?",
+                        (key, issue_id, updated, data, old[0]))
+                    kind = 'update'
+                    stats.updated += 1
+                self.conn.execute(
+                    "INSERT INTO changes (export_id, issue_key, kind, old_updated, new_updated, fields) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (export_id, key, kind, old[1] if old else None, updated,
+                     json.dumps(changed, ensure_ascii=False)))
+                by_key[key] = (key, updated)
+                if issue_id is not None:
+                    by_id[issue_id] = (key, updated)
+
+            self.conn.execute(
+                "UPDATE exports SET rows = ?, inserted = ?, updated = ?, unchanged = ? WHERE id = ?",
+                (stats.rows, stats.inserted, stats.updated, stats.unchanged, export_id))
+        return stats
+
+    def frame(self, columns: Iterable[str] = JIRA_COLUMNS) -> pd.DataFrame:
+        """
+        Issues as a raw export frame, like read_jira_csv().
+
+        Columns follow the latest export's header order; repeated headers
+        come back as `name`, `name.1`, ... (one per copy in the header) and
+        empty cells as NaN.
+        """
+        wanted = set(columns)
+        header = self.header()
+        names = [n for n in dict.fromkeys(header) if n in wanted]
+        rows = [json.loads(r[0]) for r in self.conn.execute("SELECT fields FROM issues ORDER BY rowid")]
+
+        data = {}
+        for name in names:
+            cells = [r.get(name) for r in rows]
+            copies = header.count(name)
+            if copies == 1 and not any(isinstance(c, list) for c in cells):
+                data[name] = cells
+                continue
+            # Every copy in the header gets a column, even when no issue fills it
+            width = max([copies] + [len(c) for c in cells if isinstance(c, list)])
+            for i in range(width):
+                col = name if i == 0 else f"{name}.{i}"
+                data[col] = [c[i] if isinstance(c, list) and i < len(c) else None for c in cells]
+        df = pd.DataFrame(data)
+        if ISSUE_ID in df.columns:
+            df[ISSUE_ID] = pd.to_numeric(df[ISSUE_ID])
+        return df
+
+    def changes(self, limit: Optional[int] = None) -> pd.DataFrame:
+        """Change log, newest first."""
+        query = ("SELECT c.id, e.name AS export, e.ingested_at, c.issue_key, c.kind, "
+                 "c.old_updated, c.new_updated, c.fields FROM changes c "
+                 "JOIN exports e ON e.id = c.export_id ORDER BY c.id DESC")
+        if limit is not None:
+            query += f" LIMIT {int(limit)}"
+        return pd.read_sql_query(query, self.conn)
+
+
+def read_store(path=JIRA_STORE, columns: Iterable[str] = JIRA_COLUMNS) -> pd.DataFrame:
+    with IssueStore(path) as store:
+        return store.frame(columns)
+
+
+def store_revision(path=JIRA_STORE) -> str:
+    with IssueStore(path) as store:
+        return store.revision()
+
+
+def sync_store(csv_path=JIRA_CSV, path=JIRA_STORE, verbose: bool = False) -> Path:
+    """Ingest an export into the store (a no-op if already ingested) and return the store path."""
+    with IssueStore(path) as store:
+        stats = store.ingest(csv_path)
+    if verbose:
+        print_ingest(stats)
+    return Path(path)
+
+
+def print_ingest(stats: IngestStats) -> None:
+    if stats.skipped:
+        print(f"{stats.export}: already ingested")
+        return
+    print(f"{stats.export}: {stats.rows} rows, {stats.inserted} inserted, "
+          f"{stats.updated} updated, {stats.unchanged} unchanged")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Ingest Jira exports into the incremental issue store')
+    parser.add_argument('exports', nargs='*', help='CSV exports, oldest first (default: the bundled export)')
+    parser.add_argument('--store', default=str(JIRA_STORE), help='store path')
+    parser.add_argument('--log', type=int, metavar='N', help='print the N most recent changes')
+    args = parser.parse_args()
+
+    with IssueStore(args.store) as store:
+        if args.log is not None:
+            with pd.option_context('display.width', 200, 'display.max_colwidth', 60):
+                print(store.changes(args.log).to_string(index=False))
+            return 0
+        for export in args.exports or [JIRA_CSV]:
+            print_ingest(store.ingest(export))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+Worklog table parsed from the repeated 登记工作日志 columns.
+
+Each cell is `comment;YYYY-MM-DD  HH:MM:SS;author;seconds`, and the comment
+itself may contain ';'. Cells are split from the right with one vectorized
+str.rsplit over the whole child table, giving one row per worklog:
+(issue_key, author, logged_at, seconds, comment). The table is cached next
+to the issue frame.
+
+    logs = load_worklogs()
+    effort(logs, 'month')                                  # hours per month
+    effort(logs, '自定义字段(客户名称)', load_jira())       # hours per customer
+"""
+
+from typing import Iterable
+
+import pandas as pd
+
+from .loader import (DATE_FORMAT, JIRA_COLUMNS, JIRA_CSV, _cache_file, _read_frame, _write_frame,
+                     cache_base, load_jira_values)
+from .normalize import ISSUE_KEY
+
+
+WORKLOG_COL = '登记工作日志'
+WORKLOG_COLUMNS = ('issue_key', 'author', 'logged_at', 'seconds', 'comment')
+
+
+def parse_worklogs(values: pd.DataFrame) -> pd.DataFrame:
+    """Split an (issue_key, value) worklog child table into columns; malformed cells are dropped."""
+    parts = values['value'].str.rsplit(';', n=3, expand=True).reindex(columns=range(4))
+    logs = pd.DataFrame({
+        'issue_key': values['issue_key'],
+        'author': parts[2].str.strip(),
+        'logged_at': pd.to_datetime(parts[1], format=DATE_FORMAT, errors='coerce'),
+        'seconds': pd.to_numeric(parts[3], errors='coerce'),
+        'comment': parts[0].str.strip(),
+    })
+    logs = logs[logs['logged_at'].notna() & logs['seconds'].notna()]
+    logs['seconds'] = logs['seconds'].astype('int64')
+    logs['author'] = logs['author'].astype('category')
+    return logs.reset_index(drop=True)
+
+
+def load_worklogs(path=JIRA_CSV, columns: Iterable[str] = JIRA_COLUMNS, refresh: bool = False) -> pd.DataFrame:
+    """Worklog table for an export or issue store, parsed once and cached with the issue frame."""
+    columns = tuple(columns)
+    if WORKLOG_COL not in columns:
+        columns += (WORKLOG_COL,)
+    values = load_jira_values(WORKLOG_COL, path, columns, refresh=refresh)
+    # Same prefix as the issue cache, so it is pruned along with it
+    target = _cache_file(cache_base(path, columns), 'worklogs')
+    if target.exists() and not refresh:
+        return _read_frame(target)
+    logs = parse_worklogs(values)
+    _write_frame(logs, target)
+    return logs
+
+
+def effort(logs: pd.DataFrame, by: str = 'issue_key', issues: pd.DataFrame = None) -> pd.Series:
+    """
+    Logged hours grouped by 'issue_key', 'author', 'month' or an issue column.
+
+    Grouping by an issue column (customer, severity, ...) needs the issue
+    frame to join on.
+    """
+    if by == 'month':
+        keys = logs['logged_at'].dt.to_period('M')
+    elif by in logs.columns:
+        keys = logs[by]
+    else:
+        if issues is None:
+            raise ValueError(f"grouping by {by} needs the issue frame")
+        keys = logs['issue_key'].map(issues.set_index(ISSUE_KEY)[by]).rename(by)
+    hours = (logs['seconds'].groupby(keys, observed=True, sort=by == 'month').sum() / 3600).rename('hours')
+    return hours if by == 'month' else hours.sort_values(ascending=False)
@@ -1,16 +1,317 @@
 #!/usr/bin/env python3
 """
 Script to remove base64 images from markdown files.
+
+With --sanitize it also strips data URIs from HTML and CSS.
 """
 
+import argparse
+import base64
+import binascii
+import contextlib
+import hashlib
+import io
+import json
+import mmap
+import os
 import re
-import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is only needed for --recompress
+    Image = None
+
+
+# Upper bounds for the `![alt](data:image/<mime>;base64,` header so the
+# streaming scanner only ever needs to carry a short tail between chunks
+MAX_ALT = 1024
+MAX_MIME = 64
+MAX_HEADER = MAX_ALT + MAX_MIME + 32
+CHUNK_SIZE = 1 << 20
+
+TREE_EXTENSIONS = ('.md', '.html', '.htm')
+MANIFEST_NAME = '.base64_manifest.json'
+
+HEADER_PATTERN = re.compile(
+    rb'!\[(?P<alt>[^\]]{0,%d})\]\(data:image/(?P<mime>[^;)\s]{1,%d});base64,' % (MAX_ALT, MAX_MIME)
+)
+IMAGE_PATTERN = re.compile(r'!\[([^\]]*)\]\(data:image/([^;]+);base64,([^)]+)\)')
+# The mmap scanner anchors on this literal and then matches the rest in place
+IMAGE_ANCHOR = b'](data:image/'
+IMAGE_TAIL_PATTERN = re.compile(rb'\]\(data:image/([^;]+);base64,')
+NON_BASE64 = re.compile(rb'[^A-Za-z0-9+/=]')
+
+
+@dataclass
+class CleanStats:
+    """Outcome of cleaning one document; sizes are in bytes."""
+    path: str
+    images: int
+    original_size: int
+    new_size: int
+    stored: int = 0
+    # Bytes removed per sanitizer pattern name
+    by_pattern: dict = field(default_factory=dict)
+
+    @property
+    def saved(self):
+        return self.original_size - self.new_size
+
+
+@dataclass(frozen=True)
+class DataUriPattern:
+    """
+    One kind of embedded data URI for the sanitizer.
+
+    `header` is a bounded regex ending at `data:`; the payload runs to the
+    first `terminator` match. With keep, the reference is kept but its URI
+    is emptied to `data:,`; otherwise the whole match is deleted.
+    """
+    name: str
+    header: bytes
+    terminator: bytes
+    keep: bool = True
+
+
+DATA_URI_PATTERNS = [
+    DataUriPattern('md-inline', rb'!\[[^\]]{0,%d}\]\(\s*data:' % MAX_ALT, rb'\)', keep=False),
+    DataUriPattern('md-reference', rb'(?<![^\n])[ ]{0,3}\[[^\]\n]{1,999}\]:[ \t]*data:', rb'(?=\s)|\Z'),
+    DataUriPattern('html-src', rb'\b(?:src|href|xlink:href)\s*=\s*"data:', rb'"'),
+    DataUriPattern('html-src', rb"\b(?:src|href|xlink:href)\s*=\s*'data:", rb"'"),
+    DataUriPattern('css-url', rb'\burl\(\s*"data:', rb'"\s*\)'),
+    DataUriPattern('css-url', rb"\burl\(\s*'data:", rb"'\s*\)"),
+    DataUriPattern('css-url', rb'\burl\(\s*data:', rb'\)'),
+]
+
+
+class DataUriScanner:
+    """Finds every DataUriPattern in one pass over a bytes buffer."""
+
+    def __init__(self, patterns=DATA_URI_PATTERNS):
+        self.patterns = list(patterns)
+        self._headers = re.compile(b'|'.join(
+            b'(?P<p%d>%s)' % (i, p.header) for i, p in enumerate(self.patterns)
+        ))
+        self._terminators = [re.compile(p.terminator) for p in self.patterns]
+
+    def finditer(self, buf):
+        """Yield (pattern, start, end, replacement) in document order."""
+        pos = 0
+        while True:
+            m = self._headers.search(buf, pos)
+            if m is None:
+                return
+            index = int(m.lastgroup[1:])
+            term = self._terminators[index].search(buf, m.end())
+            if term is None:
+                pos = m.start() + 1
+                continue
+            pattern = self.patterns[index]
+            replacement = m.group() + b',' + term.group() if pattern.keep else b''
+            yield pattern, m.start(), term.end(), replacement
+            pos = term.end()
+
+
+_umask_lock = threading.Lock()
+_umask = None
+
+
+def process_umask():
+    """
+    The process umask, read once on first use.
+
+    Linux reports it in /proc. Elsewhere os.umask can only read it by
+    setting it, so that is done once, under a lock, with a restrictive
+    value in between so no file created meanwhile gets looser permissions.
+    """
+    global _umask
+    with _umask_lock:
+        if _umask is None:
+            try:
+                with open('/proc/self/status', encoding='ascii') as f:
+                    _umask = next(int(line.split()[1], 8) for line in f if line.startswith('Umask:'))
+            except (OSError, StopIteration, ValueError):
+                _umask = os.umask(0o077)
+                os.umask(_umask)
+        return _umask
+
+
+def replace_file(tmp_path, path):
+    """
+    Atomically move a finished temp file over path, keeping its permissions.
+
+    mkstemp creates files as 0600; the result takes the mode of the file it
+    replaces, or the umask default for a new file.
+    """
+    try:
+        mode = os.stat(path).st_mode & 0o777
+    except FileNotFoundError:
+        mode = 0o666 & ~process_umask()
+    os.chmod(tmp_path, mode)
+    os.replace(tmp_path, path)
+
+
+# File extensions for the image store, keyed by the data URI subtype
+IMAGE_EXTENSIONS = {
+    'png': 'png',
+    'jpeg': 'jpg',
+    'jpg': 'jpg',
+    'gif': 'gif',
+    'webp': 'webp',
+    'bmp': 'bmp',
+    'svg+xml': 'svg',
+}
+
+
+def image_extension(mime):
+    """Map a data URI image subtype to a file extension."""
+    mime = mime.strip().lower()
+    return IMAGE_EXTENSIONS.get(mime) or re.sub(r'[^a-z0-9]', '', mime) or 'bin'
+
 
+@dataclass(frozen=True)
+class RecompressOptions:
+    """How --recompress re-encodes embedded images."""
+    max_dim: int = 1600
+    quality: int = 75
+    format: str = 'webp'
 
-def remove_base64_images(input_file, output_file=None):
+
+def recompress_image(mime, data, options):
+    """
+    Downsample and re-encode one decoded image with Pillow.
+
+    Returns (mime subtype, bytes). SVG, animated images, undecodable data
+    and images that would not get smaller are returned unchanged.
+    """
+    if mime.strip().lower() == 'svg+xml':
+        return mime, data
+    try:
+        img = Image.open(io.BytesIO(data))
+        img.load()
+    except (OSError, ValueError, Image.UnidentifiedImageError, Image.DecompressionBombError):
+        return mime, data
+    if getattr(img, 'n_frames', 1) > 1:
+        return mime, data
+
+    img.thumbnail((options.max_dim, options.max_dim), Image.LANCZOS)
+    if options.format == 'jpeg':
+        if img.mode not in ('RGB', 'L'):
+            rgba = img.convert('RGBA')
+            img = Image.new('RGB', rgba.size, 'white')
+            img.paste(rgba, mask=rgba.getchannel('A'))
+    elif img.mode not in ('RGB', 'RGBA', 'L', 'LA'):
+        img = img.convert('RGBA')
+
+    out = io.BytesIO()
+    img.save(out, format=options.format.upper(), quality=options.quality)
+    if out.tell() >= len(data):
+        return mime, data
+    return options.format, out.getvalue()
+
+
+def decode_payload(payload):
+    """Decode a base64 payload, ignoring line breaks and stray characters; binascii.Error if invalid."""
+    data = NON_BASE64.sub(b'', payload)
+    return base64.b64decode(data + b'=' * (-len(data) % 4))
+
+
+class ImageSink:
+    """
+    Decode a base64 payload incrementally into a content-addressed store.
+
+    Decoded bytes go to a temp file in the store while being hashed; on
+    close the file is renamed to `<sha256>.<ext>`, or discarded if an
+    identical image is already stored. A payload that is not valid base64
+    (e.g. truncated) is discarded and close() returns (None, False).
+    """
+
+    def __init__(self, store_dir, mime):
+        self.store_dir = store_dir
+        self.ext = image_extension(mime)
+        self._hash = hashlib.sha256()
+        self._pending = b''
+        self.failed = False
+        fd, self._tmp_path = tempfile.mkstemp(dir=store_dir, prefix='.image-', suffix='.tmp')
+        self._file = os.fdopen(fd, 'wb')
+
+    def feed(self, data):
+        if self.failed:
+            return
+        data = self._pending + NON_BASE64.sub(b'', data)
+        usable = len(data) - len(data) % 4
+        self._pending = data[usable:]
+        if usable:
+            try:
+                decoded = base64.b64decode(data[:usable])
+            except binascii.Error:
+                self.failed = True
+                return
+            self._hash.update(decoded)
+            self._file.write(decoded)
+
+    def close(self):
+        """Finish decoding and return (path, newly_stored), or (None, False) if the payload was invalid."""
+        if self._pending:
+            # Tolerate payloads whose padding was stripped
+            self.feed(b'=' * (-len(self._pending) % 4))
+        if self.failed:
+            self.abort()
+            return None, False
+        self._file.close()
+        path = os.path.join(self.store_dir, f"{self._hash.hexdigest()}.{self.ext}")
+        if os.path.exists(path):
+            os.unlink(self._tmp_path)
+            return path, False
+        replace_file(self._tmp_path, path)
+        return path, True
+
+    def abort(self):
+        self._file.close()
+        os.unlink(self._tmp_path)
+
+
+def store_image(store_dir, mime, payload):
+    """Decode one complete base64 payload into the store; (None, False) if it is invalid."""
+    sink = ImageSink(store_dir, mime)
+    try:
+        sink.feed(payload.encode('ascii', 'ignore') if isinstance(payload, str) else payload)
+    except BaseException:
+        sink.abort()
+        raise
+    return sink.close()
+
+
+def store_bytes(store_dir, mime, data):
+    """Store already decoded image bytes; returns (path, newly_stored)."""
+    path = os.path.join(store_dir, f"{hashlib.sha256(data).hexdigest()}.{image_extension(mime)}")
+    if os.path.exists(path):
+        return path, False
+    fd, tmp_path = tempfile.mkstemp(dir=store_dir, prefix='.image-', suffix='.tmp')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(data)
+    replace_file(tmp_path, path)
+    return path, True
+
+
+def image_link(alt, image_path, output_file):
+    """Markdown link to a stored image, relative to the output document."""
+    rel = os.path.relpath(image_path, os.path.dirname(os.path.abspath(output_file)))
+    return f"![{alt}]({rel.replace(os.sep, '/')})"
+
+
+def remove_base64_images(input_file, output_file=None, extract_dir=None, workers=None):
     """
     Remove base64 images from markdown file.
     Pattern: ![...](data:image/...;base64,...)
+
+    With extract_dir, images are decoded in a thread pool into the store
+    and replaced by relative links instead of being deleted.
     """
     if output_file is None:
         output_file = input_file
@@ -20,6 +321,40 @@ def remove_base64_images(input_file, output_file=None):
 
     original_size = len(content)
 
+    if extract_dir is not None:
+        os.makedirs(extract_dir, exist_ok=True)
+        matches = list(IMAGE_PATTERN.finditer(content))
+        print(f"Found {len(matches)} base64 images")
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            stored = list(pool.map(lambda m: store_image(extract_dir, m.group(2), m.group(3)), matches))
+
+        parts = []
+        pos = 0
+        for m, (path, _) in zip(matches, stored):
+            parts.append(content[pos:m.start()])
+            # An image that failed to decode is kept as it was
+            parts.append(m.group(0) if path is None else image_link(m.group(1), path, output_file))
+            pos = m.end()
+        parts.append(content[pos:])
+        cleaned_content = ''.join(parts)
+        new_images = sum(1 for _, is_new in stored if is_new)
+        print(f"Stored {new_images} new images ({len(stored) - new_images} already in {extract_dir})")
+    else:
+        cleaned_content = _strip_images(content)
+
+    new_size = len(cleaned_content)
+
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.write(cleaned_content)
+
+    print(f"Original size: {original_size:,} characters")
+    print(f"New size: {new_size:,} characters")
+    print(f"Reduced: {original_size - new_size:,} characters ({(1 - new_size/original_size)*100:.1f}%)")
+    print(f"Saved to: {output_file}")
+
+
+def _strip_images(content):
+    """Delete every base64 image from an in-memory document."""
     # Match markdown image syntax with base64 data
     # Pattern: ![alt text](data:image/xxx;base64,xxx)
     pattern = r'!\[[^\]]*\]\(data:image/[^;]+;base64,[^)]+\)'
@@ -29,25 +364,520 @@ def remove_base64_images(input_file, output_file=None):
     print(f"Found {len(matches)} base64 images")
 
     # Replace with empty string or placeholder
-    cleaned_content = re.sub(pattern, '', content)
+    return re.sub(pattern, '', content)
 
-    new_size = len(cleaned_content)
 
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(cleaned_content)
+def remove_base64_images_stream(input_file, output_file=None, chunk_size=CHUNK_SIZE, extract_dir=None,
+                                verbose=True):
+    """
+    Remove base64 images in constant memory.
 
-    print(f"Original size: {original_size:,} characters")
-    print(f"New size: {new_size:,} characters")
-    print(f"Reduced: {original_size - new_size:,} characters ({(1 - new_size/original_size)*100:.1f}%)")
+    Reads the input in fixed-size binary chunks. A header match switches the
+    scanner into payload mode, where bytes are dropped until the closing `)`,
+    so payloads are never buffered. A partial header at a chunk boundary is
+    carried into the next chunk. The output is written to a temp file and
+    atomically renamed. A header still open at EOF is not an image and is
+    copied back from the input unchanged, as the other engines leave it.
+
+    With extract_dir, payload bytes are decoded into the image store as they
+    stream past and the image is replaced by a relative link; an image that
+    fails to decode is copied back from the input unchanged. A file cleaned
+    in place without any images is left untouched.
+    """
+    if output_file is None:
+        output_file = input_file
+    if extract_dir is not None:
+        os.makedirs(extract_dir, exist_ok=True)
+
+    count = 0
+    new_images = 0
+    sink = None
+    alt = ''
+    image_start = payload_start = 0
+    original_size = 0
+    new_size = 0
+    in_payload = False
+    carry = b''
+
+    out_dir = os.path.dirname(os.path.abspath(output_file))
+    fd, tmp_path = tempfile.mkstemp(dir=out_dir, prefix='.base64-', suffix='.tmp')
+    try:
+        with open(input_file, 'rb') as src, os.fdopen(fd, 'wb') as dst:
+            while True:
+                chunk = src.read(chunk_size)
+                original_size += len(chunk)
+                eof = not chunk
+                data = carry + chunk
+                carry = b''
+                pos = 0
+
+                while pos < len(data):
+                    if in_payload:
+                        end = data.find(b')', pos)
+                        if sink is not None:
+                            sink.feed(data[pos:end if end >= 0 else len(data)])
+                        if end < 0:
+                            pos = len(data)
+                            break
+                        in_payload = False
+                        pos = end + 1
+                        image_end = original_size - len(data) + pos
+                        if image_end - 1 == payload_start:
+                            # `base64,)` has no payload, so it is not an image
+                            if sink is not None:
+                                sink.abort()
+                                sink = None
+                            _copy_range(src, dst, image_start, image_end)
+                            new_size += image_end - image_start
+                            count -= 1
+                            continue
+                        if sink is not None:
+                            path, is_new = sink.close()
+                            sink = None
+                            if path is None:
+                                _copy_range(src, dst, image_start, image_end)
+                                new_size += image_end - image_start
+                                continue
+                            new_images += is_new
+                            link = image_link(alt, path, output_file).encode('utf-8')
+                            dst.write(link)
+                            new_size += len(link)
+                        continue
+                    m = HEADER_PATTERN.search(data, pos)
+                    if m is None:
+                        break
+                    dst.write(data[pos:m.start()])
+                    new_size += m.start() - pos
+                    count += 1
+                    in_payload = True
+                    pos = m.end()
+                    image_start = original_size - len(data) + m.start()
+                    payload_start = original_size - len(data) + m.end()
+                    if extract_dir is not None:
+                        alt = m.group('alt').decode('utf-8', 'replace')
+                        sink = ImageSink(extract_dir, m.group('mime').decode('ascii', 'replace'))
+
+                if not in_payload and pos < len(data):
+                    # Any header cut off by the chunk end starts in the last
+                    # MAX_HEADER bytes; hold it back for the next chunk
+                    keep = len(data)
+                    if not eof:
+                        bang = data.find(b'!', max(pos, len(data) - MAX_HEADER))
+                        if bang >= 0:
+                            keep = bang
+                            carry = data[bang:]
+                    dst.write(data[pos:keep])
+                    new_size += keep - pos
+
+                if eof:
+                    if in_payload:
+                        _copy_range(src, dst, image_start, original_size)
+                        new_size += original_size - image_start
+                        count -= 1
+                    break
+        if sink is not None:
+            sink.abort()
+            sink = None
+        if count == 0 and os.path.abspath(output_file) == os.path.abspath(input_file):
+            os.unlink(tmp_path)
+        else:
+            replace_file(tmp_path, output_file)
+    except BaseException:
+        if sink is not None:
+            sink.abort()
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+    stats = CleanStats(str(input_file), count, original_size, new_size, new_images)
+    if verbose:
+        print_stats(stats, output_file, extract_dir)
+    return stats
+
+
+def _copy_range(src, dst, start, end):
+    """Copy bytes [start, end) of the input to dst in chunks, then restore the read position."""
+    resume = src.tell()
+    src.seek(start)
+    while start < end:
+        block = src.read(min(CHUNK_SIZE, end - start))
+        if not block:
+            break
+        dst.write(block)
+        start += len(block)
+    src.seek(resume)
+
+
+def print_stats(stats, output_file, extract_dir=None):
+    """Print the summary for one cleaned document."""
+    print(f"Found {stats.images} base64 images")
+    if extract_dir is not None:
+        print(f"Stored {stats.stored} new images ({stats.images - stats.stored} already in {extract_dir})")
+    print(f"Original size: {stats.original_size:,} bytes")
+    print(f"New size: {stats.new_size:,} bytes")
+    if stats.original_size:
+        print(f"Reduced: {stats.saved:,} bytes ({stats.saved / stats.original_size * 100:.1f}%)")
     print(f"Saved to: {output_file}")
 
 
+def _find_images(buf):
+    """
+    Yield (start, end, alt, mime, payload) for each image in a bytes buffer.
+
+    Searches for the `](data:image/` literal, walks back to the opening `![`
+    and matches the header in place. Matches are the same as
+    IMAGE_PATTERN's; slices are memoryviews, so nothing is copied.
+    """
+    view = memoryview(buf)
+    pos = 0
+    while True:
+        anchor = buf.find(IMAGE_ANCHOR, pos)
+        if anchor < 0:
+            return
+        # The alt text cannot contain ']', so the image opens at the first
+        # '![' after the previous ']'
+        start = buf.find(b'![', max(pos, buf.rfind(b']', pos, anchor) + 1), anchor)
+        m = IMAGE_TAIL_PATTERN.match(buf, anchor) if start >= 0 else None
+        # A plain find for the closing ')' is far faster than a regex over the payload
+        end = buf.find(b')', m.end()) if m else -1
+        if end <= (m.end() if m else 0):
+            pos = anchor + 1
+            continue
+        yield (start, end + 1, view[start + 2:anchor], view[m.start(1):m.end(1)], view[m.end():end])
+        pos = end + 1
+
+
+def remove_base64_images_mmap(input_file, output_file=None, extract_dir=None, workers=None, verbose=True,
+                              recompress=None):
+    """
+    Remove base64 images by scanning a memory-mapped input as raw bytes.
+
+    The text is never decoded: only the byte ranges between images are
+    copied to a buffered temp file, which is atomically renamed. With
+    extract_dir, payloads are decoded into the image store in a thread pool
+    and replaced by relative links.
+
+    With recompress (RecompressOptions), images are kept but downsampled and
+    re-encoded in the thread pool, then re-embedded or, with extract_dir,
+    stored.
+    """
+    if output_file is None:
+        output_file = input_file
+    if extract_dir is not None:
+        os.makedirs(extract_dir, exist_ok=True)
+    if recompress is not None and Image is None:
+        raise RuntimeError("Pillow is required to recompress images: pip install pillow")
+
+    out_dir = os.path.dirname(os.path.abspath(output_file))
+    fd, tmp_path = tempfile.mkstemp(dir=out_dir, prefix='.base64-', suffix='.tmp')
+    try:
+        with open(input_file, 'rb') as src, open(fd, 'wb', buffering=CHUNK_SIZE) as dst:
+            original_size = os.fstat(src.fileno()).st_size
+            if original_size == 0:
+                stats = CleanStats(str(input_file), 0, 0, 0)
+            else:
+                with mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    stats = _copy_without_images(mm, dst, output_file, extract_dir, workers, recompress)
+                stats.path = str(input_file)
+        if stats.images == 0 and os.path.abspath(output_file) == os.path.abspath(input_file):
+            os.unlink(tmp_path)
+        else:
+            replace_file(tmp_path, output_file)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+    if verbose:
+        print_stats(stats, output_file, extract_dir)
+    return stats
+
+
+def _copy_without_images(mm, dst, output_file, extract_dir, workers, recompress=None):
+    view = memoryview(mm)
+    images = []
+    try:
+        images = list(_find_images(mm))
+        links = [b''] * len(images)
+        stored = 0
+
+        def rewrite(image):
+            """Replacement bytes and whether a new file was stored."""
+            start, end, alt, mime, payload = image
+            alt = bytes(alt).decode('utf-8', 'replace')
+            mime = bytes(mime).decode('ascii', 'replace')
+            if recompress is not None:
+                try:
+                    data = decode_payload(payload)
+                except binascii.Error:
+                    # Re-embed an undecodable payload as it was
+                    return bytes(view[start:end]), False
+                mime, data = recompress_image(mime, data, recompress)
+                if extract_dir is None:
+                    encoded = base64.b64encode(data).decode('ascii')
+                    return f"![{alt}](data:image/{mime};base64,{encoded})".encode('utf-8'), False
+                path, is_new = store_bytes(extract_dir, mime, data)
+            else:
+                path, is_new = store_image(extract_dir, mime, payload)
+                if path is None:
+                    return bytes(view[start:end]), False
+            return image_link(alt, path, output_file).encode('utf-8'), is_new
+
+        if (extract_dir is not None or recompress is not None) and images:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                for i, (link, is_new) in enumerate(pool.map(rewrite, images)):
+                    links[i] = link
+                    stored += is_new
+
+        pos = 0
+        new_size = 0
+        for (start, end, *_), link in zip(images, links):
+            dst.write(view[pos:start])
+            dst.write(link)
+            new_size += start - pos + len(link)
+            pos = end
+        dst.write(view[pos:])
+        new_size += len(mm) - pos
+        return CleanStats('', len(links), len(mm), new_size, stored)
+    finally:
+        # Release the slices before the mmap is closed, also on error, or
+        # closing it raises BufferError and hides the original exception
+        for _, _, *parts in images:
+            for part in parts:
+                part.release()
+        view.release()
+
+
+def sanitize_data_uris(input_file, output_file=None, scanner=None, verbose=True):
+    """
+    Strip every embedded data URI from a markdown or HTML document.
+
+    Markdown inline images are deleted; markdown reference definitions,
+    HTML src/href attributes and CSS url() keep their syntax with an empty
+    `data:,` URI. The mmap'd input is scanned once for all patterns and
+    bytes saved are reported per pattern.
+    """
+    if output_file is None:
+        output_file = input_file
+    scanner = scanner or DataUriScanner()
+
+    out_dir = os.path.dirname(os.path.abspath(output_file))
+    fd, tmp_path = tempfile.mkstemp(dir=out_dir, prefix='.base64-', suffix='.tmp')
+    try:
+        with open(input_file, 'rb') as src, open(fd, 'wb', buffering=CHUNK_SIZE) as dst:
+            stats = CleanStats(str(input_file), 0, os.fstat(src.fileno()).st_size, 0)
+            if stats.original_size:
+                with mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    view = memoryview(mm)
+                    try:
+                        pos = 0
+                        for pattern, start, end, replacement in scanner.finditer(mm):
+                            dst.write(view[pos:start])
+                            dst.write(replacement)
+                            stats.images += 1
+                            stats.by_pattern[pattern.name] = (
+                                stats.by_pattern.get(pattern.name, 0) + end - start - len(replacement)
+                            )
+                            pos = end
+                        dst.write(view[pos:])
+                    finally:
+                        view.release()
+            stats.new_size = stats.original_size - sum(stats.by_pattern.values())
+        if stats.images == 0 and os.path.abspath(output_file) == os.path.abspath(input_file):
+            os.unlink(tmp_path)
+        else:
+            replace_file(tmp_path, output_file)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+    if verbose:
+        print(f"Found {stats.images} data URIs")
+        for name, saved in sorted(stats.by_pattern.items(), key=lambda x: x[1], reverse=True):
+            print(f"  {name:<14} {saved:>14,} bytes")
+        print(f"Original size: {stats.original_size:,} bytes")
+        print(f"New size: {stats.new_size:,} bytes")
+        if stats.original_size:
+            print(f"Reduced: {stats.saved:,} bytes ({stats.saved / stats.original_size * 100:.1f}%)")
+        print(f"Saved to: {output_file}")
+    return stats
+
+
+def write_synthetic_document(path, size_mb):
+    """Write a markdown file of about size_mb MB mixing CJK text and screenshots."""
+    text = ("## 20250101 周报\n\n* 私有化部署进展顺利，客户验收通过。Deployment notes!\n" * 40).encode('utf-8')
+    payload = base64.b64encode(os.urandom(48 * 1024))
+    image = b'![screenshot](data:image/png;base64,' + payload + b')\n'
+    block = text + image
+    with open(path, 'wb') as f:
+        for _ in range(max(1, size_mb * (1 << 20) // len(block))):
+            f.write(block)
+
+
+def run_benchmark(size_mb):
+    """Time the str, stream and mmap engines on a synthetic document."""
+    engines = [
+        ('str', remove_base64_images),
+        ('stream', remove_base64_images_stream),
+        ('mmap', remove_base64_images_mmap),
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, 'synthetic.md')
+        write_synthetic_document(source, size_mb)
+        print(f"Synthetic document: {os.path.getsize(source):,} bytes")
+        digests = {}
+        for name, engine in engines:
+            output = os.path.join(tmp, f'{name}.md')
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                engine(source, output)
+            elapsed = time.perf_counter() - start
+            digests[name] = file_sha256(output)
+            os.unlink(output)
+            print(f"  {name:<8} {elapsed:8.2f}s  {size_mb / elapsed:10.1f} MB/s")
+        if len(set(digests.values())) != 1:
+            print("WARNING: engines produced different output")
+
+
+def file_sha256(path):
+    """Hash a file in chunks."""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def find_documents(root, exclude=()):
+    """Yield .md/.html files under root, skipping hidden directories."""
+    exclude = {os.path.abspath(p) for p in exclude}
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(
+            d for d in dirnames
+            if not d.startswith('.') and d != '__pycache__'
+            and os.path.abspath(os.path.join(dirpath, d)) not in exclude
+        )
+        for name in sorted(filenames):
+            if name.lower().endswith(TREE_EXTENSIONS):
+                yield os.path.join(dirpath, name)
+
+
+def _clean_tree_file(path, extract_dir, sanitize):
+    """Process-pool worker: clean one file in place and hash the result."""
+    if sanitize:
+        stats = sanitize_data_uris(path, verbose=False)
+    else:
+        stats = remove_base64_images_stream(path, extract_dir=extract_dir, verbose=False)
+    return stats, file_sha256(path)
+
+
+def remove_base64_images_tree(root, extract_dir=None, workers=None, sanitize=False):
+    """
+    Clean every document under root in place using a process pool.
+
+    ROOT/.base64_manifest.json records the hash of each file as it was left
+    by the last run, so files that have not changed since are skipped.
+    """
+    manifest_path = os.path.join(root, MANIFEST_NAME)
+    if sanitize:
+        mode = "sanitize"
+        extract_dir = None
+    else:
+        mode = f"extract:{os.path.abspath(extract_dir)}" if extract_dir else "strip"
+    manifest = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    known = manifest.get('files', {}) if manifest.get('mode') == mode else {}
+
+    files = {}
+    pending = []
+    skipped = 0
+    for path in find_documents(root, exclude=[extract_dir] if extract_dir else ()):
+        rel = os.path.relpath(path, root)
+        digest = file_sha256(path)
+        files[rel] = digest
+        if known.get(rel) == digest:
+            skipped += 1
+        else:
+            pending.append(path)
+
+    results = []
+    if pending:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for stats, digest in pool.map(_clean_tree_file, pending, [extract_dir] * len(pending),
+                                          [sanitize] * len(pending)):
+                files[os.path.relpath(stats.path, root)] = digest
+                results.append(stats)
+
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump({'mode': mode, 'files': files}, f, ensure_ascii=False, indent=2, sort_keys=True)
+
+    print(f"Scanned {len(files)} files under {root}: {len(pending)} processed, {skipped} unchanged")
+    for stats in sorted(results, key=lambda s: s.saved, reverse=True):
+        if stats.images:
+            print(f"  {stats.saved:>14,} bytes  {stats.images:>4} images  {os.path.relpath(stats.path, root)}")
+    total = sum(s.saved for s in results)
+    print(f"Total saved: {total:,} bytes in {sum(1 for s in results if s.images)} files")
+    by_pattern = {}
+    for stats in results:
+        for name, saved in stats.by_pattern.items():
+            by_pattern[name] = by_pattern.get(name, 0) + saved
+    for name, saved in sorted(by_pattern.items(), key=lambda x: x[1], reverse=True):
+        print(f"  {name:<14} {saved:>14,} bytes")
+    return results
+
+
 if __name__ == '__main__':
-    if len(sys.argv) < 2:
-        print("Usage: python remove_base64_images.py <input_file> [output_file]")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description="Remove base64 images from markdown files.")
+    parser.add_argument('input_file', nargs='?')
+    parser.add_argument('output_file', nargs='?')
+    parser.add_argument('--tree', metavar='ROOT',
+                        help="clean every .md/.html file under ROOT in place, skipping unchanged files")
+    parser.add_argument('--engine', choices=['mmap', 'stream', 'str'], default='mmap',
+                        help="mmap: scan raw bytes of a memory-mapped file (default); "
+                             "stream: fixed-size chunks in constant memory; str: decode the whole file")
+    parser.add_argument('--stream', action='store_const', dest='engine', const='stream',
+                        help="shorthand for --engine stream")
+    parser.add_argument('--recompress', action='store_true',
+                        help="keep images but downsample and re-encode them (needs Pillow)")
+    parser.add_argument('--max-dim', type=int, default=RecompressOptions.max_dim,
+                        help="longest side in pixels for --recompress (default: %(default)s)")
+    parser.add_argument('--quality', type=int, default=RecompressOptions.quality,
+                        help="encoder quality for --recompress (default: %(default)s)")
+    parser.add_argument('--format', choices=['webp', 'jpeg'], default=RecompressOptions.format,
+                        help="output format for --recompress (default: %(default)s)")
+    parser.add_argument('--sanitize', action='store_true',
+                        help="also strip data URIs from markdown references, HTML src/href and CSS url()")
+    parser.add_argument('--bench', type=int, metavar='SIZE_MB',
+                        help="benchmark the engines on a synthetic SIZE_MB document")
+    parser.add_argument('--extract', metavar='DIR',
+                        help="save images to DIR/<sha256>.<ext> and link to them instead of deleting")
+    parser.add_argument('--workers', type=int,
+                        help="decoder threads for --extract, or worker processes for --tree")
+    args = parser.parse_args()
 
-    input_file = sys.argv[1]
-    output_file = sys.argv[2] if len(sys.argv) > 2 else None
-    
-    remove_base64_images(input_file, output_file)
+    if args.recompress and (args.tree or args.sanitize or args.engine != 'mmap'):
+        parser.error("--recompress only works on a single file with the default mmap engine")
+
+    if args.bench:
+        run_benchmark(args.bench)
+    elif args.tree:
+        remove_base64_images_tree(args.tree, extract_dir=args.extract, workers=args.workers,
+                                  sanitize=args.sanitize)
+    elif args.input_file is None:
+        parser.error("an input file or --tree ROOT is required")
+    elif args.sanitize:
+        sanitize_data_uris(args.input_file, args.output_file)
+    elif args.engine == 'stream':
+        remove_base64_images_stream(args.input_file, args.output_file, extract_dir=args.extract)
+    elif args.engine == 'str':
+        remove_base64_images(args.input_file, args.output_file, extract_dir=args.extract,
+                             workers=args.workers)
+    else:
+        recompress = None
+        if args.recompress:
+            recompress = RecompressOptions(args.max_dim, args.quality, args.format)
+        remove_base64_images_mmap(args.input_file, args.output_file, extract_dir=args.extract,
+                                  workers=args.workers, recompress=recompress)